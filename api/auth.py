@@ -65,7 +65,10 @@ async def get_current_user(
             detail="인증 실패"
         )
     
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = db.query(models.User).filter(
+        models.User.id == user_id,
+        models.User.deleted_at.is_(None)
+    ).first()
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
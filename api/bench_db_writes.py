@@ -0,0 +1,81 @@
+# backend/bench_db_writes.py
+# 엔진 프로필별 쓰기 처리량 벤치마크
+#   python bench_db_writes.py [프로필 ...] [--url URL] [--threads N] [--writes N]
+# URL을 주지 않으면 프로필마다 임시 SQLite 파일을 새로 만들어 측정
+# 웹소켓 채팅처럼 메시지 하나마다 커밋하는 패턴을 여러 스레드에서 동시에 실행
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import delete
+from sqlalchemy.orm import sessionmaker
+
+from database import ENGINE_PROFILES, build_engine
+import models
+from migrations import migrate
+
+def run_profile(url: str, profile: str, threads: int, writes: int):
+    engine = build_engine(url, profile)
+    migrate(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as db:
+        room = models.ChatRoom(title="bench")
+        db.add(room)
+        db.commit()
+        room_id = room.id
+
+    errors = []
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for i in range(writes):
+            db = Session()
+            try:
+                db.add(models.Message(room_id=room_id, role="user", content=f"메시지 {i}"))
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                errors.append(e)
+            finally:
+                db.close()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    with Session() as db:
+        db.execute(delete(models.ChatRoom).where(models.ChatRoom.id == room_id))
+        db.commit()
+    engine.dispose()
+
+    done = threads * writes - len(errors)
+    print(f"{profile:<14} {elapsed * 1000:9.1f} ms  {done / elapsed:9.0f} 커밋/s  실패 {len(errors)}")
+    if errors:
+        print(f"{'':<14} 첫 오류: {errors[0]}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="엔진 프로필별 쓰기 처리량 비교")
+    parser.add_argument("profiles", nargs="*", default=["default", "sqlite", "sqlite-thread"])
+    parser.add_argument("--url", help="측정할 DB URL (기본: 프로필마다 임시 SQLite 파일)")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="스레드당 커밋 수")
+    args = parser.parse_args()
+
+    print(f"스레드 {args.threads}개 × 커밋 {args.writes}개")
+    for profile in args.profiles:
+        if profile not in ENGINE_PROFILES:
+            parser.error(f"알 수 없는 프로필: {profile}")
+        if args.url:
+            run_profile(args.url, profile, args.threads, args.writes)
+            continue
+        with tempfile.TemporaryDirectory() as tmp:
+            run_profile(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile, args.threads, args.writes)
@@ -0,0 +1,35 @@
+# backend/bench_evaluation.py
+# FeynmanEvaluator 마이크로벤치마크: python bench_evaluation.py [설명 수]
+import random
+import sys
+import time
+
+from evaluation_system import evaluator
+
+SENTENCES = [
+    "HTTP는 클라이언트와 서버가 데이터를 주고받는 규칙입니다.",
+    "마치 편지를 보낼 때 주소를 쓰는 것처럼 요청에는 목적지가 있어요.",
+    "그래서 브라우저는 서버에 요청을 보내고 응답을 기다립니다.",
+    "예를 들어 웹 페이지를 열면 GET 요청이 전송됩니다.",
+    "캐시가 어떻게 동작하는지는 잘 모르겠습니다.",
+    "즉, 상태 코드는 요청 결과를 알려주는 숫자입니다.",
+    "실생활에서는 쇼핑몰 주문 조회에 활용됩니다.",
+    "The abstraction of a connection is the main idea of this specification.",
+]
+
+def make_explanations(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(SENTENCES, k=rng.randint(3, 30))) for _ in range(count)]
+
+def bench(label: str, fn, explanations):
+    start = time.perf_counter()
+    fn(explanations)
+    elapsed = time.perf_counter() - start
+    per_item_us = elapsed / len(explanations) * 1_000_000
+    print(f"{label:<28} {elapsed * 1000:9.1f} ms  {per_item_us:8.1f} µs/설명  {len(explanations) / elapsed:9.0f} 설명/s")
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    explanations = make_explanations(count)
+    print(f"설명 {count}개, 평균 {sum(map(len, explanations)) // count} 글자")
+    bench("analyze_explanation", lambda xs: [evaluator.analyze_explanation(x) for x in xs], explanations)
@@ -0,0 +1,84 @@
+# backend/bench_serialization.py
+# 응답 직렬화/압축 벤치마크: python bench_serialization.py [메시지 수]
+# 이전: 응답 모델 검증 → dict(mode="json") → json.dumps (FastAPI 기본 경로)
+# 이후: 미리 만든 TypeAdapter로 ORM 객체 → JSON 바이트 (serialization.serialize)
+import gzip
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+import models
+import schemas
+from serialization import get_adapter, serialize
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def make_messages(count: int) -> List[models.Message]:
+    base = datetime(2024, 1, 1)
+    return [
+        models.Message(
+            id=i, room_id=1, role="user" if i % 2 else "ai",
+            content=f"{i}번째 메시지입니다. HTTP는 클라이언트와 서버가 데이터를 주고받는 규칙이에요.",
+            phase="explanation", created_at=base + timedelta(seconds=i)
+        )
+        for i in range(count)
+    ]
+
+def make_quizzes(count: int, questions: int = 20) -> List[models.Quiz]:
+    base = datetime(2024, 1, 1)
+    quizzes = []
+    for q in range(count):
+        quiz = models.Quiz(id=q, quiz_name=f"퀴즈 {q}", user_id=1, created_at=base)
+        for n in range(questions):
+            question = models.QuizQuestion(
+                id=q * questions + n, question_text=f"{n}번 문제: 다음 중 올바른 설명은?",
+                question_type="multiple_choice", question_order=n, correct_answer=None
+            )
+            question.answers = [
+                models.QuizAnswer(id=n * 4 + a, answer_text=f"보기 {a}", is_correct=a == 0, answer_order=a)
+                for a in range(4)
+            ]
+            quiz.questions.append(question)
+        quizzes.append(quiz)
+    return quizzes
+
+def before(tp, objs) -> bytes:
+    adapter = get_adapter(tp)
+    value = adapter.validate_python(objs, from_attributes=True)
+    return json.dumps(adapter.dump_python(value, mode="json"), ensure_ascii=False).encode("utf-8")
+
+def after(tp, objs) -> bytes:
+    return serialize(tp, objs)
+
+def bench(label: str, fn, repeat: int = 20) -> bytes:
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<8} {elapsed * 1000:8.2f} ms/응답  {len(body):,} B")
+    return body
+
+def wire_sizes(body: bytes):
+    sizes = [f"gzip {len(gzip.compress(body, 6)):,} B"]
+    if brotli is not None:
+        sizes.append(f"br {len(brotli.compress(body, quality=4)):,} B")
+    print("  전송량  " + "  ".join(sizes))
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    cases = [
+        (f"메시지 {count}개", List[schemas.MessageResponse], make_messages(count)),
+        ("퀴즈 50개 × 20문제", List[schemas.QuizResponse], make_quizzes(50)),
+    ]
+    for label, tp, objs in cases:
+        print(label)
+        old = bench("이전", lambda: before(tp, objs))
+        new = bench("이후", lambda: after(tp, objs))
+        assert json.loads(old) == json.loads(new)
+        wire_sizes(new)
@@ -0,0 +1,253 @@
+# backend/build_quizzes.py
+# PDF 폴더 → 퀴즈 일괄 생성 (강의 자료 수백 개로 문제 은행 만들기)
+# 사용법:
+#   python build_quizzes.py PDF_폴더 --user-id 1               # DB에 바로 저장 (파일마다 커밋)
+#   python build_quizzes.py PDF_폴더 --out quizzes.ndjson       # NDJSON 한 줄 = 퀴즈 하나
+# 옵션: --questions 10 --types mixed --workers 4 --llm-concurrency 2 --max-tokens 5000 --checkpoint 파일
+# - 텍스트 추출/정리는 프로세스 풀(--workers), LLM 생성은 동시 --llm-concurrency개까지
+#   (문제가 많으면 생성 하나가 다시 QUIZ_FANOUT_CONCURRENCY개로 나뉘므로 Ollama 슬롯 수에 맞게 조절)
+# - 끝난 파일은 체크포인트(JSONL)에 기록 → 중단 후 다시 실행하면 이어서 진행 (실패한 파일은 다시 시도)
+#   저장 직전에 "writing"을 기록해 두고, 저장과 "done" 기록 사이에 멈췄으면 다시 실행할 때
+#   이미 저장된 퀴즈(DB: 같은 사용자/이름/시각 이후, NDJSON: 같은 source)를 찾아 완료로 처리 (중복 저장 방지)
+# - 실행 중인 서버의 퀴즈 목록 캐시는 프로세스 안에만 있으므로 DB로 넣은 퀴즈는 QUIZ_CACHE_TTL초 안에 목록에 보임
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from io import BytesIO
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Optional, Set, Tuple
+
+def extract(path: str, max_tokens: int) -> Dict:
+    """(프로세스 풀에서 실행) PDF 하나 추출 + 정리 + 토큰 제한"""
+    from pdf_utils import extract_clean_text, truncate_text
+
+    with open(path, "rb") as f:
+        pdf_file = BytesIO(f.read())
+    pdf_file.name = os.path.basename(path)
+    result = extract_clean_text(pdf_file)
+    if result is None:
+        return {"path": path, "pages": 0, "text": None}
+    return {
+        "path": path,
+        "pages": result.stats.pages,
+        "text": truncate_text(result.text, max_tokens=max_tokens),
+        "text_cleanup": result.stats.as_dict(),
+    }
+
+def generate(text: str, num_questions: int, question_types: str):
+    from quiz_generator import generate_quiz_from_text
+    return generate_quiz_from_text(text=text, num_questions=num_questions, question_types=question_types)
+
+def file_key(path: Path, root: Path) -> str:
+    """체크포인트 키 - 경로 + 크기 + 수정 시각 (파일이 바뀌면 다시 생성)"""
+    stat = path.stat()
+    return f"{path.relative_to(root).as_posix()}|{stat.st_size}|{int(stat.st_mtime)}"
+
+class Checkpoint:
+    def __init__(self, path: str):
+        self.path = path
+        self.done: Set[str] = set()
+        # 저장을 시작했지만 끝난 기록이 없는 파일 {key: writing 기록}
+        self.writing: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        if entry.get("status") == "done":
+                            self.done.add(entry["key"])
+                        if entry.get("status") == "writing":
+                            self.writing[entry["key"]] = entry
+                        else:
+                            self.writing.pop(entry["key"], None)
+        for key in self.done:
+            self.writing.pop(key, None)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def record(self, key: str, status: str, **info):
+        self._file.write(json.dumps({"key": key, "status": status, **info}, ensure_ascii=False) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+class QuizSink:
+    """생성된 퀴즈 저장 - DB(일괄 INSERT) 또는 NDJSON"""
+
+    def __init__(self, user_id: Optional[int], out_path: Optional[str]):
+        self.user_id = user_id
+        self.out = open(out_path, "a", encoding="utf-8") if out_path else None
+        if self.out is None:
+            from database import SessionLocal
+            self.Session = SessionLocal
+
+    def write(self, quiz: Dict) -> Optional[int]:
+        if self.out is not None:
+            self.out.write(json.dumps(quiz, ensure_ascii=False) + "\n")
+            self.out.flush()
+            return None
+
+        from quiz_store import bulk_create_quizzes
+        db = self.Session()
+        try:
+            quiz_id, = bulk_create_quizzes(db, self.user_id, [quiz])
+            db.commit()
+            return quiz_id
+        finally:
+            db.close()
+
+    def find(self, source: str, quiz_name: str, since: datetime) -> Tuple[bool, Optional[int]]:
+        """저장 도중 멈춘 파일의 퀴즈가 이미 저장됐는지 - (찾음, 퀴즈 id)"""
+        if self.out is not None:
+            self.out.flush()
+            with open(self.out.name, encoding="utf-8") as f:
+                return any(json.loads(line).get("source") == source for line in f if line.strip()), None
+
+        import models
+        db = self.Session()
+        try:
+            quiz_id = db.query(models.Quiz.id).filter(
+                models.Quiz.user_id == self.user_id,
+                models.Quiz.quiz_name == quiz_name,
+                models.Quiz.created_at >= since
+            ).order_by(models.Quiz.id).limit(1).scalar()
+            return quiz_id is not None, quiz_id
+        finally:
+            db.close()
+
+    def close(self):
+        if self.out is not None:
+            self.out.close()
+
+def run(args) -> int:
+    root = Path(args.folder).resolve()
+    pdfs = sorted(p for p in root.rglob("*") if p.suffix.lower() == ".pdf")
+    checkpoint = Checkpoint(args.checkpoint or str(root / ".build_quizzes.ckpt"))
+    sink = QuizSink(args.user_id, args.out)
+    for key, entry in checkpoint.writing.items():
+        found, quiz_id = sink.find(entry["source"], entry["quiz_name"], datetime.fromisoformat(entry["at"]))
+        if found:
+            checkpoint.record(key, "done", quiz_id=quiz_id, recovered=True)
+            checkpoint.done.add(key)
+    todo = [(p, file_key(p, root)) for p in pdfs]
+    todo = [(p, key) for p, key in todo if key not in checkpoint.done]
+    print(f"📚 PDF {len(pdfs)}개 중 {len(pdfs) - len(todo)}개 완료됨, {len(todo)}개 처리")
+    if not todo:
+        sink.close()
+        checkpoint.close()
+        return 0
+
+    started = time.perf_counter()
+    pages = questions = done = failed = 0
+    keys = {str(p): key for p, key in todo}
+
+    extract_pool = ProcessPoolExecutor(max_workers=args.workers)
+    llm_pool = ThreadPoolExecutor(max_workers=args.llm_concurrency, thread_name_prefix="quiz-llm")
+    # 추출이 생성보다 너무 앞서가지 않도록 (추출된 텍스트를 메모리에 쌓아두지 않음)
+    max_ahead = args.llm_concurrency * 2 + args.workers
+    queue = [str(p) for p, _ in todo]
+    extracting, generating = {}, {}
+
+    def report():
+        elapsed = time.perf_counter() - started
+        print(
+            f"⏱️ {done + failed}/{len(todo)}개 파일, {pages}쪽 ({pages / elapsed:.2f}쪽/s), "
+            f"문제 {questions}개 ({questions / elapsed * 60:.1f}개/분), 실패 {failed}"
+        )
+
+    def finish_failed(path: str, reason: str):
+        nonlocal failed
+        failed += 1
+        checkpoint.record(keys[path], "failed", reason=reason)
+        print(f"❌ {os.path.relpath(path, root)}: {reason}")
+
+    completed = False
+    try:
+        while queue or extracting or generating:
+            while queue and len(extracting) + len(generating) < max_ahead:
+                path = queue.pop(0)
+                extracting[extract_pool.submit(extract, path, args.max_tokens)] = path
+
+            finished, _ = wait(list(extracting) + list(generating), return_when=FIRST_COMPLETED)
+            for future in finished:
+                if future in extracting:
+                    path = extracting.pop(future)
+                    try:
+                        extracted = future.result()
+                    except Exception as e:
+                        finish_failed(path, f"추출 오류: {e}")
+                        continue
+                    pages += extracted["pages"]
+                    if not extracted["text"]:
+                        finish_failed(path, "텍스트 없음")
+                        continue
+                    gen = llm_pool.submit(generate, extracted["text"], args.questions, args.types)
+                    generating[gen] = extracted
+                else:
+                    extracted = generating.pop(future)
+                    path = extracted["path"]
+                    try:
+                        generated = future.result()
+                    except Exception as e:
+                        finish_failed(path, f"생성 오류: {e}")
+                        continue
+                    if not generated:
+                        finish_failed(path, "생성 실패")
+                        continue
+
+                    quiz = {
+                        "quiz_name": Path(path).stem,
+                        "source": os.path.relpath(path, root),
+                        "pages": extracted["pages"],
+                        "text_cleanup": extracted["text_cleanup"],
+                        "questions": [dict(q, question_order=i) for i, q in enumerate(generated)],
+                    }
+                    checkpoint.record(
+                        keys[path], "writing",
+                        source=quiz["source"], quiz_name=quiz["quiz_name"], at=datetime.utcnow().isoformat()
+                    )
+                    try:
+                        quiz_id = sink.write(quiz)
+                    except Exception as e:
+                        finish_failed(path, f"저장 오류: {e}")
+                        continue
+                    checkpoint.record(keys[path], "done", questions=len(generated), quiz_id=quiz_id)
+                    done += 1
+                    questions += len(generated)
+                    print(f"✅ {quiz['source']}: {len(generated)}문제" + (f" (퀴즈 {quiz_id})" if quiz_id else ""))
+                    if done % args.report_every == 0:
+                        report()
+        completed = True
+    except KeyboardInterrupt:
+        print("\n⏸️ 중단됨 - 같은 명령으로 다시 실행하면 이어서 진행합니다")
+        report()
+        return 130
+    finally:
+        # 예외로 빠져나갈 때는 남은 작업을 취소하고 기다리지 않음
+        extract_pool.shutdown(wait=completed, cancel_futures=not completed)
+        llm_pool.shutdown(wait=completed, cancel_futures=not completed)
+        sink.close()
+        checkpoint.close()
+
+    report()
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PDF 폴더로 퀴즈 일괄 생성")
+    parser.add_argument("folder", help="PDF 폴더 (하위 폴더 포함)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--user-id", type=int, help="퀴즈를 저장할 사용자 id (DB에 저장)")
+    target.add_argument("--out", help="NDJSON 출력 파일 (DB 대신)")
+    parser.add_argument("--questions", type=int, default=10, help="파일당 문제 수")
+    parser.add_argument("--types", default="mixed", choices=["mixed", "multiple_choice", "short_answer"])
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="추출 프로세스 수")
+    parser.add_argument("--llm-concurrency", type=int, default=2, help="동시에 생성할 파일 수")
+    parser.add_argument("--max-tokens", type=int, default=5000, help="프롬프트에 넣을 텍스트 최대 토큰")
+    parser.add_argument("--checkpoint", help="체크포인트 파일 (기본: PDF 폴더/.build_quizzes.ckpt)")
+    parser.add_argument("--report-every", type=int, default=10, help="이 파일 수마다 처리량 출력")
+    sys.exit(run(parser.parse_args()))
@@ -0,0 +1,497 @@
+# backend/bulk_transfer.py
+"""
+NDJSON 일괄 가져오기 / 내보내기 (퀴즈, 진행 기록)
+- 가져오기: 요청 본문을 조각 단위로 읽으며 줄마다 검증 → IMPORT_BATCH_ROWS행씩 한 트랜잭션으로 저장
+  (본문 전체를 메모리에 올리지 않음, gzip은 스트리밍으로 풀기)
+- 잘못된 줄은 건너뛰고 (줄 번호, 오류)로 보고 - 배치 저장이 실패하면 그 배치만 한 줄씩 다시 저장해 원인 줄을 찾음
+- 내보내기: id 순서로 EXPORT_PAGE_SIZE개씩 읽어 한 줄에 하나씩 스트리밍 (gzip은 CompressionMiddleware가 처리)
+- 퀴즈 내보내기 한 줄은 그대로 다시 가져올 수 있음 (id 등 모르는 필드는 무시)
+- 진행 기록(progress)은 내보낸 형식(SyncProgress) 그대로 - 문제별 진행 상태를 덮어씀 (풀이 횟수를 다시 세지 않음)
+- 풀이 결과(attempts)는 한 줄 = 풀이 한 번 (question_id, is_correct, answered_at) - /api/sync/progress와 같은 규칙으로 반영
+  (배치 안에서는 푼 시각 순서로 적용하지만 배치끼리는 파일 순서 - 파일을 푼 시각 순으로 정렬해 두면 정확)
+  모르는 필드가 있는 줄은 거부 (진행 기록 파일을 attempts로 보내면 줄마다 오류)
+"""
+import json
+import os
+import time
+import zlib
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+import item_stats
+import models
+import schemas
+import sync
+from database import SessionLocal
+from quiz_store import bulk_create_quizzes
+from serialization import dumps, get_adapter
+
+# 한 트랜잭션에 넣을 행 수 (퀴즈는 퀴즈 1 + 문제 수로 셈)
+IMPORT_BATCH_ROWS = int(os.getenv("IMPORT_BATCH_ROWS", "2000"))
+# 내보내기 시 한 번에 읽을 행 수
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "200"))
+# 이보다 긴 줄은 읽지 않고 오류로 보고
+MAX_LINE_BYTES = 1024 * 1024
+# 응답에 담을 오류 수 (나머지는 개수만)
+MAX_REPORTED_ERRORS = 100
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+class MalformedBody(ValueError):
+    """gzip이 깨졌거나 중간에 끊긴 본문"""
+
+class NDJSONReader:
+    """
+    바이트 조각 → (줄 번호, 줄)
+    gzip=None이면 첫 두 바이트로 gzip 여부를 판단 (gzip 파일을 Content-Encoding 없이 올려도 됨)
+    MAX_LINE_BYTES를 넘는 줄은 버리고 (줄 번호, None)
+    """
+
+    def __init__(self, gzip: Optional[bool] = None):
+        self.gzip = gzip
+        self._decompressor = None
+        self._head = b""
+        self._buffer = bytearray()
+        self._line_no = 0
+        self._oversized = False
+
+    def feed(self, chunk: bytes) -> Iterator[Tuple[int, Optional[bytes]]]:
+        if self.gzip is None:
+            self._head += chunk
+            if len(self._head) < len(_GZIP_MAGIC):
+                return
+            chunk, self._head = self._head, b""
+            self.gzip = chunk.startswith(_GZIP_MAGIC)
+        if self.gzip:
+            for data in self._decompress(chunk):
+                yield from self._split(data)
+        else:
+            yield from self._split(chunk)
+
+    def close(self) -> Iterator[Tuple[int, Optional[bytes]]]:
+        if self._head:
+            yield from self._split(self._head)
+            self._head = b""
+        if self._decompressor is not None and not self._decompressor.eof:
+            raise MalformedBody("gzip 데이터가 중간에 끊겼습니다")
+        if self._buffer.strip() or self._oversized:
+            yield from self._emit(bytes(self._buffer))
+        self._buffer.clear()
+
+    def _decompress(self, chunk: bytes) -> Iterator[bytes]:
+        # 압축 폭탄에 대비해 MAX_LINE_BYTES씩 나눠 풀기, 여러 gzip 멤버를 이어 붙인 파일도 처리
+        try:
+            while chunk:
+                if self._decompressor is None or self._decompressor.eof:
+                    self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                decompressor = self._decompressor
+                yield decompressor.decompress(chunk, MAX_LINE_BYTES)
+                while decompressor.unconsumed_tail:
+                    yield decompressor.decompress(decompressor.unconsumed_tail, MAX_LINE_BYTES)
+                chunk = decompressor.unused_data if decompressor.eof else b""
+        except zlib.error as e:
+            raise MalformedBody(f"gzip 데이터를 풀 수 없습니다: {e}")
+
+    def _split(self, data: bytes) -> Iterator[Tuple[int, Optional[bytes]]]:
+        start = 0
+        while True:
+            end = data.find(b"\n", start)
+            if end < 0:
+                break
+            self._buffer += data[start:end]
+            yield from self._emit(bytes(self._buffer))
+            self._buffer.clear()
+            start = end + 1
+        self._buffer += data[start:]
+        if len(self._buffer) > MAX_LINE_BYTES:
+            self._oversized = True
+            self._buffer.clear()
+
+    @property
+    def line_no(self) -> int:
+        return self._line_no
+
+    def _emit(self, line: bytes) -> Iterator[Tuple[int, Optional[bytes]]]:
+        self._line_no += 1
+        if self._oversized:
+            self._oversized = False
+            yield self._line_no, None
+        elif line.strip():
+            yield self._line_no, line
+
+class ImportReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.lines = 0
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[Dict] = []
+        # 종류별 추가 집계 (퀴즈 가져오기의 문제 수 등)
+        self.counts: Dict[str, int] = {}
+        self.aborted: Optional[str] = None
+
+    def error(self, line: int, message: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message[:300]})
+
+    def as_dict(self) -> Dict:
+        seconds = time.perf_counter() - self.started
+        return {
+            "lines": self.lines,
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            **self.counts,
+            "seconds": round(seconds, 3),
+            "records_per_second": round(self.imported / seconds, 1) if seconds > 0 else 0.0,
+            "errors": sorted(self.errors, key=lambda e: e["line"]),
+            "errors_truncated": self.failed > len(self.errors),
+            "aborted": self.aborted,
+        }
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in err['loc']) or '(줄)'}: {err['msg']}" for err in e.errors()
+    )
+
+def _db_message(e: SQLAlchemyError) -> str:
+    return str(getattr(e, "orig", None) or e).splitlines()[0]
+
+class _Importer(ABC):
+    """줄 검증(parse)과 배치 저장(write)만 종류별로 다름"""
+
+    def __init__(self, user_id: int):
+        self.user_id = user_id
+        self.report = ImportReport()
+        # 이번 write에서 바꿀 것이 없어 건너뛴 항목 수 (커밋된 뒤에만 집계에 반영)
+        self._unchanged = 0
+
+    @abstractmethod
+    def parse(self, line: bytes) -> Tuple[object, int]:
+        """(저장할 항목, 행 수) - 잘못된 줄이면 ValueError/ValidationError"""
+
+    @abstractmethod
+    def write(self, db: Session, items: List) -> List[Tuple[int, str]]:
+        """
+        배치 저장 (커밋은 호출 측), 반영하지 못한 항목의 (배치 안 위치, 오류) 목록
+        이미 같은 상태라 건너뛴 항목은 self._unchanged에 셈 (imported에서 빠짐)
+        """
+
+    def committed(self, items: List):
+        """커밋된 배치 집계 (종류별 추가 집계가 필요하면 재정의)"""
+
+    def flush(self, batch: List[Tuple[int, object]]):
+        """(줄 번호, 항목) 배치를 한 트랜잭션으로 - 실패하면 한 줄씩 다시"""
+        self.report.batches += 1
+        db = SessionLocal()
+        try:
+            try:
+                self._commit(db, batch)
+                return
+            except SQLAlchemyError as e:
+                db.rollback()
+                if len(batch) == 1:
+                    self.report.error(batch[0][0], f"저장 실패: {_db_message(e)}")
+                    return
+            for entry in batch:
+                try:
+                    self._commit(db, [entry])
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    self.report.error(entry[0], f"저장 실패: {_db_message(e)}")
+        finally:
+            db.close()
+
+    def _commit(self, db: Session, batch: List[Tuple[int, object]]):
+        items = [item for _, item in batch]
+        # 실패한 배치를 한 줄씩 다시 저장할 때 앞선 시도의 집계가 남지 않도록 매번 새로 셈
+        self._unchanged = 0
+        rejected = self.write(db, items)
+        db.commit()
+        for index, message in rejected:
+            self.report.error(batch[index][0], message)
+        self.report.imported += len(batch) - len(rejected) - self._unchanged
+        self.committed(items)
+
+class QuizImporter(_Importer):
+    """한 줄 = 퀴즈 하나 (QuizCreate 형식, 순서 필드가 없으면 줄 안의 위치)"""
+
+    def __init__(self, user_id: int):
+        super().__init__(user_id)
+        self.report.counts["questions"] = 0
+        self._adapter = get_adapter(schemas.QuizCreate)
+
+    def parse(self, line: bytes):
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("JSON 객체가 아닙니다")
+        for order, question in enumerate(record.get("questions") or []):
+            if isinstance(question, dict):
+                question.setdefault("question_order", order)
+                for answer_order, answer in enumerate(question.get("answers") or []):
+                    if isinstance(answer, dict):
+                        answer.setdefault("answer_order", answer_order)
+        quiz = self._adapter.validate_python(record).model_dump()
+        return quiz, 1 + len(quiz["questions"])
+
+    def write(self, db: Session, items: List[Dict]):
+        bulk_create_quizzes(db, self.user_id, items)
+        return []
+
+    def committed(self, items: List[Dict]):
+        self.report.counts["questions"] += sum(len(quiz["questions"]) for quiz in items)
+
+class ProgressImporter(_Importer):
+    """
+    한 줄 = 문제 하나의 진행 상태 (내보낸 SyncProgress 형식 - id/user_id는 무시하고 현재 사용자로)
+    이미 있는 진행 기록은 가져온 쪽이 더 최근에 푼 기록일 때만 덮어씀
+    """
+
+    def __init__(self, user_id: int):
+        super().__init__(user_id)
+        self.report.counts["unchanged"] = 0
+        self._adapter = get_adapter(schemas.SyncProgress)
+        self._quiz_of: Dict[int, int] = {}
+
+    def parse(self, line: bytes):
+        return self._adapter.validate_json(line), 1
+
+    def write(self, db: Session, items: List[schemas.SyncProgress]):
+        question_ids = {item.question_id for item in items}
+        # 자기 퀴즈의 문제만 (다른 사용자의 문제는 없는 문제로 보고)
+        self._quiz_of.update(
+            db.query(models.QuizQuestion.id, models.QuizQuestion.quiz_id)
+            .join(models.Quiz, models.Quiz.id == models.QuizQuestion.quiz_id)
+            .filter(models.QuizQuestion.id.in_(question_ids), models.Quiz.user_id == self.user_id)
+        )
+        rows = {
+            p.question_id: p
+            for p in db.query(models.UserProgress).filter(
+                models.UserProgress.user_id == self.user_id,
+                models.UserProgress.question_id.in_(question_ids)
+            )
+        }
+        rejected = []
+        for index, item in enumerate(items):
+            if item.question_id not in self._quiz_of:
+                rejected.append((index, f"문제를 찾을 수 없습니다: {item.question_id}"))
+                continue
+            progress = rows.get(item.question_id)
+            last_reviewed_at = sync._to_utc_naive(item.last_reviewed_at) if item.last_reviewed_at else None
+            if progress is None:
+                progress = models.UserProgress(user_id=self.user_id, question_id=item.question_id)
+                db.add(progress)
+                rows[item.question_id] = progress
+            elif progress.last_reviewed_at and (last_reviewed_at is None or progress.last_reviewed_at >= last_reviewed_at):
+                self._unchanged += 1
+                continue
+            progress.is_correct = item.is_correct
+            progress.attempt_count = item.attempt_count
+            progress.correct_count = item.correct_count
+            progress.interval_days = item.interval_days
+            progress.next_review_date = sync._to_utc_naive(item.next_review_date)
+            progress.last_reviewed_at = last_reviewed_at
+        return rejected
+
+    def committed(self, items: List[schemas.SyncProgress]):
+        self.report.counts["unchanged"] += self._unchanged
+        # 풀이 횟수를 통째로 바꿨으므로 증분 대신 해당 퀴즈 통계를 다시 계산
+        quiz_ids = sorted({self._quiz_of[item.question_id] for item in items if item.question_id in self._quiz_of})
+        if not quiz_ids:
+            return
+        db = SessionLocal()
+        try:
+            item_stats.reconcile_quizzes(db, quiz_ids)
+        finally:
+            db.close()
+
+class AttemptImporter(_Importer):
+    """한 줄 = 풀이 결과 하나 (ImportedAttempt 형식)"""
+
+    def __init__(self, user_id: int):
+        super().__init__(user_id)
+        self._adapter = get_adapter(schemas.ImportedAttempt)
+
+    def parse(self, line: bytes):
+        return self._adapter.validate_json(line), 1
+
+    def write(self, db: Session, items: List[schemas.ImportedAttempt]):
+        _, skipped = sync.apply_progress(db, self.user_id, [
+            (result.question_id, result.is_correct, result.answered_at, result.response_ms) for result in items
+        ])
+        missing = set(skipped)
+        return [
+            (index, f"문제를 찾을 수 없습니다: {result.question_id}")
+            for index, result in enumerate(items) if result.question_id in missing
+        ]
+
+IMPORTERS: Dict[str, Callable[[int], _Importer]] = {
+    "quizzes": QuizImporter,
+    "progress": ProgressImporter,
+    "attempts": AttemptImporter,
+}
+
+async def import_ndjson(
+    importer: _Importer,
+    chunks: AsyncIterator[bytes],
+    gzip: Optional[bool] = None,
+    flush: Optional[Callable] = None
+) -> ImportReport:
+    """
+    본문 조각을 읽으며 줄마다 검증하고 배치가 차면 저장
+    flush: 배치 저장 실행 방법 (기본은 바로 호출, 서버에서는 스레드로 넘겨 이벤트 루프를 막지 않음)
+    gzip이 깨지면 거기서 멈추고 report.aborted에 기록 (앞에서 읽은 줄은 저장)
+    """
+    report = importer.report
+    reader = NDJSONReader(gzip)
+    batch: List[Tuple[int, object]] = []
+    rows = 0
+
+    async def run_flush():
+        nonlocal batch, rows
+        pending, batch, rows = batch, [], 0
+        if flush is None:
+            importer.flush(pending)
+        else:
+            await flush(importer.flush, pending)
+
+    def handle(line_no: int, line: Optional[bytes]) -> bool:
+        """줄 하나 검증 후 배치에 추가, 배치가 찼으면 True"""
+        nonlocal rows
+        report.lines += 1
+        if line is None:
+            report.error(line_no, f"줄이 너무 깁니다 (최대 {MAX_LINE_BYTES} 바이트)")
+            return False
+        try:
+            item, weight = importer.parse(line)
+        except ValidationError as e:
+            report.error(line_no, _validation_message(e))
+            return False
+        except ValueError as e:  # JSONDecodeError 포함
+            report.error(line_no, f"잘못된 JSON: {e}")
+            return False
+        batch.append((line_no, item))
+        rows += weight
+        return rows >= IMPORT_BATCH_ROWS
+
+    try:
+        async for chunk in chunks:
+            for line_no, line in reader.feed(chunk):
+                if handle(line_no, line):
+                    await run_flush()
+        for line_no, line in reader.close():
+            handle(line_no, line)
+    except MalformedBody as e:
+        report.aborted = str(e)
+        report.error(reader.line_no + 1, str(e))
+    if batch:
+        await run_flush()
+    return report
+
+def iter_quiz_export(user_id: int) -> Iterator[bytes]:
+    """
+    사용자 퀴즈를 한 줄에 하나씩 (QuizResponse 형식, 문제/보기 포함)
+    ORM 객체를 만들지 않고 테이블마다 행만 읽어 dict로 조립 (문제/보기 수십만 개에서 ORM 적재가 대부분의 시간)
+    """
+    Quiz, Question, Answer = models.Quiz, models.QuizQuestion, models.QuizAnswer
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            quizzes = db.execute(
+                select(Quiz.id, Quiz.quiz_name, Quiz.user_id, Quiz.created_at)
+                .where(Quiz.user_id == user_id, Quiz.id > last_id)
+                .order_by(Quiz.id)
+                .limit(EXPORT_PAGE_SIZE)
+            ).all()
+            if not quizzes:
+                break
+            quiz_ids = [row.id for row in quizzes]
+
+            questions: Dict[int, List[Dict]] = {quiz_id: [] for quiz_id in quiz_ids}
+            by_id: Dict[int, Dict] = {}
+            for row in db.execute(
+                select(
+                    Question.id, Question.quiz_id, Question.question_text, Question.question_type,
+                    Question.question_order, Question.correct_answer
+                )
+                .where(Question.quiz_id.in_(quiz_ids))
+                .order_by(Question.id)
+            ):
+                question = {
+                    "id": row.id,
+                    "question_text": row.question_text,
+                    "question_type": row.question_type,
+                    "question_order": row.question_order,
+                    "correct_answer": row.correct_answer,
+                    "answers": [],
+                }
+                questions[row.quiz_id].append(question)
+                by_id[row.id] = question
+
+            for row in db.execute(
+                select(Answer.id, Answer.question_id, Answer.answer_text, Answer.is_correct, Answer.answer_order)
+                .join(Question, Answer.question_id == Question.id)
+                .where(Question.quiz_id.in_(quiz_ids))
+                .order_by(Answer.id)
+            ):
+                by_id[row.question_id]["answers"].append({
+                    "id": row.id,
+                    "answer_text": row.answer_text,
+                    "is_correct": bool(row.is_correct),
+                    "answer_order": row.answer_order,
+                })
+
+            yield b"".join(
+                dumps({
+                    "id": row.id,
+                    "quiz_name": row.quiz_name,
+                    "user_id": row.user_id,
+                    "created_at": row.created_at.isoformat() if row.created_at else None,
+                    "questions": questions[row.id],
+                }) + b"\n"
+                for row in quizzes
+            )
+            last_id = quiz_ids[-1]
+    finally:
+        db.close()
+
+def iter_progress_export(user_id: int) -> Iterator[bytes]:
+    """사용자 진행 기록을 한 줄에 하나씩 (SyncProgress 형식)"""
+    adapter = get_adapter(List[schemas.SyncProgress])
+    db = SessionLocal()
+    try:
+        last_id = 0
+        while True:
+            # 진행 기록은 하위 행이 없는 작은 행이라 퀴즈보다 크게 읽음
+            page = (
+                db.query(models.UserProgress)
+                .filter(models.UserProgress.user_id == user_id, models.UserProgress.id > last_id)
+                .order_by(models.UserProgress.id)
+                .limit(EXPORT_PAGE_SIZE * 5)
+                .all()
+            )
+            if not page:
+                break
+            # 페이지당 pydantic-core 호출 한 번
+            items = adapter.dump_python(adapter.validate_python(page, from_attributes=True), mode="json")
+            yield b"".join(dumps(item) + b"\n" for item in items)
+            last_id = page[-1].id
+            # 다음 페이지를 읽기 전에 세션에서 떼어내 메모리를 일정하게
+            db.expunge_all()
+    finally:
+        db.close()
+
+EXPORTERS: Dict[str, Callable[[int], Iterator[bytes]]] = {
+    "quizzes": iter_quiz_export,
+    "progress": iter_progress_export,
+}
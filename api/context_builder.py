@@ -0,0 +1,165 @@
+# backend/context_builder.py
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+
+import models
+from feynman_prompts import LearningPhase, feynman_engine
+from tokenizer import count_tokens, truncate_to_tokens
+
+# 그대로 유지할 최근 메시지 수
+RECENT_TURNS = 8
+# 요약으로 접을 때 한 번에 처리할 메시지 수 (요약 호출 횟수를 줄이기 위해 묶어서 처리)
+SUMMARY_FOLD_BATCH = 6
+# 요약 최대 토큰 수
+SUMMARY_MAX_TOKENS = 400
+
+# 단계별 프롬프트 토큰 예산
+PHASE_TOKEN_BUDGETS = {
+    LearningPhase.KNOWLEDGE_CHECK: 1024,
+    LearningPhase.FIRST_EXPLANATION: 2048,
+    LearningPhase.SELF_REFLECTION_1: 2048,
+    LearningPhase.AI_EXPLANATION: 3072,
+    LearningPhase.SECOND_EXPLANATION: 2048,
+    LearningPhase.SELF_REFLECTION_2: 2048,
+    LearningPhase.EVALUATION: 4096,
+}
+DEFAULT_TOKEN_BUDGET = 2048
+
+ROLE_LABELS = {"user": "학생", "assistant": "튜터"}
+
+def _format_message(message: models.Message) -> str:
+    label = ROLE_LABELS.get(message.role, message.role or "")
+    return f"{label}: {message.content or ''}"
+
+def llm_summarize(previous_summary: Optional[str], messages: List[models.Message]) -> str:
+    """이전 요약 + 새로 밀려난 메시지를 합쳐 새 요약 생성"""
+    from ollama_client import generate
+
+    transcript = "\n".join(_format_message(m) for m in messages)
+    prompt = f"""다음은 파인만 학습 대화의 기존 요약과 이어지는 대화입니다.
+학생이 이해한 내용, 오개념, 막혔던 부분을 중심으로 {SUMMARY_MAX_TOKENS} 토큰 이내의 한국어 요약을 작성하세요.
+요약만 출력하세요.
+
+기존 요약:
+{previous_summary or '(없음)'}
+
+이어지는 대화:
+{transcript}
+"""
+    summary = generate(prompt, options={"temperature": 0, "num_predict": SUMMARY_MAX_TOKENS})
+    if summary:
+        return summary.strip()
+    return extractive_summarize(previous_summary, messages)
+
+def extractive_summarize(previous_summary: Optional[str], messages: List[models.Message]) -> str:
+    """LLM을 쓸 수 없을 때: 각 메시지의 첫 문장만 이어 붙임"""
+    lines = [previous_summary] if previous_summary else []
+    for m in messages:
+        first = (m.content or "").strip().split("\n")[0]
+        lines.append(f"{ROLE_LABELS.get(m.role, m.role)}: {first[:120]}")
+    return "\n".join(lines)
+
+class ConversationContextBuilder:
+    """
+    대화 컨텍스트 관리
+    - 최근 RECENT_TURNS개 메시지는 원문 그대로
+    - 그 이전 메시지는 ChatRoom.context_summary에 누적 요약
+    - 학습 단계별 토큰 예산 안에서 프롬프트 조립
+    """
+
+    def __init__(
+        self,
+        recent_turns: int = RECENT_TURNS,
+        fold_batch: int = SUMMARY_FOLD_BATCH,
+        summarizer: Optional[Callable] = None
+    ):
+        self.recent_turns = recent_turns
+        self.fold_batch = fold_batch
+        self.summarizer = summarizer or llm_summarize
+
+    def get_recent_messages(self, db: Session, room: models.ChatRoom) -> List[models.Message]:
+        """
+        요약되지 않은 메시지만 조회하고, 너무 많이 쌓였으면 오래된 것부터 요약으로 접기
+        평소에는 최대 recent_turns + fold_batch개만 읽음
+        """
+        query = db.query(models.Message).filter(models.Message.room_id == room.id)
+        if room.summary_until is not None:
+            query = query.filter(models.Message.created_at > room.summary_until)
+        pending = query.order_by(models.Message.created_at).all()
+
+        if len(pending) >= self.recent_turns + self.fold_batch:
+            to_fold = pending[:-self.recent_turns]
+            summary = self.summarizer(room.context_summary, to_fold)
+            room.context_summary = truncate_to_tokens(summary, SUMMARY_MAX_TOKENS, keep="tail")
+            room.summary_until = to_fold[-1].created_at
+            db.commit()
+            pending = pending[-self.recent_turns:]
+
+        return pending[-self.recent_turns:]
+
+    def build(
+        self,
+        db: Session,
+        room: models.ChatRoom,
+        phase: LearningPhase,
+        user_message: str,
+        context: Optional[Dict] = None
+    ) -> Dict:
+        """
+        LLM에 보낼 프롬프트 조립
+
+        Returns:
+            {"prompt": str, "prefix": str, "suffix": str, "prompt_tokens": int, "budget": int}
+            prefix는 단계별로 고정된 부분이므로 prompt_cache.prefix_sessions로 보내면 KV 캐시 재사용
+        """
+        budget = PHASE_TOKEN_BUDGETS.get(phase, DEFAULT_TOKEN_BUDGET)
+        context = context or {
+            "concept": room.current_concept,
+            "knowledge_level": room.knowledge_level,
+        }
+
+        prefix, dynamic = feynman_engine.get_prompt_parts(phase, context)
+        recent = self.get_recent_messages(db, room)
+
+        remaining = budget - count_tokens(prefix) - count_tokens(dynamic)
+        user_block = f"{ROLE_LABELS['user']}: {user_message}\n{ROLE_LABELS['assistant']}:"
+        user_block = truncate_to_tokens(user_block, max(remaining // 2, 0), keep="tail")
+        remaining -= count_tokens(user_block)
+
+        summary_block = ""
+        if room.context_summary:
+            summary_block = "[이전 대화 요약]\n" + truncate_to_tokens(
+                room.context_summary, max(min(SUMMARY_MAX_TOKENS, remaining // 3), 0), keep="tail"
+            )
+            remaining -= count_tokens(summary_block)
+
+        # 최신 메시지부터 예산이 허락하는 만큼 포함
+        turns = []
+        for message in reversed(recent):
+            line = _format_message(message)
+            cost = count_tokens(line)
+            if cost > remaining:
+                break
+            turns.append(line)
+            remaining -= cost
+        turns.reverse()
+
+        sections = [dynamic] if dynamic else []
+        if summary_block:
+            sections.append(summary_block)
+        if turns:
+            sections.append("[최근 대화]\n" + "\n".join(turns))
+        sections.append(user_block)
+        prefix += "\n\n"
+        suffix = "\n\n".join(sections)
+        prompt = prefix + suffix
+
+        return {
+            "prompt": prompt,
+            "prefix": prefix,
+            "suffix": suffix,
+            "prompt_tokens": count_tokens(prompt),
+            "budget": budget,
+        }
+
+context_builder = ConversationContextBuilder()
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, SingletonThreadPool
 import os
 from dotenv import load_dotenv
 
@@ -8,7 +10,123 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# 엔진 프로필: auto(URL로 결정) | default | sqlite | sqlite-thread | postgres
+DB_PROFILE = os.getenv("DB_PROFILE", "auto")
+
+# SQLite 튜닝
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Postgres 커넥션 풀 / 세션 설정
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"))
+# 같은 쿼리를 몇 번 실행하면 서버 측 prepared statement로 바꿀지 (psycopg 3 전용, 0이면 첫 실행부터)
+DB_PREPARE_THRESHOLD = int(os.getenv("DB_PREPARE_THRESHOLD", "1"))
+
+def _default_engine(url: str) -> Engine:
+    engine = create_engine(url)
+    if url.startswith("sqlite"):
+        _install_sqlite_pragmas(engine, tuned=False)
+    return engine
+
+def _sqlite_engine(url: str) -> Engine:
+    """
+    WAL + synchronous=NORMAL: 읽기와 쓰기가 서로 막지 않고, 커밋마다 fsync하지 않음
+    (체크포인트 때만 동기화 - 전원 장애 시 마지막 몇 커밋만 잃을 수 있음)
+    연결은 세션 하나가 독점하고 반납 후 다른 스레드가 재사용
+    """
+    engine = create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+    )
+    _install_sqlite_pragmas(engine, tuned=True)
+    return engine
+
+def _sqlite_thread_engine(url: str) -> Engine:
+    """
+    스레드마다 연결 하나 (SingletonThreadPool)
+    배치 스크립트나 워커처럼 스레드당 세션이 하나뿐인 곳에서만 사용
+    - 이벤트 루프 스레드에서 여러 세션이 동시에 열리는 API 서버에는 쓰지 말 것
+    """
+    engine = create_engine(
+        url,
+        poolclass=SingletonThreadPool,
+        pool_size=DB_POOL_SIZE + DB_MAX_OVERFLOW,
+        connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+    )
+    _install_sqlite_pragmas(engine, tuned=True)
+    return engine
+
+def _install_sqlite_pragmas(engine: Engine, tuned: bool):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # SQLite는 연결마다 외래 키를 켜야 ON DELETE CASCADE가 동작함
+        cursor.execute("PRAGMA foreign_keys=ON")
+        if tuned:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+            cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+def _postgres_engine(url: str) -> Engine:
+    """
+    크기를 정한 QueuePool + pool_pre_ping(끊긴 연결 자동 교체)
+    statement_timeout으로 오래 걸리는 쿼리가 연결을 붙잡지 못하게 함
+    """
+    connect_args = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    if make_url(url).get_driver_name() == "psycopg":
+        # psycopg 3: 반복 실행되는 쿼리를 서버 측 prepared statement로
+        # (psycopg2는 서버 측 prepare를 지원하지 않아 이 설정이 적용되지 않음)
+        connect_args["prepare_threshold"] = DB_PREPARE_THRESHOLD
+    return create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+        pool_use_lifo=True,
+        connect_args=connect_args,
+    )
+
+ENGINE_PROFILES = {
+    "default": _default_engine,
+    "sqlite": _sqlite_engine,
+    "sqlite-thread": _sqlite_thread_engine,
+    "postgres": _postgres_engine,
+}
+
+def resolve_profile(url: str, profile: str = "auto") -> str:
+    """auto면 URL 스킴으로 프로필 결정"""
+    if profile != "auto":
+        if profile not in ENGINE_PROFILES:
+            raise ValueError(f"알 수 없는 DB_PROFILE: {profile} (가능: auto, {', '.join(ENGINE_PROFILES)})")
+        return profile
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        # 메모리 DB는 연결마다 따로 생기므로 풀/WAL 튜닝 대상이 아님
+        return "sqlite" if parsed.database not in (None, "", ":memory:") else "default"
+    if backend == "postgresql":
+        return "postgres"
+    return "default"
+
+def build_engine(url: str, profile: str = "auto") -> Engine:
+    return ENGINE_PROFILES[resolve_profile(url, profile)](url)
+
+engine = build_engine(DATABASE_URL, DB_PROFILE)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
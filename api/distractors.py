@@ -0,0 +1,258 @@
+# backend/distractors.py
+"""
+원문 용어 색인으로 4지선다 오답 보기 만들기 (LLM 추가 호출 없음)
+- PDF에서 추출한 텍스트를 한 번 훑어 명사 어간 / 연속 명사구(가상 메모리) / 영문 약어를 빈도와 함께 색인
+- 용어를 유형(숫자, 약어, 영문, 명사구, 전문 용어, 일반 명사)별로 나눠 두고
+  정답과 같은 유형에서 자주 나오고 길이가 비슷한 용어를 오답으로 고름
+- 정답이 문장이면 그 안의 용어 하나를 같은 유형의 다른 용어로 바꾼 문장을 오답으로
+- 정답이 숫자면 같은 단위의 다른 숫자
+정답/다른 보기와 같거나 서로 포함되는 후보는 제외 (정답이 두 개가 되지 않게)
+"""
+import random
+import re
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+
+from korean_nlp import is_technical_term, split_sentences, tokenize
+
+# 색인할 최소 어간 길이 (한 글자 명사는 대부분 의존 명사/대명사)
+MIN_TERM_CHARS = 2
+# 후보를 고를 때 상위 몇 개 중에서 무작위로 뽑을지 (늘 같은 오답이 나오지 않게)
+CANDIDATE_POOL = 12
+# 이보다 어절이 많은 정답은 문장으로 보고 용어 바꾸기
+SENTENCE_WORDS = 4
+# 숫자 정답으로 볼 단위 최대 길이 - 이보다 길면 일반 용어로 취급
+MAX_UNIT_CHARS = 4
+
+STOP_NOUNS = frozenset({
+    '것', '수', '때', '등', '중', '이것', '그것', '저것', '경우', '다음', '위해', '통해', '대한', '대해',
+    '여러', '모든', '각각', '하나', '이후', '이전', '정도', '부분', '방법', '내용', '사용', '이용', '예를',
+    '우리', '그리고', '또한', '하지만', '그러나', '따라서', '즉', '및', '또는', '가장', '매우', '다른',
+})
+
+# 같은 유형 후보가 모자랄 때 빌려 올 유형
+_RELATED_TYPES = {
+    "term": ("noun", "phrase"),
+    "noun": ("term", "phrase"),
+    "phrase": ("term", "noun"),
+    "acronym": ("latin",),
+    "latin": ("acronym",),
+}
+
+# 명사구 앞말로 쓰지 않을 관형형/연결형 끝 글자 (실행 중인, 어떤, 이용해)
+_MODIFIER_ENDINGS = ('인', '한', '할', '된', '될', '는', '은', '을', '던', '떤', '런', '른', '해', '고', '서', '며', '로', '나', '적')
+
+_HANGUL_RE = re.compile(r'[가-힣]')
+_LATIN_RE = re.compile(r'[A-Za-z]')
+_ACRONYM_RE = re.compile(r'^[A-Z][A-Z0-9]{1,7}[a-z]?$')
+_NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+_SPACE_RE = re.compile(r'\s+')
+# 나열 구분 기호 - 이 앞뒤 어절은 명사구로 잇지 않음 (라운드 로빈, FCFS)
+_LIST_SEP_RE = re.compile(r'[,·/]')
+
+def term_type(term: str) -> str:
+    """용어 유형 - number / acronym / latin / phrase / term / noun"""
+    if _NUMBER_RE.fullmatch(term.replace(",", "")):
+        return "number"
+    if not _HANGUL_RE.search(term):
+        if _ACRONYM_RE.match(term):
+            return "acronym"
+        return "latin" if _LATIN_RE.search(term) else "other"
+    if " " in term:
+        return "phrase"
+    return "term" if is_technical_term(term) else "noun"
+
+def _key(text: str) -> str:
+    return _SPACE_RE.sub("", text).casefold()
+
+class TermIndex:
+    """원문 하나의 용어 빈도 색인 (유형별)"""
+
+    def __init__(self, counts: Counter):
+        self.counts = counts
+        self.buckets: Dict[str, List[str]] = {}
+        for term, _ in counts.most_common():
+            self.buckets.setdefault(term_type(term), []).append(term)
+
+    @classmethod
+    def build(cls, text: str) -> "TermIndex":
+        """
+        문장마다 어절을 분석해 명사 어간과 연속 명사구를 셈 (텍스트 길이에 선형, 나열 기호에서 명사구를 끊음)
+        어미를 못 뗀 서술어(변환한다, 이용해)가 섞이지 않도록 한글 어간은
+        조사가 붙어 나온 적이 있거나 전문 용어일 때만 색인
+        """
+        stems: Counter = Counter()
+        phrases: Counter = Counter()
+        with_particle: Set[str] = set()
+        for _, sentence in split_sentences(text):
+            for part in _LIST_SEP_RE.split(sentence):
+                previous = None
+                for token in tokenize(part):
+                    stem = token.stem
+                    if token.kind != "noun" or len(stem) < MIN_TERM_CHARS or stem in STOP_NOUNS or stem.isdigit():
+                        previous = None
+                        continue
+                    stems[stem] += 1
+                    # 는/은은 동사 관형형(만드는, 제공하는)과 겹치므로 명사 확인에 쓰지 않음
+                    if token.particle and token.particle not in ('는', '은'):
+                        with_particle.add(stem)
+                    # 조사 없이 이어진 명사 두 개는 명사구 (가상 메모리, 페이지 테이블)
+                    if previous is not None and not previous.particle and not previous.stem.endswith(_MODIFIER_ENDINGS):
+                        phrases[(previous.stem, stem)] += 1
+                    previous = token
+
+        def is_noun(stem: str) -> bool:
+            return not _HANGUL_RE.search(stem) or stem in with_particle or is_technical_term(stem)
+
+        counts: Counter = Counter({stem: n for stem, n in stems.items() if is_noun(stem)})
+        for (head, tail), n in phrases.items():
+            if is_noun(tail):
+                counts[f"{head} {tail}"] += n
+        return cls(counts)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def candidates(self, kind: str) -> List[str]:
+        """같은 유형 후보 (빈도순), 모자라면 관련 유형을 뒤에"""
+        pool = list(self.buckets.get(kind, []))
+        for related in _RELATED_TYPES.get(kind, ()):
+            pool.extend(self.buckets.get(related, []))
+        return pool
+
+    def distractors(self, correct: str, existing: Iterable[str], count: int, rng: Optional[random.Random] = None) -> List[str]:
+        """
+        정답과 같은 유형의 그럴듯한 오답 최대 count개
+
+        Args:
+            existing: 이미 있는 보기 (정답 포함) - 이것들과 겹치는 후보는 제외
+        """
+        rng = rng or random
+        correct = correct.strip()
+        taken = {_key(correct)} | {_key(a) for a in existing}
+        if not correct or count <= 0:
+            return []
+
+        if _is_numeric(correct):
+            return _number_variants(correct, taken, count, rng)
+        if len(correct.split()) >= SENTENCE_WORDS:
+            return self._swap_terms(correct, taken, count, rng)
+
+        kind = term_type(correct)
+        scored = []
+        for term in self.candidates(kind):
+            if _overlaps(_key(term), taken):
+                continue
+            # 빈도가 높고 길이가 정답과 비슷할수록 그럴듯함
+            length_ratio = min(len(term), len(correct)) / max(len(term), len(correct))
+            same_kind = 1.0 if term_type(term) == kind else 0.5
+            scored.append((self.counts[term] * length_ratio * same_kind, term))
+            if len(scored) >= CANDIDATE_POOL * 4:
+                break
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return _pick([term for _, term in scored[:CANDIDATE_POOL]], taken, count, rng)
+
+    def _swap_terms(self, sentence: str, taken: Set[str], count: int, rng: random.Random) -> List[str]:
+        """문장 속 색인 용어(긴 것부터)를 같은 유형의 다른 용어로 바꾼 문장"""
+        found = sorted((term for term in self.counts if term in sentence), key=len, reverse=True)
+        results = []
+        for term in found:
+            kind = term_type(term)
+            replacements = [
+                r for r in self.candidates(kind)[:CANDIDATE_POOL * 2]
+                if term not in r and r not in term and not any(word in sentence for word in r.split())
+            ]
+            rng.shuffle(replacements)
+            for replacement in replacements:
+                candidate = _replace_term(sentence, term, replacement)
+                if _key(candidate) in taken:
+                    continue
+                taken.add(_key(candidate))
+                results.append(candidate)
+                break
+            if len(results) >= count:
+                break
+        return results
+
+# 받침 유무에 따라 바뀌는 조사 (받침 있음, 없음)
+_PARTICLE_PAIRS = (('으로', '로'), ('은', '는'), ('이', '가'), ('을', '를'), ('과', '와'))
+
+def _has_final_consonant(char: str) -> bool:
+    return '가' <= char <= '힣' and (ord(char) - 0xAC00) % 28 != 0
+
+def _replace_term(sentence: str, term: str, replacement: str) -> str:
+    """첫 번째 term을 replacement로 바꾸고 바로 뒤 조사를 받침에 맞춤 (주소을 → 주소를)"""
+    start = sentence.index(term)
+    rest = sentence[start + len(term):]
+    if _HANGUL_RE.match(replacement[-1]):
+        final = _has_final_consonant(replacement[-1])
+        for with_final, without_final in _PARTICLE_PAIRS:
+            for particle in (with_final, without_final):
+                if rest.startswith(particle) and (len(rest) == len(particle) or not _HANGUL_RE.match(rest[len(particle)])):
+                    rest = (with_final if final else without_final) + rest[len(particle):]
+                    break
+            else:
+                continue
+            break
+    return sentence[:start] + replacement + rest
+
+def _is_numeric(answer: str) -> bool:
+    """숫자 + 짧은 단위 (200, 4KB, 32비트, 3개)"""
+    match = _NUMBER_RE.search(answer)
+    return match is not None and len(answer) - len(match.group()) <= MAX_UNIT_CHARS
+
+def _overlaps(key: str, taken: Set[str]) -> bool:
+    """정답/보기와 같거나 서로 포함되면 (메모리 ⊂ 가상 메모리) 정답으로 읽힐 수 있음"""
+    return any(key == t or key in t or t in key for t in taken if t)
+
+def _pick(candidates: List[str], taken: Set[str], count: int, rng: random.Random) -> List[str]:
+    picked = []
+    for term in rng.sample(candidates, len(candidates)):
+        key = _key(term)
+        if _overlaps(key, taken):
+            continue
+        taken.add(key)
+        picked.append(term)
+        if len(picked) >= count:
+            break
+    return picked
+
+def _number_variants(correct: str, taken: Set[str], count: int, rng: random.Random) -> List[str]:
+    """정답의 첫 숫자만 바꾼 보기 (단위/문구 유지) - 200 → 100, 201, 400 …"""
+    match = _NUMBER_RE.search(correct)
+    value = float(match.group())
+    is_int = "." not in match.group()
+    options = {value + 1, value - 1, value * 2, value / 2, value + 10, value * 10}
+    if is_int:
+        options = {round(v) for v in options}
+    results = []
+    for v in rng.sample(sorted(options), len(options)):
+        if v < 0 or v == value:
+            continue
+        text = f"{int(v)}" if is_int else f"{v:g}"
+        candidate = correct[:match.start()] + text + correct[match.end():]
+        if _key(candidate) in taken:
+            continue
+        taken.add(_key(candidate))
+        results.append(candidate)
+        if len(results) >= count:
+            break
+    return results
+
+class DistractorStats:
+    """4지선다 보기 보충 통계 (questions: 검증한 4지선다 수)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"questions": 0, "filled_questions": 0, "distractors": 0, "short_questions": 0, "dropped": 0}
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self._stats[name] += n
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats)
+
+distractor_stats = DistractorStats()
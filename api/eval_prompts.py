@@ -0,0 +1,207 @@
+# backend/eval_prompts.py
+# 퀴즈 프롬프트 템플릿 버전별 오프라인 평가 (유효율, 프롬프트 토큰, 생성 시간)
+# 사용법:
+#   python eval_prompts.py                          # 가짜 모델 (Ollama 없이 형식/토큰 비교)
+#   python eval_prompts.py --record runs.jsonl      # 실제 Ollama 호출 결과를 기록하면서 평가
+#   python eval_prompts.py --replay runs.jsonl      # 기록한 응답으로 다시 평가 (파싱/검증 변경 확인)
+# 옵션: --templates quiz_mixed quiz_short_answer --versions v1 v2 --texts 텍스트_폴더 --count 5 --repeat 3
+import argparse
+import json
+import random
+import re
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ollama_client import MODEL_NAME, generate_full
+from prompt_registry import PromptTemplate, prompt_registry
+from distractors import TermIndex
+from quiz_generator import parse_questions, validate_questions
+from tokenizer import count_tokens
+
+SAMPLE_TEXTS = {
+    "os": """운영체제는 하드웨어 자원을 관리하고 응용 프로그램에 서비스를 제공하는 소프트웨어다.
+프로세스는 실행 중인 프로그램이며, 스케줄러는 어떤 프로세스가 CPU를 사용할지 결정한다.
+가상 메모리는 각 프로세스에 독립된 주소 공간을 제공하고, 페이지 테이블이 가상 주소를 물리 주소로 변환한다.
+교착 상태는 상호 배제, 점유 대기, 비선점, 순환 대기 조건이 모두 성립할 때 발생한다.""",
+    "http": """HTTP는 클라이언트와 서버가 요청과 응답을 주고받는 규칙이다.
+GET은 자원을 조회하고 POST는 새 자원을 생성한다. 상태 코드 200은 성공, 404는 자원 없음, 500은 서버 오류를 뜻한다.
+캐시는 ETag와 Cache-Control 헤더로 제어하며, 조건부 요청에 서버가 304로 응답하면 본문을 다시 보내지 않는다.""",
+    "biology": """광합성은 식물이 빛 에너지를 이용해 이산화탄소와 물로 포도당을 만드는 과정이다.
+엽록체의 틸라코이드에서 명반응이 일어나 ATP와 NADPH가 만들어지고, 스트로마에서 캘빈 회로가 이를 이용해 탄소를 고정한다.
+세포 호흡은 포도당을 분해해 ATP를 얻는 과정으로, 미토콘드리아에서 대부분의 ATP가 생성된다.""",
+}
+
+_COUNT_RE = re.compile(r'정확히 (\d+)개')
+
+class FakeModel:
+    """
+    프롬프트가 요구한 개수/유형대로 JSON을 만들어 주는 가짜 모델
+    truncate_rate 비율로 응답 끝을 잘라 num_predict 초과 상황을 흉내냄
+    - 잘림 여부/위치는 (seed, 텍스트, 반복 번호)로만 정함 → 모든 템플릿 버전이 같은 경우에 잘림
+      (응답이 템플릿 내용과 무관하므로 유효율/문제 확보율 차이는 잡음이 아니라 요구 개수/유형 차이뿐,
+       가짜 모델로는 토큰/시간 비교만 의미 있음)
+    시간은 (캐시 안 된 프롬프트 토큰 / prompt_tps + 출력 토큰 / eval_tps)로 계산 - 같은 prefix는 두 번째부터 캐시
+    """
+
+    def __init__(self, seed: int = 42, truncate_rate: float = 0.1, prompt_tps: float = 400.0, eval_tps: float = 25.0):
+        self.seed = seed
+        self.truncate_rate = truncate_rate
+        self.prompt_tps = prompt_tps
+        self.eval_tps = eval_tps
+        self._cached_prefixes = set()
+
+    def generate(self, template: PromptTemplate, prefix: str, suffix: str, text_id: str = "", run: int = 0) -> Optional[Dict]:
+        match = _COUNT_RE.search(suffix)
+        count = int(match.group(1)) if match else 5
+        kind = template.name.replace("quiz_", "")
+        questions = []
+        for i in range(count):
+            q_type = kind if kind != "mixed" else ("multiple_choice" if i % 2 == 0 else "short_answer")
+            if q_type == "multiple_choice":
+                questions.append({
+                    "question_text": f"문제 {i + 1}",
+                    "question_type": q_type,
+                    "answers": [{"answer_text": f"보기 {j + 1}", "is_correct": j == 0} for j in range(4)],
+                })
+            else:
+                questions.append({"question_text": f"문제 {i + 1}", "question_type": q_type, "correct_answer": "정답"})
+        response = json.dumps({"questions": questions}, ensure_ascii=False)
+        rng = random.Random(f"{self.seed}:{text_id}:{run}")
+        if rng.random() < self.truncate_rate:
+            response = response[: int(len(response) * rng.uniform(0.5, 0.95))]
+
+        prefix_tokens = count_tokens(prefix)
+        cached = template.key in self._cached_prefixes
+        self._cached_prefixes.add(template.key)
+        prompt_eval = count_tokens(suffix) + (0 if cached else prefix_tokens)
+        eval_count = count_tokens(response)
+        seconds = prompt_eval / self.prompt_tps + eval_count / self.eval_tps
+        return {
+            "response": response,
+            "prompt_eval_count": prompt_eval,
+            "eval_count": eval_count,
+            "total_duration": int(seconds * 1e9),
+        }
+
+class OllamaModel:
+    """실제 Ollama 호출 (record 파일이 있으면 응답을 한 줄씩 기록)"""
+
+    def __init__(self, record_path: Optional[str] = None):
+        self.record_file = open(record_path, "a", encoding="utf-8") if record_path else None
+
+    def generate(self, template: PromptTemplate, prefix: str, suffix: str, text_id: str = "", run: int = 0) -> Optional[Dict]:
+        start = time.perf_counter()
+        result = generate_full(
+            prefix + suffix,
+            model=MODEL_NAME,
+            options={"temperature": 0.7, "num_predict": 8192},
+            timeout=600
+        )
+        if result is None:
+            return None
+        result.setdefault("total_duration", int((time.perf_counter() - start) * 1e9))
+        if self.record_file:
+            self.record_file.write(json.dumps({
+                "template": template.key,
+                "text_id": text_id,
+                "run": run,
+                "response": result.get("response", ""),
+                "prompt_eval_count": result.get("prompt_eval_count"),
+                "eval_count": result.get("eval_count"),
+                "total_duration": result.get("total_duration"),
+            }, ensure_ascii=False) + "\n")
+            self.record_file.flush()
+        return result
+
+class ReplayModel:
+    """record로 남긴 응답을 (템플릿@버전, 텍스트, 반복 번호)로 찾아 돌려줌"""
+
+    def __init__(self, path: str):
+        self.records = {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    r = json.loads(line)
+                    self.records[(r["template"], r["text_id"], r["run"])] = r
+
+    def generate(self, template: PromptTemplate, prefix: str, suffix: str, text_id: str = "", run: int = 0) -> Optional[Dict]:
+        return self.records.get((template.key, text_id, run))
+
+def load_texts(folder: Optional[str]) -> Dict[str, str]:
+    if not folder:
+        return SAMPLE_TEXTS
+    return {p.stem: p.read_text(encoding="utf-8") for p in sorted(Path(folder).glob("*.txt"))}
+
+def evaluate(model, templates: List[PromptTemplate], texts: Dict[str, str], count: int, repeat: int) -> List[Dict]:
+    rows = []
+    for template in templates:
+        runs = valid = missing = 0
+        prompt_tokens = questions_ratio = seconds = 0.0
+        for text_id, text in texts.items():
+            prefix, suffix = template.render(text=text, count=count)
+            term_index = TermIndex.build(text)
+            for run in range(repeat):
+                result = model.generate(template, prefix, suffix, text_id=text_id, run=run)
+                if result is None:
+                    missing += 1
+                    continue
+                runs += 1
+                prompt_tokens += count_tokens(prefix) + count_tokens(suffix)
+                seconds += (result.get("total_duration") or 0) / 1e9
+                questions = parse_questions(result.get("response", "")) or []
+                validated = validate_questions(questions, count, term_index)
+                questions_ratio += len(validated) / count
+                if len(validated) >= count:
+                    valid += 1
+        rows.append({
+            "template": template.key,
+            "runs": runs,
+            "missing": missing,
+            "validity_rate": valid / runs if runs else 0.0,
+            "question_yield": questions_ratio / runs if runs else 0.0,
+            "prefix_tokens": template.prefix_tokens(),
+            "avg_prompt_tokens": prompt_tokens / runs if runs else 0.0,
+            "avg_seconds": seconds / runs if runs else 0.0,
+        })
+    return rows
+
+def print_report(rows: List[Dict]):
+    print(f"{'템플릿':<30}{'실행':>6}{'유효율':>9}{'문제 확보율':>12}{'prefix 토큰':>12}{'프롬프트 토큰':>14}{'생성 시간(s)':>14}")
+    for r in rows:
+        print(
+            f"{r['template']:<30}{r['runs']:>6}{r['validity_rate']:>9.1%}{r['question_yield']:>12.1%}"
+            f"{r['prefix_tokens']:>12}{r['avg_prompt_tokens']:>14.0f}{r['avg_seconds']:>14.2f}"
+            + (f"  (기록 없음 {r['missing']})" if r["missing"] else "")
+        )
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="퀴즈 프롬프트 템플릿 버전 비교")
+    parser.add_argument("--templates", nargs="*", help="템플릿 이름 (기본: 등록된 전체)")
+    parser.add_argument("--versions", nargs="*", help="비교할 버전 (기본: 전체)")
+    parser.add_argument("--texts", help="*.txt 텍스트 폴더 (기본: 내장 예시)")
+    parser.add_argument("--count", type=int, default=5, help="요청할 문제 수")
+    parser.add_argument("--repeat", type=int, default=3, help="텍스트당 반복 횟수")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", help="실제 Ollama 호출 결과를 기록할 JSONL 파일")
+    mode.add_argument("--replay", help="기록한 응답 JSONL 파일")
+    parser.add_argument("--truncate-rate", type=float, default=0.1, help="가짜 모델의 응답 잘림 비율")
+    args = parser.parse_args()
+
+    if args.record:
+        model = OllamaModel(args.record)
+    elif args.replay:
+        model = ReplayModel(args.replay)
+    else:
+        model = FakeModel(truncate_rate=args.truncate_rate)
+
+    names = args.templates or [n for n in prompt_registry.names() if n.startswith("quiz_")]
+    templates = [
+        t for name in names for t in prompt_registry.versions(name)
+        if not args.versions or t.version in args.versions
+    ]
+    texts = load_texts(args.texts)
+    print(f"모델: {type(model).__name__}, 텍스트 {len(texts)}개 × {args.repeat}회, 문제 {args.count}개")
+    if isinstance(model, FakeModel):
+        print("ℹ️ 가짜 모델은 템플릿 내용을 보지 않음 - 유효율/문제 확보율은 버전 비교에 쓰지 말 것")
+    print_report(evaluate(model, templates, texts, args.count, args.repeat))
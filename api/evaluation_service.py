@@ -0,0 +1,166 @@
+# backend/evaluation_service.py
+import asyncio
+import hashlib
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from evaluation_system import evaluator
+from feynman_prompts import LearningPhase, feynman_engine
+from ollama_client import MODEL_NAME, RESPONSE_CACHE_DB
+from prompt_cache import prefix_sessions
+from response_cache import ResponseCache, normalize_prompt
+
+# LLM 채점은 무거우므로 동시에 몇 개까지만 돌림
+MAX_CONCURRENT_GRADINGS = 2
+# 채점 실패 표시를 유지하는 시간 (폴링 클라이언트가 "failed"를 볼 수 있도록)
+FAILED_MARKER_SECONDS = 300
+
+Notify = Callable[[int, Dict], Awaitable[None]]
+
+def explanation_hash(explanation: str, phase: str, concept: Optional[str] = None) -> str:
+    """같은 개념/단계의 같은 설명(공백 차이 무시)은 같은 해시"""
+    payload = f"{concept or ''}\x00{phase}\x00{normalize_prompt(explanation)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class EvaluationService:
+    """
+    설명 평가 파이프라인
+    1. 휴리스틱 분석기(evaluation_system)로 즉시 예비 피드백 반환
+    2. 5개 항목 LLM 루브릭 채점은 백그라운드 작업으로 실행하고, 끝나면 채팅방으로 전송
+    3. 루브릭 결과는 설명 해시별로 캐시 (같은 설명은 다시 채점하지 않음)
+       채점 중인 설명이 또 들어오면 작업은 하나만 두고, 끝나면 기다리던 채팅방 모두에 전송
+    4. 채점이 실패하면(예외/빈 응답) 캐시하지 않고 "failed"를 전송, 잠시 실패 상태를 기억
+    """
+
+    def __init__(self, cache: Optional[ResponseCache] = None, max_concurrency: int = MAX_CONCURRENT_GRADINGS):
+        self.cache = cache or ResponseCache(max_entries=1024, ttl_seconds=7 * 86400, sqlite_path=RESPONSE_CACHE_DB)
+        self.max_concurrency = max_concurrency
+        self._tasks: Dict[str, asyncio.Task] = {}
+        # 설명 해시 → 결과를 받을 (room_id, notify) 목록
+        self._waiters: Dict[str, List[Tuple[int, Notify]]] = {}
+        # 설명 해시 → 실패 표시 만료 시각 (monotonic)
+        self._failed: Dict[str, float] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def evaluate(
+        self,
+        room_id: int,
+        explanation: str,
+        phase: str = LearningPhase.EVALUATION.value,
+        concept: Optional[str] = None,
+        notify: Optional[Notify] = None
+    ) -> Dict:
+        """예비 피드백을 바로 반환하고 LLM 채점을 예약"""
+        analysis = evaluator.analyze_explanation(explanation)
+        preliminary = evaluator.generate_feedback(analysis, phase)
+        key = explanation_hash(explanation, phase, concept)
+
+        rubric = self.cache.get(key) or None
+        if rubric is not None:
+            status = "complete"
+        else:
+            status = "pending"
+            # 다시 요청하면 재채점 (이전 실패 표시는 지움)
+            self._failed.pop(key, None)
+            waiters = self._waiters.setdefault(key, [])
+            if notify and (room_id, notify) not in waiters:
+                waiters.append((room_id, notify))
+            if key not in self._tasks:
+                prompt_prefix, prompt_suffix = self._build_rubric_prompt(explanation, concept, analysis)
+                task = asyncio.create_task(self._grade(key, prompt_prefix, prompt_suffix))
+                self._tasks[key] = task
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+
+        return {
+            "evaluation_id": key,
+            "analysis": analysis,
+            "preliminary_feedback": preliminary,
+            "rubric_status": status,
+            "rubric_feedback": rubric,
+        }
+
+    def get_result(self, evaluation_id: str) -> Dict:
+        """폴링용: 채점 상태 조회"""
+        rubric = self.cache.get(evaluation_id)
+        if rubric:
+            return {"evaluation_id": evaluation_id, "rubric_status": "complete", "rubric_feedback": rubric}
+        if evaluation_id in self._tasks:
+            return {"evaluation_id": evaluation_id, "rubric_status": "pending", "rubric_feedback": None}
+        if self._is_failed(evaluation_id):
+            return {"evaluation_id": evaluation_id, "rubric_status": "failed", "rubric_feedback": None}
+        return {"evaluation_id": evaluation_id, "rubric_status": "unknown", "rubric_feedback": None}
+
+    def _build_rubric_prompt(self, explanation: str, concept: Optional[str], analysis: Dict):
+        prefix, _ = feynman_engine.get_prompt_parts(LearningPhase.EVALUATION, {"concept": concept})
+        expression = analysis.get("expression", {})
+        suffix = f"""
+
+학습 개념: {concept or '(미지정)'}
+
+학생의 설명:
+{explanation}
+
+참고용 자동 분석:
+- 전문 용어: {', '.join(expression.get('technical_terms', [])) or '없음'}
+- 비유/예시 수: {expression.get('analogies_count', 0)}
+- 문장 복잡도: {expression.get('complexity', '')}
+- 혼란 표현: {', '.join(analysis.get('understanding', {}).get('details', {}).get('confusion_markers', [])) or '없음'}
+"""
+        return prefix, suffix
+
+    def _is_failed(self, key: str) -> bool:
+        expires = self._failed.get(key)
+        if expires is None:
+            return False
+        if expires <= time.monotonic():
+            del self._failed[key]
+            return False
+        return True
+
+    def _mark_failed(self, key: str):
+        now = time.monotonic()
+        # 만료된 표시는 여기서 정리 (실패 표시가 쌓이지 않도록)
+        for stale in [k for k, expires in self._failed.items() if expires <= now]:
+            del self._failed[stale]
+        self._failed[key] = now + FAILED_MARKER_SECONDS
+
+    async def _grade(self, key: str, prefix: str, suffix: str):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        def _call() -> Optional[str]:
+            result = prefix_sessions.generate(
+                session_key="template:evaluation",
+                prefix=prefix,
+                suffix=suffix,
+                template="evaluation",
+                model=MODEL_NAME,
+                options={"temperature": 0},
+                timeout=300
+            )
+            response = result.get("response") if result else None
+            # 빈 응답은 실패로 취급 (None이면 캐시에 저장되지 않음)
+            return response if response and response.strip() else None
+
+        try:
+            async with self._semaphore:
+                # 블로킹 HTTP 호출은 스레드에서 (이벤트 루프 막지 않음)
+                rubric = await asyncio.to_thread(self.cache.get_or_generate, key, _call)
+        except Exception as e:
+            print(f"❌ 루브릭 채점 실패: {e}")
+            rubric = None
+        finally:
+            waiters = self._waiters.pop(key, [])
+
+        if rubric:
+            message = {"type": "evaluation", "evaluation_id": key, "rubric_status": "complete", "rubric_feedback": rubric}
+        else:
+            self._mark_failed(key)
+            message = {"type": "evaluation", "evaluation_id": key, "rubric_status": "failed", "rubric_feedback": None}
+        for room_id, notify in waiters:
+            try:
+                await notify(room_id, message)
+            except Exception as e:
+                print(f"⚠️ 채점 결과 전송 실패 (room {room_id}): {e}")
+
+evaluation_service = EvaluationService()
@@ -1,29 +1,133 @@
 # backend/evaluation_system.py (새 파일)
-from typing import Dict, List, Optional
-import re
+from bisect import bisect_right
+from collections import deque
+from typing import Dict, List, Tuple
+
+from korean_nlp import Eojeol, detect_technical_terms, sentence_complexity, split_sentences, tokenize
+
+# ===== 표현 마커 목록 =====
+
+MARKER_GROUPS = {
+    "analogy": ['처럼', '같이', '마치', '예를 들어', '비유하자면'],
+    "confusion": ['잘 모르겠', '확실하지 않', '확실치 않', '아마도', '것 같습니다', '것 같아요', '것 같은데', '헷갈리', '애매'],
+    "definition": ['이란', '라는 것은', '의미합니다', '뜻합니다', '정의하면', ' means ', ' is defined'],
+    "connective": ['그래서', '따라서', '그러므로', '왜냐하면', '때문에', '결국', '즉,', '하지만', '먼저', '다음으로'],
+    "application": ['실생활', '일상', '적용', '활용', '사용하면', '예를 들어', '예시로'],
+    "metacognition": ['모르겠', '헷갈', '막혔', '부족한', '확실하지 않', '다시 생각', '이해하지 못'],
+}
+
+class MarkerMatcher:
+    """
+    Aho-Corasick 오토마톤
+    모든 마커 그룹을 텍스트 한 번 순회로 찾음 (마커 수와 무관하게 O(텍스트 길이))
+    """
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[str, str]]] = [[]]
+
+        for group, markers in groups.items():
+            for marker in markers:
+                node = 0
+                for ch in marker:
+                    nxt = self._goto[node].get(ch)
+                    if nxt is None:
+                        nxt = len(self._goto)
+                        self._goto.append({})
+                        self._fail.append(0)
+                        self._out.append([])
+                        self._goto[node][ch] = nxt
+                    node = nxt
+                self._out[node].append((group, marker))
+
+        # 실패 링크 (BFS)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                target = self._goto[f].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find_all(self, text: str) -> List[Tuple[int, str, str]]:
+        """(시작 위치, 그룹, 마커) 목록"""
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        found = []
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for group, marker in out[node]:
+                    found.append((i - len(marker) + 1, group, marker))
+        return found
+
+_marker_matcher = MarkerMatcher(MARKER_GROUPS)
+
+class AnalyzedText:
+    """
+    한 번만 분해한 설명 텍스트
+    문장/토큰/마커 위치를 모든 분석기가 공유
+    """
+
+    __slots__ = ("text", "sentences", "sentence_starts", "sentence_tokens", "technical_terms", "markers")
+
+    def __init__(self, text: str):
+        self.text = text
+        segments = split_sentences(text)
+        self.sentence_starts: List[int] = [start for start, _ in segments]
+        self.sentences: List[str] = [sentence for _, sentence in segments]
+
+        # 조사가 분리된 어절 (HTTP란 → HTTP + 란)
+        self.sentence_tokens: List[List[Eojeol]] = [tokenize(s) for s in self.sentences]
+        self.technical_terms = detect_technical_terms(
+            [token for tokens in self.sentence_tokens for token in tokens]
+        )
+
+        # 그룹별 (문장 인덱스, 마커)
+        self.markers: Dict[str, List[Tuple[int, str]]] = {group: [] for group in MARKER_GROUPS}
+        for pos, group, marker in _marker_matcher.find_all(text):
+            idx = max(bisect_right(self.sentence_starts, pos) - 1, 0)
+            self.markers[group].append((idx, marker))
+
+    def marker_list(self, group: str) -> List[str]:
+        """그룹에서 발견된 마커 (중복 제거, 등장 순)"""
+        return list(dict.fromkeys(marker for _, marker in self.markers[group]))
+
+    def sentences_with(self, group: str) -> List[str]:
+        """그룹 마커가 포함된 문장 (중복 제거, 등장 순)"""
+        indices = dict.fromkeys(idx for idx, _ in self.markers[group])
+        return [self.sentences[i] for i in indices if i < len(self.sentences)]
 
 class FeynmanEvaluator:
     """파인만 학습법 평가 시스템"""
     
     def analyze_explanation(self, explanation: str) -> Dict:
         """사용자 설명 분석"""
+        doc = AnalyzedText(explanation)
         
         analysis = {
-            "understanding": self._analyze_understanding(explanation),
-            "expression": self._analyze_expression(explanation),
-            "application": self._analyze_application(explanation),
-            "metacognition": self._analyze_metacognition(explanation),
-            "knowledge_level": self._analyze_knowledge_level(explanation)
+            "understanding": self._analyze_understanding(doc),
+            "expression": self._analyze_expression(doc),
+            "application": self._analyze_application(doc),
+            "metacognition": self._analyze_metacognition(doc),
+            "knowledge_level": self._analyze_knowledge_level(doc)
         }
         
         return analysis
     
-    def _analyze_understanding(self, text: str) -> Dict:
+    def _analyze_understanding(self, doc: AnalyzedText) -> Dict:
         """이해도 분석"""
         indicators = {
-            "clear_concepts": self._count_clear_concepts(text),
-            "confusion_markers": self._find_confusion_markers(text),
-            "coherence": self._check_coherence(text)
+            "clear_concepts": self._count_clear_concepts(doc),
+            "confusion_markers": self._find_confusion_markers(doc),
+            "coherence": self._check_coherence(doc)
         }
         
         return {
@@ -31,17 +135,17 @@ class FeynmanEvaluator:
             "details": indicators
         }
     
-    def _analyze_expression(self, text: str) -> Dict:
+    def _analyze_expression(self, doc: AnalyzedText) -> Dict:
         """표현력 분석"""
         
         # 전문 용어 감지
-        technical_terms = self._detect_technical_terms(text)
+        technical_terms = self._detect_technical_terms(doc)
         
         # 비유/예시 사용
-        analogies = self._find_analogies(text)
+        analogies = self._find_analogies(doc)
         
         # 문장 복잡도
-        complexity = self._calculate_complexity(text)
+        complexity = self._calculate_complexity(doc)
         
         return {
             "technical_terms": technical_terms,
@@ -50,41 +154,18 @@ class FeynmanEvaluator:
             "suggestions": self._generate_expression_suggestions(technical_terms, complexity)
         }
     
-    def _detect_technical_terms(self, text: str) -> List[str]:
+    def _detect_technical_terms(self, doc: AnalyzedText) -> List[str]:
         """전문 용어 감지"""
-        # 실제로는 더 정교한 NLP 처리 필요
-        technical_patterns = [
-            r'\b[A-Z]{2,}\b',  # 약어
-            r'\b\w+tion\b',    # -tion으로 끝나는 단어
-            r'\b\w+ity\b',     # -ity로 끝나는 단어
-        ]
-        
-        found_terms = []
-        for pattern in technical_patterns:
-            matches = re.findall(pattern, text)
-            found_terms.extend(matches)
-        
-        return list(set(found_terms))
-    
-    def _find_analogies(self, text: str) -> List[str]:
+        return doc.technical_terms
+        
+    def _find_analogies(self, doc: AnalyzedText) -> List[str]:
         """비유 표현 찾기"""
-        analogy_markers = ['처럼', '같이', '마치', '예를 들어', '비유하자면']
-        analogies = []
-        
-        for marker in analogy_markers:
-            if marker in text:
-                # 마커 주변 문장 추출
-                sentences = text.split('.')
-                for sent in sentences:
-                    if marker in sent:
-                        analogies.append(sent.strip())
-        
-        return analogies
-    
-    def _calculate_complexity(self, text: str) -> str:
-        """문장 복잡도 계산"""
-        sentences = text.split('.')
-        avg_length = sum(len(s.split()) for s in sentences) / max(len(sentences), 1)
+        return doc.sentences_with("analogy")
+        
+    def _calculate_complexity(self, doc: AnalyzedText) -> str:
+        """문장 복잡도 계산 (어절 수 + 연결 어미로 이어진 절 수)"""
+        sentence_count = max(len(doc.sentence_tokens), 1)
+        avg_length = sum(sentence_complexity(tokens) for tokens in doc.sentence_tokens) / sentence_count
         
         if avg_length < 10:
             return "simple"
@@ -153,21 +234,33 @@ class FeynmanEvaluator:
         return feedback
     
     # 헬퍼 메서드들
-    def _count_clear_concepts(self, text: str) -> int:
-        """명확한 개념 설명 수 계산"""
-        # 구현 필요
-        return 0
+    def _count_clear_concepts(self, doc: AnalyzedText) -> int:
+        """명확한 개념 설명 수 계산 (정의형 문장 수)"""
+        return len(doc.sentences_with("definition"))
     
-    def _find_confusion_markers(self, text: str) -> List[str]:
+    def _find_confusion_markers(self, doc: AnalyzedText) -> List[str]:
         """혼란 지표 찾기"""
-        markers = ['잘 모르겠', '확실하지 않', '아마도', '것 같습니다']
-        found = [m for m in markers if m in text]
-        return found
+        return doc.marker_list("confusion")
     
-    def _check_coherence(self, text: str) -> float:
-        """논리적 일관성 체크"""
-        # 실제로는 더 복잡한 NLP 처리 필요
-        return 0.7
+    def _check_coherence(self, doc: AnalyzedText) -> float:
+        """
+        논리적 일관성 체크
+        접속 표현 비율 + 인접 문장 간 어휘 겹침으로 근사
+        """
+        sentence_count = len(doc.sentences)
+        if sentence_count < 2:
+            return 0.7
+
+        connective_ratio = len(doc.sentences_with("connective")) / sentence_count
+
+        token_sets = [{token.stem for token in tokens} for tokens in doc.sentence_tokens]
+        overlaps = []
+        for prev, cur in zip(token_sets, token_sets[1:]):
+            union = prev | cur
+            overlaps.append(len(prev & cur) / len(union) if union else 0.0)
+        overlap = sum(overlaps) / len(overlaps)
+
+        return round(min(1.0, 0.5 + 0.3 * connective_ratio + 0.8 * overlap), 2)
     
     def _determine_understanding_level(self, indicators: Dict) -> str:
         """이해 수준 결정"""
@@ -178,16 +271,38 @@ class FeynmanEvaluator:
         else:
             return "medium"
     
-    def _analyze_application(self, text: str) -> Dict:
+    def _analyze_application(self, doc: AnalyzedText) -> Dict:
         """응용력 분석"""
-        return {"level": "moderate", "details": {}}
+        markers = doc.marker_list("application")
+        if len(markers) >= 2:
+            level = "high"
+        elif markers:
+            level = "moderate"
+        else:
+            level = "low"
+        return {"level": level, "details": {"application_markers": markers}}
     
-    def _analyze_metacognition(self, text: str) -> Dict:
+    def _analyze_metacognition(self, doc: AnalyzedText) -> Dict:
         """메타인지 분석"""
-        return {"level": "developing", "details": {}}
+        reflections = doc.sentences_with("metacognition")
+        if len(reflections) >= 2:
+            level = "advanced"
+        elif reflections:
+            level = "developing"
+        else:
+            level = "beginning"
+        return {"level": level, "details": {"self_reflections": reflections}}
     
-    def _analyze_knowledge_level(self, text: str) -> Dict:
+    def _analyze_knowledge_level(self, doc: AnalyzedText) -> Dict:
         """배경 지식 수준 분석"""
-        return {"level": "intermediate", "details": {}}
+        term_count = len(doc.technical_terms)
+        token_count = sum(len(tokens) for tokens in doc.sentence_tokens)
+        if term_count >= 5 or token_count >= 200:
+            level = "advanced"
+        elif term_count >= 1 or token_count >= 50:
+            level = "intermediate"
+        else:
+            level = "beginner"
+        return {"level": level, "details": {"technical_terms": term_count, "tokens": token_count}}
 
 evaluator = FeynmanEvaluator()
\ No newline at end of file
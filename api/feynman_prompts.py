@@ -1,6 +1,6 @@
 # backend/feynman_prompts.py (새 파일)
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 class LearningPhase(Enum):
     """학습 단계 정의"""
@@ -30,10 +30,7 @@ class FeynmanPromptEngine:
 4. 객관적이고 건설적인 피드백 제공
 """
 
-    def get_prompt_for_phase(self, phase: LearningPhase, context: Dict) -> str:
-        """단계별 프롬프트 반환"""
-        
-        prompts = {
+        self.prompts = {
             LearningPhase.KNOWLEDGE_CHECK: self._knowledge_check_prompt,
             LearningPhase.FIRST_EXPLANATION: self._first_explanation_prompt,
             LearningPhase.SELF_REFLECTION_1: self._self_reflection_1_prompt,
@@ -42,17 +39,43 @@ class FeynmanPromptEngine:
             LearningPhase.SELF_REFLECTION_2: self._self_reflection_2_prompt,
             LearningPhase.EVALUATION: self._evaluation_prompt,
         }
-        
-        prompt_func = prompts.get(phase, self._default_prompt)
-        if prompt_func:
-            return self.base_prompt + "\n\n" + prompt_func(context)
-        return self.base_prompt
 
-    def _default_prompt(self, context: Dict) -> str:
+        # 학습 상황에 따라 달라지는 부분 (prefix 뒤에 붙음)
+        self.context_renderers = {
+            LearningPhase.KNOWLEDGE_CHECK: self._knowledge_check_context,
+            LearningPhase.AI_EXPLANATION: self._ai_explanation_context,
+        }
+
+        self._prefix_cache: Dict[LearningPhase, str] = {}
+
+    def get_prompt_for_phase(self, phase: LearningPhase, context: Dict) -> str:
+        """단계별 프롬프트 반환"""
+        prefix, dynamic = self.get_prompt_parts(phase, context)
+        if dynamic:
+            return prefix + "\n\n" + dynamic
+        return prefix
+
+    def get_prompt_parts(self, phase: LearningPhase, context: Dict) -> Tuple[str, str]:
+        """
+        (고정 prefix, 가변 부분) 반환
+        prefix는 base_prompt + 단계 지침으로 매 호출 동일하므로
+        Ollama의 KV 캐시가 재사용할 수 있도록 항상 앞에 둠
+        """
+        prefix = self._prefix_cache.get(phase)
+        if prefix is None:
+            prompt_func = self.prompts.get(phase, self._default_prompt)
+            prefix = self.base_prompt + "\n\n" + prompt_func()
+            self._prefix_cache[phase] = prefix
+
+        render = self.context_renderers.get(phase)
+        dynamic = render(context) if render else ""
+        return prefix, dynamic
+
+    def _default_prompt(self) -> str:
         """기본 프롬프트"""
         return "사용자의 질문에 파인만 학습법 원칙에 따라 답변하세요."
     
-    def _home_prompt(self, context: Dict) -> str:
+    def _home_prompt(self) -> str:
         """홈 단계"""
         return """
 사용자가 파인만 학습법으로 학습을 시작하려고 합니다.
@@ -60,7 +83,7 @@ class FeynmanPromptEngine:
 PDF나 이미지를 업로드하면 더 정확한 학습이 가능함을 안내하세요.
 """
 
-    def _question_input_prompt(self, context: Dict) -> str:
+    def _question_input_prompt(self) -> str:
         """질문 입력 단계"""
         return """
 사용자가 학습하고 싶은 개념을 입력했습니다.
@@ -69,11 +92,9 @@ PDF나 이미지를 업로드하면 더 정확한 학습이 가능함을 안내
 """
 
 
-    def _knowledge_check_prompt(self, context: Dict) -> str:
+    def _knowledge_check_prompt(self) -> str:
         """지식 수준 확인 단계"""
-        concept = context.get('concept', '')
-        return f"""
-사용자가 "{concept}"에 대해 질문했습니다.
+        return """
 사용자의 지식 수준을 파악하기 위한 단계입니다.
 
 응답 형식:
@@ -82,7 +103,11 @@ PDF나 이미지를 업로드하면 더 정확한 학습이 가능함을 안내
 - '모른다'를 선택하면 기초부터 차근차근 설명 준비
 """
 
-    def _first_explanation_prompt(self, context: Dict) -> str:
+    def _knowledge_check_context(self, context: Dict) -> str:
+        concept = context.get('concept', '')
+        return f'사용자가 "{concept}"에 대해 질문했습니다.'
+
+    def _first_explanation_prompt(self) -> str:
         """첫 번째 설명 분석"""
         return """
 사용자가 자신이 아는 만큼 개념을 설명했습니다.
@@ -98,7 +123,7 @@ PDF나 이미지를 업로드하면 더 정확한 학습이 가능함을 안내
 다음 단계에서 자기 성찰을 유도할 것입니다.
 """
 
-    def _self_reflection_1_prompt(self, context: Dict) -> str:
+    def _self_reflection_1_prompt(self) -> str:
         """자기 성찰 유도"""
         return """
 사용자에게 자기 성찰을 유도하는 단계입니다.
@@ -109,15 +134,9 @@ PDF나 이미지를 업로드하면 더 정확한 학습이 가능함을 안내
 - "잘 설명하셨네요. 혹시 설명하면서 확신이 없었거나 막혔던 부분이 있으셨나요?" 같은 질문 사용
 """
 
-    def _ai_explanation_prompt(self, context: Dict) -> str:
+    def _ai_explanation_prompt(self) -> str:
         """AI의 맞춤 설명"""
-        user_level = context.get('knowledge_level', 'beginner')
-        weak_points = context.get('weak_points', [])
-        
-        return f"""
-사용자의 현재 이해 수준: {user_level}
-부족한 부분: {', '.join(weak_points) if weak_points else '전반적 이해 필요'}
-
+        return """
 설명 지침:
 1. 사용자가 이미 이해한 부분은 간단히 확인만
 2. 부족한 부분을 중점적으로 설명
@@ -128,8 +147,16 @@ PDF나 이미지를 업로드하면 더 정확한 학습이 가능함을 안내
 
 마지막에 "이해가 되셨나요? 추가로 궁금한 점이 있으면 물어보세요!" 추가
 """
-    
-    def _second_explanation_prompt(self, context: Dict) -> str:
+
+    def _ai_explanation_context(self, context: Dict) -> str:
+        concept = context.get('concept', '')
+        user_level = context.get('knowledge_level', 'beginner')
+        weak_points = context.get('weak_points', [])
+        return f"""설명할 개념: {concept}
+사용자의 현재 이해 수준: {user_level}
+부족한 부분: {', '.join(weak_points) if weak_points else '전반적 이해 필요'}"""
+
+    def _second_explanation_prompt(self) -> str:
         """두 번째 설명 요청"""
         return """
 사용자가 학습한 내용을 다시 설명하는 단계입니다.
@@ -141,7 +168,7 @@ PDF나 이미지를 업로드하면 더 정확한 학습이 가능함을 안내
 - 격려하면서도 정확한 피드백 제공
 """
 
-    def _self_reflection_2_prompt(self, context: Dict) -> str:
+    def _self_reflection_2_prompt(self) -> str:
         """두 번째 자기 성찰"""
         return """
 두 번째 자기 성찰 단계입니다.
@@ -152,7 +179,7 @@ PDF나 이미지를 업로드하면 더 정확한 학습이 가능함을 안내
 - 종합 평가를 위한 준비
 """
 
-    def _evaluation_prompt(self, context: Dict) -> str:
+    def _evaluation_prompt(self) -> str:
         """종합 평가"""
         return """
 사용자의 두 번의 설명과 자기 성찰을 바탕으로 종합 평가를 제공합니다.
@@ -0,0 +1,355 @@
+# backend/grading.py
+"""
+단답형 채점
+1. 정규화: NFKC(호환 자모 → 음절), 대소문자, 문장부호, 조사/서술격 조사(입니다, 이다) 제거 → 어간 목록
+2. 로컬 점수: 자모 단위 문자 3-gram Dice + 어간 Dice (한 제출의 답 전체를 한 번에, 정답 쪽 정규화는 캐시)
+   - 정규화 결과가 같으면 정답, 점수가 GRADING_ACCEPT 이상이면 정답, GRADING_REJECT 이하면 오답
+   - 숫자가 다르거나 부정 표현(아님, 안 됨, -지 않다)이 한쪽에만 있으면 애매한 구간으로 (오타처럼 보여도 뜻이 다름)
+   - 오타 허용으로 맞춘 어간(프로세스/프로세서)만으로는 정답 처리하지 않음 → LLM으로
+3. 애매한 답만 모아 LLM 한 번에 채점 (GRADING_LLM_BATCH개씩), 결과는 (정답, 답) 정규화 키로 캐시
+   LLM이 실패하면 점수 중간값으로 로컬 판정
+"""
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+from korean_nlp import analyze_eojeol
+from ollama_client import RESPONSE_CACHE_DB, generate_full
+from prompt_registry import PromptTemplate, prompt_registry
+from response_cache import ResponseCache
+
+# 이 점수 이상이면 정답, 이하이면 오답 - 사이는 LLM
+GRADING_ACCEPT = float(os.getenv("GRADING_ACCEPT", "0.85"))
+GRADING_REJECT = float(os.getenv("GRADING_REJECT", "0.45"))
+# 0이면 LLM 없이 점수 중간값으로 판정
+GRADING_LLM = os.getenv("GRADING_LLM", "1") == "1"
+# LLM 한 번에 채점할 답 수
+GRADING_LLM_BATCH = int(os.getenv("GRADING_LLM_BATCH", "20"))
+
+# 문자 n-gram 길이 (자모 단위 - 음절 하나가 2~3자모라 오타 한 글자에 강함)
+NGRAM = 3
+# 문자 유사도 가중치 (나머지는 어간 겹침)
+CHAR_WEIGHT = 0.6
+# 어간끼리 문자 유사도가 이 이상이면 같은 어간으로 셈 (오타 허용)
+STEM_MATCH = 0.6
+# 이보다 짧은 영문/숫자 어간(약어: ATP, HTTP)은 정확히 같아야 같은 어간
+MIN_FUZZY_LATIN = 6
+# 정답이 답 안에 어간 단위로 그대로 들어 있을 때의 점수 (부가 설명을 붙인 답)
+CONTAINMENT_SCORE = 0.9
+# LLM을 못 쓸 때 애매한 답을 정답으로 볼 점수
+GRADING_MIDPOINT = (GRADING_ACCEPT + GRADING_REJECT) / 2
+
+COPULA_ENDINGS = ('입니다', '이에요', '이예요', '예요', '이다', '임')
+# 조사를 뗀 어절이 이것으로 시작하면 부정 (아님, 아닌, 않음, 없다, 못함, 안됨)
+NEGATION_PREFIXES = ('아니', '아닌', '아님', '않', '없', '못하', '못한', '못함', '못해', '안되', '안됨', '안돼', '안된')
+# 따로 쓰는 부정 부사 (안 됨, 못 함)
+NEGATION_ADVERBS = frozenset({'안', '못'})
+# 붙여 쓴 -지 않/-지 못 (되지않음)
+NEGATION_INFIXES = ('지않', '지못')
+NEGATION_WORDS = frozenset({'not', 'no', 'never'})
+
+_SYMBOL_RE = re.compile(r'[^\w\s]|_')
+_HANGUL_RE = re.compile(r'[가-힣]')
+_LATIN_RE = re.compile(r'[a-z]')
+_DIGITS_RE = re.compile(r'\d+')
+# 숫자에 붙은 단위(3개, 200번)는 따로 떼어 숫자 어간이 정답과 맞게
+_NUMBER_UNIT_RE = re.compile(r'(\d)(?=[^\d\s])')
+_ALTERNATIVE_SPLIT_RE = re.compile(r'\s*(?:[|;]|\s또는\s)\s*')
+_PAREN_RE = re.compile(r'\(([^()]*)\)')
+_JSON_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+class Normalized(NamedTuple):
+    compact: str                           # 어간을 공백 없이 이어 붙인 것 (완전 일치 비교)
+    boundaries: FrozenSet[int]             # compact 안에서 어간 경계 위치
+    stems: Tuple[str, ...]
+    stem_ngrams: Tuple[FrozenSet[str], ...]
+    ngrams: FrozenSet[str]
+    digits: FrozenSet[str]
+    negations: FrozenSet[str]              # 부정 표현 어절의 어간
+    negated: bool
+    scripts: FrozenSet[str]                # "hangul", "latin"
+
+class GradeResult(NamedTuple):
+    is_correct: bool
+    score: float
+    method: str  # "exact" | "local" | "llm" | "fallback" | "empty"
+
+def _strip_copula(word: str) -> str:
+    for ending in COPULA_ENDINGS:
+        if word.endswith(ending) and len(word) > len(ending):
+            return word[:-len(ending)]
+    return word
+
+def _char_ngrams(text: str) -> FrozenSet[str]:
+    # 음절을 자모로 풀어서 (NFD) 받침 하나 틀린 오타도 n-gram 대부분이 겹치게
+    jamo = unicodedata.normalize("NFD", text)
+    if len(jamo) <= NGRAM:
+        return frozenset([jamo]) if jamo else frozenset()
+    return frozenset(jamo[i:i + NGRAM] for i in range(len(jamo) - NGRAM + 1))
+
+def _is_negation(word: str) -> bool:
+    """어절 하나가 부정 표현인지 - 조사만 떼고 (어간 + 어미) 앞부분으로 판단 (연못, 끊임없이는 아님)"""
+    if word in NEGATION_WORDS:
+        return True
+    eojeol = analyze_eojeol(word)
+    body = eojeol.stem + eojeol.ending
+    return body in NEGATION_ADVERBS or body.startswith(NEGATION_PREFIXES) or any(n in body for n in NEGATION_INFIXES)
+
+@lru_cache(maxsize=50000)
+def normalize(text: str) -> Normalized:
+    """답 하나 정규화 (같은 정답/답은 캐시)"""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    words = _NUMBER_UNIT_RE.sub(r"\1 ", _SYMBOL_RE.sub(" ", text)).split()
+    word_stems = [(word, analyze_eojeol(_strip_copula(word)).stem) for word in words]
+    stems = tuple(dict.fromkeys(stem for _, stem in word_stems))
+    negations = frozenset(stem for word, stem in word_stems if _is_negation(word))
+    compact = "".join(stems)
+    boundaries = {0}
+    for stem in stems:
+        boundaries.add(max(boundaries) + len(stem))
+    return Normalized(
+        compact=compact,
+        boundaries=frozenset(boundaries),
+        stems=stems,
+        stem_ngrams=tuple(_char_ngrams(stem) for stem in stems),
+        ngrams=_char_ngrams(compact),
+        digits=frozenset(_DIGITS_RE.findall(text)),
+        negations=negations,
+        negated=bool(negations),
+        scripts=frozenset(
+            name for name, pattern in (("hangul", _HANGUL_RE), ("latin", _LATIN_RE)) if pattern.search(compact)
+        ),
+    )
+
+@lru_cache(maxsize=10000)
+def reference_alternatives(correct_answer: str) -> Tuple[Normalized, ...]:
+    """
+    정답 문자열에서 인정할 답 목록
+    "A | B", "A; B", "A 또는 B"는 각각, "CPU (중앙처리장치)"는 전체/괄호 밖/괄호 안 모두
+    """
+    alternatives = []
+    for part in _ALTERNATIVE_SPLIT_RE.split(correct_answer):
+        alternatives.append(part)
+        inside = _PAREN_RE.findall(part)
+        if inside:
+            alternatives.append(_PAREN_RE.sub(" ", part))
+            alternatives.extend(inside)
+    normalized = [normalize(a) for a in alternatives if a.strip()]
+    return tuple(n for n in dict.fromkeys(normalized) if n.compact)
+
+def _dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+def _fuzzy_stem(stem: str) -> bool:
+    return len(stem) >= MIN_FUZZY_LATIN or _HANGUL_RE.search(stem) is not None
+
+def _stem_overlap(reference: Normalized, answer: Normalized) -> Tuple[float, bool]:
+    """
+    어간 F1 - 문자 유사도가 STEM_MATCH 이상인 어간끼리는 같은 것으로 셈
+    (점수, 똑같은 어간 없이 비슷하기만 해서 맞춘 어간이 있는지)
+    """
+    answer_stems = set(answer.stems)
+    matches = [
+        [
+            a == b or (_fuzzy_stem(a) and _fuzzy_stem(b) and _dice(a_ngrams, b_ngrams) >= STEM_MATCH)
+            for b, b_ngrams in zip(answer.stems, answer.stem_ngrams)
+        ]
+        for a, a_ngrams in zip(reference.stems, reference.stem_ngrams)
+    ]
+    fuzzy = any(any(row) and a not in answer_stems for a, row in zip(reference.stems, matches))
+    recall = sum(any(row) for row in matches) / len(reference.stems)
+    precision = sum(any(column) for column in zip(*matches)) / len(answer.stems)
+    return (2 * recall * precision / (recall + precision) if recall + precision else 0.0), fuzzy
+
+def _contains(reference: Normalized, answer: Normalized) -> bool:
+    """정답이 답 안에 어간 경계에 맞춰 들어 있는지 (HTTP ⊄ HTTPS)"""
+    length = len(reference.compact)
+    start = answer.compact.find(reference.compact)
+    while start >= 0:
+        if start in answer.boundaries and start + length in answer.boundaries:
+            return True
+        start = answer.compact.find(reference.compact, start + 1)
+    return False
+
+def similarity(reference: Normalized, answer: Normalized) -> float:
+    """0~1 로컬 점수 (1.0은 정규화 결과 완전 일치)"""
+    if reference.compact == answer.compact:
+        return 1.0
+    overlap, fuzzy = _stem_overlap(reference, answer)
+    score = CHAR_WEIGHT * _dice(reference.ngrams, answer.ngrams) + (1 - CHAR_WEIGHT) * overlap
+    # 비슷한 어간(프로세스/프로세서, 컴파일러/컴파일)은 다른 용어일 수 있음 → 로컬로 정답 처리하지 않음
+    if fuzzy:
+        score = min(score, GRADING_ACCEPT - 0.01)
+    # 덧붙인 말에 부정이 있으면(가상 메모리 아님) 정답을 포함해도 부가 설명이 아님
+    if len(reference.compact) >= 2 and not (answer.negations - reference.negations) and _contains(reference, answer):
+        score = max(score, CONTAINMENT_SCORE)
+    # 오타처럼 가까워도 숫자나 부정이 다르면 뜻이 다를 수 있음 → LLM으로, LLM이 없으면 오답
+    if reference.digits != answer.digits or reference.negated != answer.negated:
+        score = min(score, GRADING_MIDPOINT - 0.01)
+    # 한글/영어 표기가 다르면 (라운드 로빈 / round robin) 문자 유사도로는 알 수 없음 → LLM으로
+    if reference.scripts and answer.scripts and reference.scripts.isdisjoint(answer.scripts):
+        score = max(score, GRADING_REJECT + 0.01)
+    return score
+
+# ===== LLM 채점 프롬프트 =====
+
+GRADING_PROMPT_PREFIX = """너는 단답형 퀴즈 채점자다. 각 항목에서 학생 답이 정답과 같은 뜻인지 판단하라.
+
+규칙:
+- 철자 오류, 띄어쓰기, 조사, 어미, 대소문자 차이는 정답으로 본다
+- 동의어, 한글/영어 표기 차이(예: CPU와 중앙처리장치), 더 자세한 설명을 덧붙인 답은 정답으로 본다
+- 핵심 용어가 다르거나, 뜻이 반대이거나, 숫자가 다르면 오답이다
+- 문제와 관계없는 답이나 정답의 일부만 쓴 답은 오답이다
+
+출력은 JSON만: {"results": [{"id": 항목 번호, "correct": true 또는 false}]}
+
+"""
+
+GRADING_PROMPT_SUFFIX = """채점할 항목:
+{items}
+
+JSON:"""
+
+prompt_registry.register(PromptTemplate(
+    name="grade_short_answer",
+    version="v1",
+    prefix=GRADING_PROMPT_PREFIX,
+    suffix=GRADING_PROMPT_SUFFIX,
+    description="애매한 단답형 답 일괄 채점"
+))
+
+class ShortAnswerGrader:
+    def __init__(self, cache: Optional[ResponseCache] = None):
+        # (정답, 답) 정규화 키 → "1"/"0"
+        self.cache = cache or ResponseCache(max_entries=8192, ttl_seconds=30 * 86400, sqlite_path=RESPONSE_CACHE_DB)
+        self._lock = threading.Lock()
+        self._stats = {
+            # 판정 방법별 답 수 (exact/local/llm/fallback/empty)
+            "answers": 0, "exact": 0, "local": 0, "llm": 0, "fallback": 0, "empty": 0,
+            "escalated": 0, "llm_calls": 0, "llm_cache_hits": 0,
+        }
+        self._local_seconds = 0.0
+
+    def grade(self, items: Sequence[Tuple[str, str, str]]) -> List[GradeResult]:
+        """
+        한 제출의 답 전체 채점
+
+        Args:
+            items: (문제, 정답, 학생 답) 목록
+
+        Returns:
+            입력 순서대로 GradeResult
+        """
+        started = time.perf_counter()
+        results: List[Optional[GradeResult]] = [None] * len(items)
+        ambiguous: List[Tuple[int, float]] = []
+        for i, (_, correct_answer, answer) in enumerate(items):
+            answer_norm = normalize(answer or "")
+            references = reference_alternatives(correct_answer or "")
+            if not answer_norm.compact or not references:
+                results[i] = GradeResult(False, 0.0, "empty")
+                continue
+            score = max(similarity(reference, answer_norm) for reference in references)
+            if score >= 1.0:
+                results[i] = GradeResult(True, 1.0, "exact")
+            elif score >= GRADING_ACCEPT:
+                results[i] = GradeResult(True, score, "local")
+            elif score <= GRADING_REJECT:
+                results[i] = GradeResult(False, score, "local")
+            else:
+                ambiguous.append((i, score))
+        local_seconds = time.perf_counter() - started
+
+        if ambiguous:
+            verdicts = self._grade_with_llm(items, ambiguous)
+            for i, score in ambiguous:
+                verdict = verdicts.get(i)
+                if verdict is None:
+                    results[i] = GradeResult(score >= GRADING_MIDPOINT, score, "fallback")
+                else:
+                    results[i] = GradeResult(verdict, score, "llm")
+
+        with self._lock:
+            self._local_seconds += local_seconds
+            self._stats["answers"] += len(items)
+            self._stats["escalated"] += len(ambiguous)
+            for result in results:
+                self._stats[result.method] += 1
+        return results
+
+    def _cache_key(self, correct_answer: str, answer: str) -> str:
+        return f"grade\x00{normalize(correct_answer).compact}\x00{normalize(answer).compact}"
+
+    def _grade_with_llm(self, items: Sequence[Tuple[str, str, str]], ambiguous: List[Tuple[int, float]]) -> Dict[int, bool]:
+        """애매한 답의 {위치: 정답 여부} - 캐시에 없는 것만 GRADING_LLM_BATCH개씩 LLM 호출"""
+        verdicts: Dict[int, bool] = {}
+        pending = []
+        for i, _ in ambiguous:
+            cached = self.cache.get(self._cache_key(items[i][1], items[i][2]))
+            if cached is not None:
+                verdicts[i] = cached == "1"
+            else:
+                pending.append(i)
+        with self._lock:
+            self._stats["llm_cache_hits"] += len(ambiguous) - len(pending)
+        if not GRADING_LLM:
+            return verdicts
+
+        for start in range(0, len(pending), GRADING_LLM_BATCH):
+            batch = pending[start:start + GRADING_LLM_BATCH]
+            for i, verdict in self._call_llm(items, batch).items():
+                verdicts[i] = verdict
+                self.cache.set(self._cache_key(items[i][1], items[i][2]), "1" if verdict else "0")
+        return verdicts
+
+    def _call_llm(self, items: Sequence[Tuple[str, str, str]], batch: List[int]) -> Dict[int, bool]:
+        lines = []
+        for n, i in enumerate(batch, start=1):
+            question, correct_answer, answer = items[i]
+            lines.append(f"{n}. 문제: {question}\n   정답: {correct_answer}\n   학생 답: {answer}")
+        prefix, suffix = prompt_registry.get("grade_short_answer").render(items="\n".join(lines))
+
+        with self._lock:
+            self._stats["llm_calls"] += 1
+        result = generate_full(
+            prefix + suffix,
+            options={"temperature": 0, "num_predict": 30 * len(batch) + 50},
+            timeout=60
+        )
+        if result is None:
+            return {}
+        match = _JSON_RE.search(result.get("response", ""))
+        try:
+            graded = json.loads(match.group()) if match else {}
+        except json.JSONDecodeError:
+            print("⚠️ 채점 응답 JSON 파싱 실패")
+            return {}
+
+        verdicts = {}
+        for entry in graded.get("results", []) if isinstance(graded, dict) else []:
+            try:
+                n = int(entry["id"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if 1 <= n <= len(batch) and isinstance(entry.get("correct"), bool):
+                verdicts[batch[n - 1]] = entry["correct"]
+        return verdicts
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            local_seconds = self._local_seconds
+        answers = stats["answers"]
+        stats["escalation_rate"] = round(stats["escalated"] / answers, 3) if answers else 0.0
+        stats["local_us_per_answer"] = round(local_seconds / answers * 1e6, 1) if answers else 0.0
+        stats["thresholds"] = {"accept": GRADING_ACCEPT, "reject": GRADING_REJECT}
+        return stats
+
+short_answer_grader = ShortAnswerGrader()
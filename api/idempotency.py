@@ -0,0 +1,216 @@
+# backend/idempotency.py
+"""
+Idempotency-Key 지원
+- 같은 키로 다시 온 요청은 저장된 응답을 그대로 돌려줌 (LLM 생성/진행 기록 반영을 다시 하지 않음)
+- 같은 키의 요청이 아직 처리 중이면 새로 시작하지 않고 그 결과를 기다림 (같은 프로세스)
+  다른 프로세스에서 처리 중이면 409로 잠시 후 재시도하게 함
+- 같은 키에 다른 요청 본문이 오면 422
+- 성공(2xx) 응답만 저장, 실패하면 기록을 지워 재시도가 다시 실행되게 함
+- db를 넘기면 작업의 변경과 완료 기록을 한 트랜잭션으로 커밋 (work는 커밋하지 않음)
+  중간에 프로세스가 죽어도 "반영됐는데 처리 중"으로 남아 재시도가 두 번 반영하는 일이 없음
+- 비로그인 요청은 사용자별 범위가 없으므로 적용하지 않음 (다른 사람의 응답을 돌려주지 않게)
+"""
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+# 완료된 응답 보관 기간
+IDEMPOTENCY_TTL = timedelta(hours=24)
+# 처리 중 표시가 이보다 오래되면 중단된 요청으로 보고 다시 실행 허용
+IN_PROGRESS_TIMEOUT = timedelta(minutes=30)
+# 만료 기록 정리 주기 (초)
+CLEANUP_INTERVAL = 3600
+
+MAX_KEY_LENGTH = 128
+
+# (상태 코드, JSON 바이트)
+Result = Tuple[int, bytes]
+
+def fingerprint(*parts: Any) -> str:
+    """요청 지문 - 바이트는 그대로, 나머지는 정렬된 JSON으로 해시"""
+    digest = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, bytes):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+def _json_response(result: Result, replayed: bool) -> Response:
+    status_code, body = result
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+class IdempotencyStore:
+    def __init__(self):
+        self._inflight: Dict[Tuple[str, str], Tuple[str, asyncio.Future]] = {}
+
+    async def run(
+        self,
+        scope: Optional[str],
+        key: Optional[str],
+        request_fingerprint: str,
+        work: Callable[[], Awaitable[Result]],
+        db: Optional[Session] = None
+    ) -> Response:
+        """
+        키나 scope가 없으면(비로그인 요청) work를 그대로 실행
+        키가 있으면 저장된 응답 재사용 / 처리 중인 작업에 합류 / 새로 실행 후 저장
+        DB 기록 읽기/쓰기는 스레드에서 (이벤트 루프 막지 않음)
+
+        Args:
+            db: work가 변경하는 세션 - 주면 work 대신 여기서 완료 기록과 함께 한 번만 커밋
+        """
+        if not key or scope is None:
+            result = await work()
+            if db is not None:
+                db.commit()
+            return _json_response(result, replayed=False)
+        if len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail="Idempotency-Key가 너무 깁니다")
+
+        inflight = self._inflight.get((scope, key))
+        if inflight is not None:
+            self._check_fingerprint(inflight[0], request_fingerprint)
+            return _json_response(await asyncio.shield(inflight[1]), replayed=True)
+
+        # DB 기록을 확인하는 동안 온 같은 키 요청도 이 작업에 합류하도록 먼저 등록
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[(scope, key)] = (request_fingerprint, future)
+        try:
+            stored = await asyncio.to_thread(self._claim, scope, key, request_fingerprint)
+            if stored is not None:
+                future.set_result(stored)
+                return _json_response(stored, replayed=True)
+            try:
+                result = await work()
+                if db is None:
+                    await asyncio.to_thread(self._complete, scope, key, result)
+                else:
+                    self._write_completion(db, scope, key, result)
+                    db.commit()
+            except BaseException:
+                if db is not None:
+                    db.rollback()
+                await asyncio.to_thread(self._release, scope, key)
+                raise
+            future.set_result(result)
+            return _json_response(result, replayed=False)
+        except BaseException as e:
+            if not future.done():
+                future.set_exception(e)
+                # 기다리는 요청이 없으면 "exception was never retrieved" 경고가 나지 않게
+                future.exception()
+            raise
+        finally:
+            self._inflight.pop((scope, key), None)
+
+    @staticmethod
+    def _check_fingerprint(stored: str, incoming: str):
+        if stored != incoming:
+            raise HTTPException(status_code=422, detail="같은 Idempotency-Key로 다른 요청을 보냈습니다")
+
+    def _claim(self, scope: str, key: str, request_fingerprint: str) -> Optional[Result]:
+        """
+        처리 중 표시를 남기고 실행 권한을 얻음
+        이미 완료된 기록이 있으면 그 응답을 반환
+        """
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            record = db.get(models.IdempotencyRecord, (scope, key))
+            if record is not None:
+                expired = record.expires_at <= now
+                stale = record.status == "in_progress" and record.created_at <= now - IN_PROGRESS_TIMEOUT
+                if not (expired or stale):
+                    self._check_fingerprint(record.fingerprint, request_fingerprint)
+                    if record.status == "completed":
+                        return record.status_code, record.response_body
+                    raise HTTPException(status_code=409, detail="같은 요청을 처리 중입니다. 잠시 후 다시 시도해주세요")
+                db.delete(record)
+                db.flush()
+
+            db.add(models.IdempotencyRecord(
+                scope=scope,
+                key=key,
+                fingerprint=request_fingerprint,
+                status="in_progress",
+                created_at=now,
+                expires_at=now + IDEMPOTENCY_TTL
+            ))
+            try:
+                db.commit()
+            except IntegrityError:
+                # 다른 프로세스가 먼저 같은 키를 잡음
+                db.rollback()
+                raise HTTPException(status_code=409, detail="같은 요청을 처리 중입니다. 잠시 후 다시 시도해주세요")
+            return None
+        finally:
+            db.close()
+
+    def _complete(self, scope: str, key: str, result: Result):
+        db = SessionLocal()
+        try:
+            self._write_completion(db, scope, key, result)
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _write_completion(db: Session, scope: str, key: str, result: Result):
+        """완료 기록을 세션에 반영 (커밋은 호출 측)"""
+        status_code, body = result
+        record = db.get(models.IdempotencyRecord, (scope, key))
+        if record is None:
+            return
+        if 200 <= status_code < 300:
+            record.status = "completed"
+            record.status_code = status_code
+            record.response_body = body
+            record.expires_at = datetime.utcnow() + IDEMPOTENCY_TTL
+        else:
+            db.delete(record)
+
+    def _release(self, scope: str, key: str):
+        db = SessionLocal()
+        try:
+            db.execute(delete(models.IdempotencyRecord).where(
+                models.IdempotencyRecord.scope == scope,
+                models.IdempotencyRecord.key == key
+            ))
+            db.commit()
+        finally:
+            db.close()
+
+    def purge_expired(self) -> int:
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                delete(models.IdempotencyRecord).where(models.IdempotencyRecord.expires_at <= datetime.utcnow())
+            )
+            db.commit()
+            return result.rowcount
+        finally:
+            db.close()
+
+    async def cleanup_loop(self, interval: int = CLEANUP_INTERVAL):
+        """만료된 기록을 주기적으로 삭제 (서버 시작 시 백그라운드 작업으로 실행)"""
+        while True:
+            try:
+                deleted = await asyncio.to_thread(self.purge_expired)
+                if deleted:
+                    print(f"🧹 만료된 멱등성 키 {deleted}개 삭제")
+            except Exception as e:
+                print(f"⚠️ 멱등성 키 정리 실패: {e}")
+            await asyncio.sleep(interval)
+
+idempotency = IdempotencyStore()
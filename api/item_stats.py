@@ -0,0 +1,389 @@
+# backend/item_stats.py
+"""
+문제/퀴즈별 풀이 통계 (대시보드, 적응형 출제용)
+- 진행 기록을 저장하는 트랜잭션 안에서 누적값만 더함 (sync.apply_progress → record_attempts)
+  INSERT ... ON CONFLICT DO UPDATE SET col = col + :delta 라서 동시에 저장해도 덮어쓰지 않고,
+  행을 id 순서로 잠가 교착을 피함
+- 읽을 때는 누적값 한 행으로 정답률 / 평균 풀이 시간 / 변별도를 계산 (user_progress를 훑지 않음)
+- 변별도: 시도마다 (정답 여부, 그 시점 학습자 능력치)의 점이연 상관계수
+  능력치 = 학습자 전체 정답률 (라플라스 보정) - 합/제곱합/곱의 합만 있으면 계산됨
+- 정합성 맞추기(reconcile): 주기적으로 user_progress에서 시도 수/정답 수/학습자 수/능력치 합을 다시 계산해 덮어씀
+  (계정/문제 삭제로 어긋난 값 정리, 배포 직후 빈 테이블 채우기)
+  풀이 시간은 user_progress에 남지 않으므로 누적값을 유지
+  능력치 합은 이때 현재 능력치로 다시 계산됨 (증분은 풀던 시점 능력치라 첫 풀이가 많으면 변별도가 낮게 나옴)
+"""
+import asyncio
+import math
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Float, TextClause, bindparam, cast, func, select, text, update
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+# 정합성 맞추기 주기 (초, 0이면 끔)
+STATS_RECONCILE_INTERVAL = int(os.getenv("STATS_RECONCILE_INTERVAL", "3600"))
+# 정합성 맞추기 한 트랜잭션에서 처리할 퀴즈 수
+STATS_RECONCILE_BATCH = int(os.getenv("STATS_RECONCILE_BATCH", "200"))
+# 이보다 긴 풀이 시간은 자리를 비운 것으로 보고 이 값으로 자름 (평균이 튀지 않게)
+MAX_RESPONSE_MS = 10 * 60 * 1000
+# 시도가 이보다 적으면 변별도를 계산하지 않음 (None)
+MIN_DISCRIMINATION_ATTEMPTS = 10
+
+ITEM_COUNTERS = (
+    "attempts", "correct_attempts", "learners", "timed_attempts", "response_ms_total",
+    "ability_total", "ability_sq_total", "ability_correct_total",
+)
+LEARNER_COUNTERS = ("attempts", "correct_attempts")
+
+def ability(attempts: int, correct_attempts: int) -> float:
+    """학습자 능력치 - 정답률 (처음 푸는 사람은 0.5에서 시작)"""
+    return (correct_attempts + 1) / (attempts + 2)
+
+# ============================================================
+# 증분 갱신 (진행 기록 저장 트랜잭션 안)
+# ============================================================
+
+def record_attempts(
+    db: Session,
+    user_id: int,
+    attempts: List[Tuple[int, int, bool, Optional[int]]],
+    new_learner_questions: Set[int],
+):
+    """
+    풀이 결과를 통계에 더함 (커밋은 호출 측 - 진행 기록과 같은 트랜잭션)
+
+    Args:
+        attempts: (question_id, quiz_id, is_correct, response_ms) 목록
+        new_learner_questions: 이 사용자가 이번에 처음 푼 문제 id
+    """
+    if not attempts:
+        return
+    now = datetime.utcnow()
+    learner = db.get(models.LearnerStats, user_id)
+    level = ability(learner.attempts, learner.correct_attempts) if learner else ability(0, 0)
+
+    questions: Dict[int, Dict] = {}
+    quizzes: Dict[int, Dict] = {}
+    for question_id, quiz_id, is_correct, response_ms in attempts:
+        for deltas, key in ((questions, question_id), (quizzes, quiz_id)):
+            _add_attempt(deltas.setdefault(key, dict.fromkeys(ITEM_COUNTERS, 0)), is_correct, response_ms, level)
+    quiz_of = {question_id: quiz_id for question_id, quiz_id, _, _ in attempts}
+    for question_id in new_learner_questions:
+        questions[question_id]["learners"] += 1
+
+    # 처음 푼 문제가 있는 퀴즈 중 다른 문제 기록이 없던 퀴즈 = 처음 푼 퀴즈
+    first_quizzes = {quiz_of[q] for q in new_learner_questions}
+    if first_quizzes:
+        known = set(db.scalars(
+            select(models.QuizQuestion.quiz_id).distinct()
+            .join(models.UserProgress, models.UserProgress.question_id == models.QuizQuestion.id)
+            .where(
+                models.UserProgress.user_id == user_id,
+                models.QuizQuestion.quiz_id.in_(first_quizzes),
+                models.UserProgress.question_id.notin_(new_learner_questions),
+            )
+        ))
+        for quiz_id in first_quizzes - known:
+            quizzes[quiz_id]["learners"] += 1
+
+    # 잠금 순서 고정: 문제 → 퀴즈 → 학습자 (정합성 맞추기도 같은 순서)
+    _increment(db, models.QuestionStats, "question_id", questions, now, {"quiz_id": quiz_of})
+    _increment(db, models.QuizStats, "quiz_id", quizzes, now)
+    _increment(db, models.LearnerStats, "user_id", {user_id: {
+        "attempts": len(attempts),
+        "correct_attempts": sum(1 for _, _, is_correct, _ in attempts if is_correct),
+    }}, now)
+
+def _add_attempt(deltas: Dict, is_correct: bool, response_ms: Optional[int], level: float):
+    deltas["attempts"] += 1
+    deltas["ability_total"] += level
+    deltas["ability_sq_total"] += level * level
+    if is_correct:
+        deltas["correct_attempts"] += 1
+        deltas["ability_correct_total"] += level
+    if response_ms is not None and response_ms >= 0:
+        deltas["timed_attempts"] += 1
+        deltas["response_ms_total"] += min(int(response_ms), MAX_RESPONSE_MS)
+
+def _dialect_insert(db: Session):
+    """ON CONFLICT를 쓸 수 있는 insert (Postgres/SQLite), 그 밖의 DB는 None"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def _insert_missing(db: Session, model, rows: List[Dict]):
+    """없는 통계 행만 0으로 만듦 (동시에 만들어도 충돌하지 않게 ON CONFLICT DO NOTHING)"""
+    if not rows:
+        return
+    table = model.__table__
+    insert = _dialect_insert(db)
+    if insert is None:
+        key = table.primary_key.columns.values()[0]
+        existing = set(db.scalars(select(key).where(key.in_([row[key.name] for row in rows]))))
+        rows = [row for row in rows if row[key.name] not in existing]
+        if rows:
+            db.execute(table.insert(), rows)
+        return
+    db.execute(insert(table).on_conflict_do_nothing(), rows)
+
+@lru_cache(maxsize=None)
+def _upsert_sql(table: str, key: str, columns: Tuple[str, ...], static: Tuple[str, ...]) -> TextClause:
+    """
+    INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col (Postgres/SQLite 공통 문법)
+    SQLAlchemy의 on_conflict_do_update는 컴파일 캐시에 걸리지 않아 요청마다 다시 컴파일하므로 SQL로 한 번만 만듦
+    """
+    names = (key, *static, *columns, "updated_at")
+    increments = ", ".join(f"{name} = {table}.{name} + excluded.{name}" for name in columns)
+    return text(
+        f"INSERT INTO {table} ({', '.join(names)}) VALUES ({', '.join(':' + name for name in names)}) "
+        f"ON CONFLICT ({key}) DO UPDATE SET {increments}, updated_at = excluded.updated_at"
+    )
+
+def _increment(db: Session, model, key: str, deltas: Dict[int, Dict], now: datetime, static: Optional[Dict[str, Dict]] = None):
+    """
+    행마다 col = col + delta (키 순서대로 executemany 한 번)
+    Postgres/SQLite는 INSERT ... ON CONFLICT DO UPDATE 한 문장 (없으면 delta로 생성)
+    그 밖의 DB는 없는 행을 만든 뒤 UPDATE
+    """
+    static = static or {}
+    keys = sorted(deltas)
+    table = model.__table__
+    columns = list(deltas[keys[0]])
+    if _dialect_insert(db) is not None:
+        db.execute(_upsert_sql(table.name, key, tuple(columns), tuple(static)), [
+            {key: k, "updated_at": now, **deltas[k], **{name: values[k] for name, values in static.items()}}
+            for k in keys
+        ])
+        return
+
+    _insert_missing(db, model, [
+        {key: k, "updated_at": now, **{name: values[k] for name, values in static.items()}} for k in keys
+    ])
+    db.execute(
+        update(table)
+        .where(table.c[key] == bindparam("_key"))
+        .values({**{name: table.c[name] + bindparam(f"_{name}") for name in columns}, "updated_at": bindparam("_updated_at")}),
+        [{"_key": k, "_updated_at": now, **{f"_{name}": deltas[k][name] for name in columns}} for k in keys]
+    )
+
+# ============================================================
+# 읽기
+# ============================================================
+
+def summarize(row) -> Dict:
+    """누적값 한 행 → 정답률 / 난이도 / 평균 풀이 시간 / 변별도 (row가 None이면 빈 통계)"""
+    attempts = row.attempts if row is not None else 0
+    correct = row.correct_attempts if row is not None else 0
+    correct_rate = correct / attempts if attempts else None
+    return {
+        "attempts": attempts,
+        "learners": row.learners if row is not None else 0,
+        "correct_rate": correct_rate,
+        "difficulty": 1 - correct_rate if correct_rate is not None else None,
+        "avg_response_ms": row.response_ms_total / row.timed_attempts if row is not None and row.timed_attempts else None,
+        "discrimination": discrimination(row) if row is not None else None,
+        "updated_at": row.updated_at if row is not None else None,
+    }
+
+def discrimination(row) -> Optional[float]:
+    """정답 여부와 학습자 능력치의 점이연 상관계수 (-1~1, 높을수록 잘하는 사람이 맞힘)"""
+    n = row.attempts
+    if n < MIN_DISCRIMINATION_ATTEMPTS:
+        return None
+    p = row.correct_attempts / n
+    mean = row.ability_total / n
+    var_x = p * (1 - p)
+    var_y = row.ability_sq_total / n - mean * mean
+    if var_x <= 0 or var_y <= 1e-12:
+        return None
+    cov = row.ability_correct_total / n - p * mean
+    return max(-1.0, min(1.0, cov / math.sqrt(var_x * var_y)))
+
+def quiz_overview(db: Session, user_id: int) -> List[Dict]:
+    """사용자 퀴즈별 통계 (퀴즈 목록과 통계 행 조인 한 번)"""
+    rows = db.execute(
+        select(models.Quiz.id, models.Quiz.quiz_name, models.QuizStats)
+        .outerjoin(models.QuizStats, models.QuizStats.quiz_id == models.Quiz.id)
+        .where(models.Quiz.user_id == user_id)
+        .order_by(models.Quiz.id)
+    )
+    return [{"quiz_id": quiz_id, "quiz_name": quiz_name, **summarize(stats)} for quiz_id, quiz_name, stats in rows]
+
+def quiz_detail(db: Session, quiz: models.Quiz) -> Dict:
+    """퀴즈 통계 + 문제별 통계 (퀴즈 통계 한 행 + 문제 목록과 통계 행 조인 한 번)"""
+    questions = db.execute(
+        select(models.QuizQuestion.id, models.QuizQuestion.question_order, models.QuestionStats)
+        .outerjoin(models.QuestionStats, models.QuestionStats.question_id == models.QuizQuestion.id)
+        .where(models.QuizQuestion.quiz_id == quiz.id)
+        .order_by(models.QuizQuestion.question_order, models.QuizQuestion.id)
+    )
+    return {
+        "quiz_id": quiz.id,
+        "quiz_name": quiz.quiz_name,
+        **summarize(db.get(models.QuizStats, quiz.id)),
+        "questions": [
+            {"question_id": question_id, "question_order": order, **summarize(stats)}
+            for question_id, order, stats in questions
+        ],
+    }
+
+# ============================================================
+# 정합성 맞추기 (user_progress 기준으로 다시 계산)
+# ============================================================
+
+def reconcile_learners(db: Session) -> int:
+    """학습자 능력치를 user_progress 합계로 덮어씀 (커밋 포함)"""
+    now = datetime.utcnow()
+    list(db.scalars(select(models.LearnerStats.user_id).with_for_update()))
+    totals = {
+        user_id: {"attempts": attempts or 0, "correct_attempts": correct or 0}
+        for user_id, attempts, correct in db.execute(
+            select(
+                models.UserProgress.user_id,
+                func.sum(models.UserProgress.total_attempts),
+                func.sum(models.UserProgress.correct_count),
+            ).group_by(models.UserProgress.user_id)
+        )
+    }
+    _overwrite(db, models.LearnerStats, "user_id", totals, now, reset=LEARNER_COUNTERS, stamp=False)
+    db.commit()
+    return len(totals)
+
+def reconcile_quizzes(db: Session, quiz_ids: List[int]) -> int:
+    """
+    퀴즈 여러 개의 문제/퀴즈 통계를 user_progress로 다시 계산 (커밋 포함)
+    통계 행을 먼저 잠그고 집계하므로, 동시에 저장 중인 진행 기록은 집계에 들어가거나
+    이 트랜잭션이 끝난 뒤 증분으로 더해짐 (어느 쪽이든 한 번만 반영)
+    """
+    now = datetime.utcnow()
+    Q, P, L = models.QuizQuestion, models.UserProgress, models.LearnerStats
+    list(db.scalars(
+        select(models.QuestionStats.question_id).where(models.QuestionStats.quiz_id.in_(quiz_ids))
+        .order_by(models.QuestionStats.question_id).with_for_update()
+    ))
+    list(db.scalars(
+        select(models.QuizStats.quiz_id).where(models.QuizStats.quiz_id.in_(quiz_ids))
+        .order_by(models.QuizStats.quiz_id).with_for_update()
+    ))
+
+    level = (cast(func.coalesce(L.correct_attempts, 0), Float) + 1) / (cast(func.coalesce(L.attempts, 0), Float) + 2)
+    attempts = func.coalesce(P.total_attempts, 0)
+    correct = func.coalesce(P.correct_count, 0)
+    rows = db.execute(
+        select(
+            Q.id, Q.quiz_id, func.sum(attempts), func.sum(correct), func.count(P.id),
+            func.sum(attempts * level), func.sum(attempts * level * level), func.sum(correct * level),
+        )
+        .join(P, P.question_id == Q.id)
+        .outerjoin(L, L.user_id == P.user_id)
+        .where(Q.quiz_id.in_(quiz_ids))
+        .group_by(Q.id, Q.quiz_id)
+    ).all()
+
+    questions: Dict[int, Dict] = {}
+    quizzes: Dict[int, Dict] = {}
+    quiz_of: Dict[int, int] = {}
+    for question_id, quiz_id, n, n_correct, learners, a_total, a_sq_total, a_correct_total in rows:
+        values = {
+            "attempts": n or 0,
+            "correct_attempts": n_correct or 0,
+            "learners": learners,
+            "ability_total": a_total or 0.0,
+            "ability_sq_total": a_sq_total or 0.0,
+            "ability_correct_total": a_correct_total or 0.0,
+        }
+        questions[question_id] = values
+        quiz_of[question_id] = quiz_id
+        totals = quizzes.setdefault(quiz_id, dict.fromkeys(values, 0))
+        for name, value in values.items():
+            if name != "learners":
+                totals[name] += value
+    for quiz_id, learners in db.execute(
+        select(Q.quiz_id, func.count(P.user_id.distinct()))
+        .join(P, P.question_id == Q.id)
+        .where(Q.quiz_id.in_(quiz_ids))
+        .group_by(Q.quiz_id)
+    ):
+        quizzes[quiz_id]["learners"] = learners
+
+    _overwrite(db, models.QuestionStats, "question_id", questions, now, {"quiz_id": quiz_of},
+               scope=models.QuestionStats.quiz_id.in_(quiz_ids))
+    _overwrite(db, models.QuizStats, "quiz_id", quizzes, now, scope=models.QuizStats.quiz_id.in_(quiz_ids))
+    db.commit()
+    return len(questions)
+
+def _overwrite(
+    db: Session,
+    model,
+    key: str,
+    values: Dict[int, Dict],
+    now: datetime,
+    static: Optional[Dict[str, Dict]] = None,
+    scope=None,
+    reset: Iterable[str] = ITEM_COUNTERS,
+    stamp: bool = True,
+):
+    """
+    다시 계산한 값으로 덮어쓰기 (풀이 시간 누적값은 유지)
+    scope 안에서 기록이 하나도 없어진 행은 0으로 (풀이 시간도 함께)
+    """
+    table = model.__table__
+    static = static or {}
+    keys = sorted(values)
+    _insert_missing(db, model, [
+        {key: k, "updated_at": now, **{name: column[k] for name, column in static.items()}} for k in keys
+    ])
+    stamped = {"reconciled_at": now} if stamp else {}
+    if keys:
+        columns = list(values[keys[0]])
+        db.execute(
+            update(table)
+            .where(table.c[key] == bindparam("_key"))
+            .values({**{name: bindparam(f"_{name}") for name in columns}, "updated_at": bindparam("_updated_at"), **stamped}),
+            [{"_key": k, "_updated_at": now, **{f"_{name}": values[k][name] for name in columns}} for k in keys]
+        )
+    emptied = update(table).where(table.c.attempts != 0)
+    if keys:
+        emptied = emptied.where(table.c[key].notin_(keys))
+    if scope is not None:
+        emptied = emptied.where(scope)
+    db.execute(emptied.values({**dict.fromkeys(reset, 0), "updated_at": now, **stamped}))
+
+def reconcile_all(batch_size: int = STATS_RECONCILE_BATCH) -> int:
+    """전체 정합성 맞추기 - 학습자 능력치 먼저, 그다음 퀴즈를 id 순서로 batch_size개씩"""
+    db = SessionLocal()
+    try:
+        reconcile_learners(db)
+        quizzes = 0
+        last_id = 0
+        while True:
+            quiz_ids = list(db.scalars(
+                select(models.Quiz.id).where(models.Quiz.id > last_id).order_by(models.Quiz.id).limit(batch_size)
+            ))
+            if not quiz_ids:
+                return quizzes
+            reconcile_quizzes(db, quiz_ids)
+            quizzes += len(quiz_ids)
+            last_id = quiz_ids[-1]
+    finally:
+        db.close()
+
+async def reconcile_loop(interval: int = STATS_RECONCILE_INTERVAL):
+    """서버 시작 시 백그라운드 작업으로 실행 (첫 실행이 빈 통계 테이블을 채움)"""
+    while True:
+        try:
+            quizzes = await asyncio.to_thread(reconcile_all)
+            print(f"📊 풀이 통계 정합성 맞춤: 퀴즈 {quizzes}개")
+        except Exception as e:
+            print(f"⚠️ 풀이 통계 정합성 맞추기 실패: {e}")
+        await asyncio.sleep(interval)
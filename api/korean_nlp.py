@@ -0,0 +1,170 @@
+# backend/korean_nlp.py
+"""
+한국어 설명 텍스트용 경량 분석기 (외부 형태소 분석기 없이 순수 Python)
+- 문장 분리: 마침표/물음표/느낌표, 줄바꿈, '습니다'·'어요' 같은 종결 어미
+- 어절 분석: 조사 분리 (HTTP란 → HTTP + 란), 연결/종결 어미 구분
+- 전문 용어 감지: 내장 용어 사전 + 약어/접미사 규칙
+모든 사전은 모듈 로드 시 한 번 만들어 두고, 어절 분석 결과는 캐시한다.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+# ===== 내장 사전 =====
+
+# 긴 것부터 매칭해야 하므로 길이별로 나눠 둠
+PARTICLES = (
+    '에서부터', '으로부터', '에게서', '한테서', '이라는', '이라고', '이라면', '에서는', '으로는', '에게는',
+    '라는', '라고', '라면', '에서', '에게', '한테', '으로', '부터', '까지', '처럼', '보다', '마다',
+    '이나', '이란', '이랑', '조차', '밖에', '만큼', '과는', '와는', '은', '는', '이', '가', '을', '를',
+    '의', '에', '로', '도', '만', '란', '와', '과', '랑',
+)
+
+# 문장 끝으로 볼 수 있는 종결 어미 (문장부호 없이 끝나는 채팅 입력 대비)
+TERMINAL_ENDINGS = (
+    '습니다', '니다', '어요', '아요', '에요', '예요', '해요', '세요', '지요', '네요', '군요', '죠',
+)
+
+# 절을 잇는 연결 어미 - 문장 복잡도 계산에 사용
+CONNECTIVE_ENDINGS = (
+    '는데', '지만', '면서', '니까', '므로', '려면', '어서', '아서', '해서', '래서', '으며', '거나', '도록',
+    '고', '며', '면',
+)
+
+TECHNICAL_LEXICON: FrozenSet[str] = frozenset({
+    '알고리즘', '자료구조', '프로토콜', '인터페이스', '컴파일러', '인터프리터', '런타임', '변수', '함수',
+    '클래스', '객체', '인스턴스', '상속', '다형성', '캡슐화', '추상화', '재귀', '반복문', '조건문',
+    '배열', '리스트', '스택', '큐', '트리', '그래프', '해시', '포인터', '메모리', '캐시', '스레드',
+    '프로세스', '데이터베이스', '트랜잭션', '인덱스', '쿼리', '스키마', '정규화', '서버', '클라이언트',
+    '네트워크', '패킷', '라우터', '대역폭', '지연시간', '암호화', '복호화', '해시함수', '미분', '적분',
+    '행렬', '벡터', '확률', '분산', '표준편차', '회귀', '가설', '변인', '광합성', '세포', '유전자',
+    '단백질', '효소', '원자', '분자', '전자', '에너지', '엔트로피', '관성', '가속도', '운동량',
+})
+
+# 한자어 접미사 규칙으로 잡히지만 일상어인 단어
+COMMON_WORDS: FrozenSet[str] = frozenset({
+    '가능성', '중요성', '필요성', '변화', '대화', '문화', '영화', '전화', '이론적으로', '비율',
+})
+
+TECHNICAL_SUFFIXES = ('화', '론', '율', '성')
+
+_TERMINAL_ENDINGS_SORTED = tuple(sorted(TERMINAL_ENDINGS, key=len, reverse=True))
+_CONNECTIVE_ENDINGS_SORTED = tuple(sorted(CONNECTIVE_ENDINGS, key=len, reverse=True))
+_PARTICLES_BY_LENGTH: Dict[int, FrozenSet[str]] = {}
+for _p in PARTICLES:
+    _PARTICLES_BY_LENGTH.setdefault(len(_p), set()).add(_p)
+_PARTICLES_BY_LENGTH = {k: frozenset(v) for k, v in _PARTICLES_BY_LENGTH.items()}
+_PARTICLE_LENGTHS = sorted(_PARTICLES_BY_LENGTH, reverse=True)
+
+# ===== 사전 컴파일된 패턴 =====
+
+# 뒤에 공백/끝이 와야 문장부호로 인정 (3.14, v1.2 같은 숫자는 제외)
+_SENTENCE_BOUNDARY_RE = re.compile(
+    r'[.!?…]+(?=\s|$|["\')\]])'
+    r'|[!?…]+'
+    r'|\n+'
+    r'|(?:' + '|'.join(_TERMINAL_ENDINGS_SORTED) + r')(?=\s+[^\s.!?])'
+)
+_EOJEOL_RE = re.compile(r'[0-9A-Za-z가-힣_+#-]+')
+_HANGUL_RE = re.compile(r'[가-힣]')
+_LATIN_TERM_RE = re.compile(r'^(?:[A-Z]{2,}[a-z]?|[A-Za-z]+(?:tion|ity|ism|ment))$')
+
+class Eojeol(NamedTuple):
+    """어절 분석 결과"""
+    surface: str
+    stem: str       # 조사/어미를 뗀 부분
+    particle: str   # 붙어 있던 조사 ('' 가능)
+    ending: str     # 종결/연결 어미 ('' 가능)
+    kind: str       # "noun" | "predicate" | "connective" | "other"
+
+@lru_cache(maxsize=50000)
+def analyze_eojeol(surface: str) -> Eojeol:
+    """어절 하나 분석 (같은 어절은 캐시에서 바로 반환)"""
+    if not _HANGUL_RE.search(surface):
+        return Eojeol(surface, surface, '', '', "noun" if surface[:1].isalpha() else "other")
+
+    for ending in _TERMINAL_ENDINGS_SORTED:
+        if surface.endswith(ending) and len(surface) > len(ending):
+            return Eojeol(surface, surface[:-len(ending)], '', ending, "predicate")
+
+    # 두 글자 이상 조사(에서, 으로 …)를 먼저 보고, 그다음 연결 어미, 마지막으로 한 글자 조사
+    particle = _strip_particle(surface, min_length=2)
+    if particle:
+        return particle
+
+    for ending in _CONNECTIVE_ENDINGS_SORTED:
+        # 한 글자 어미(고, 며, 면)는 명사 끝 글자와 겹치기 쉬워 어간 두 글자 이상일 때만
+        min_stem = 2 if len(ending) == 1 else 1
+        if surface.endswith(ending) and len(surface) - len(ending) >= min_stem:
+            return Eojeol(surface, surface[:-len(ending)], '', ending, "connective")
+
+    return _strip_particle(surface, min_length=1) or Eojeol(surface, surface, '', '', "noun")
+
+def _strip_particle(surface: str, min_length: int) -> Optional[Eojeol]:
+    for length in _PARTICLE_LENGTHS:
+        if length < min_length or len(surface) <= length:
+            continue
+        tail = surface[-length:]
+        if tail not in _PARTICLES_BY_LENGTH[length]:
+            continue
+        stem = surface[:-length]
+        # 한 글자 조사는 짧은 명사(사과, 나이)를 잘못 자르기 쉬우므로
+        # 한글 어간이 두 글자 이상일 때만 분리
+        if length == 1 and _HANGUL_RE.search(stem) and len(stem) < 2:
+            continue
+        # 여러 글자 조사도 한 글자 어간만 남으면(사과는 → 사 + 과는) 사전에 있는 명사일 때만 분리하고
+        # 아니면 더 짧은 조사로 (사과 + 는)
+        if length > 1 and _HANGUL_RE.search(stem) and len(stem) < 2 and stem not in TECHNICAL_LEXICON:
+            continue
+        return Eojeol(surface, stem, tail, '', "noun")
+    return None
+
+def split_sentences(text: str) -> List[Tuple[int, str]]:
+    """
+    (시작 위치, 문장) 목록
+    정규식 한 번 순회로 경계를 찾으므로 텍스트 길이에 선형
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_BOUNDARY_RE.finditer(text):
+        # 종결 어미 경계는 어미까지 문장에 포함
+        end = match.end() if match.group()[:1] not in '.!?…\n' else match.start()
+        _append_sentence(sentences, text, start, end)
+        start = match.end()
+    _append_sentence(sentences, text, start, len(text))
+    return sentences
+
+def _append_sentence(sentences: List[Tuple[int, str]], text: str, start: int, end: int):
+    piece = text[start:end]
+    stripped = piece.strip()
+    if stripped:
+        sentences.append((start + (len(piece) - len(piece.lstrip())), stripped))
+
+def tokenize(sentence: str) -> List[Eojeol]:
+    """문장을 어절 단위로 분석"""
+    return [analyze_eojeol(surface) for surface in _EOJEOL_RE.findall(sentence)]
+
+@lru_cache(maxsize=50000)
+def is_technical_term(stem: str) -> bool:
+    """어간이 전문 용어인지 (사전 → 영문 규칙 → 한자어 접미사 규칙 순)"""
+    if stem in TECHNICAL_LEXICON:
+        return True
+    if _LATIN_TERM_RE.match(stem):
+        return True
+    return (
+        len(stem) >= 3
+        and stem.endswith(TECHNICAL_SUFFIXES)
+        and stem not in COMMON_WORDS
+        and _HANGUL_RE.search(stem) is not None
+    )
+
+def detect_technical_terms(tokens: List[Eojeol]) -> List[str]:
+    """어절 목록에서 전문 용어 어간 추출 (중복 제거, 등장 순)"""
+    return list(dict.fromkeys(t.stem for t in tokens if t.kind == "noun" and is_technical_term(t.stem)))
+
+def sentence_complexity(tokens: List[Eojeol]) -> int:
+    """
+    문장 하나의 복잡도 점수
+    어절 수 + 연결 어미(절 접속) 하나당 2점
+    """
+    return len(tokens) + 2 * sum(1 for t in tokens if t.kind == "connective")
@@ -0,0 +1,158 @@
+# backend/learning_session.py
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+import models
+from feynman_prompts import LearningPhase
+from learning_flow import flow_manager
+
+# 캐시에 올려 둘 채팅방 수
+MAX_CACHED_ROOMS = 1024
+
+# 지식 확인 단계의 선택 → knowledge_level
+KNOWLEDGE_CHOICES = {"knows": 1, "doesnt_know": 0}
+# knowledge_level → AI 설명 프롬프트에 넣을 수준
+KNOWLEDGE_LEVEL_NAMES = {0: "beginner", 1: "intermediate"}
+
+class VersionConflict(Exception):
+    """다른 요청이 먼저 채팅방 상태를 바꿈 (낙관적 동시성 충돌)"""
+
+class InvalidChoice(ValueError):
+    """현재 단계에서 고를 수 없는 선택 (단계가 바뀌지 않으므로 저장하지 않음)"""
+
+class RoomState:
+    """채팅방 학습 상태 (메모리 캐시)"""
+
+    __slots__ = ("room_id", "phase", "concept", "knowledge_level", "version")
+
+    def __init__(self, room_id, phase: LearningPhase, concept: Optional[str], knowledge_level: int, version: int):
+        self.room_id = room_id
+        self.phase = phase
+        self.concept = concept
+        self.knowledge_level = knowledge_level
+        self.version = version
+
+def _to_phase(value: Optional[str]) -> LearningPhase:
+    try:
+        return LearningPhase(value)
+    except ValueError:
+        return LearningPhase.HOME
+
+class LearningSessionService:
+    """
+    LearningFlowManager 기반 학습 세션 관리
+    - 채팅방 상태를 프로세스 내 LRU 캐시에 유지
+    - 변경은 version 조건부 UPDATE 한 번으로 DB에 바로 반영 (write-through)
+    """
+
+    def __init__(self, max_rooms: int = MAX_CACHED_ROOMS):
+        self.max_rooms = max_rooms
+        self._states: "OrderedDict[object, RoomState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_state(self, db: Session, room_id) -> Optional[RoomState]:
+        with self._lock:
+            state = self._states.get(room_id)
+            if state is not None:
+                self._states.move_to_end(room_id)
+                return state
+        return self._load(db, room_id)
+
+    def _load(self, db: Session, room_id) -> Optional[RoomState]:
+        room = db.query(models.ChatRoom).filter(models.ChatRoom.id == room_id).first()
+        if room is None:
+            return None
+
+        state = RoomState(
+            room_id=room.id,
+            phase=_to_phase(room.learning_phase),
+            concept=room.current_concept,
+            knowledge_level=room.knowledge_level or 0,
+            version=room.version or 0
+        )
+        self._store(state)
+        return state
+
+    def _store(self, state: RoomState):
+        with self._lock:
+            self._states[state.room_id] = state
+            self._states.move_to_end(state.room_id)
+            while len(self._states) > self.max_rooms:
+                self._states.popitem(last=False)
+
+    def invalidate(self, room_id):
+        with self._lock:
+            self._states.pop(room_id, None)
+
+    def phase_info(self, state: RoomState) -> Dict:
+        return {
+            "room_id": state.room_id,
+            "phase": state.phase.value,
+            "title": flow_manager.get_phase_title(state.phase),
+            "instruction": flow_manager.get_phase_instruction(state.phase),
+            "can_go_back": flow_manager.can_go_back(state.phase),
+            "version": state.version,
+        }
+
+    def transition(
+        self,
+        db: Session,
+        room_id,
+        user_choice: Optional[str] = None,
+        expected_version: Optional[int] = None
+    ) -> Optional[Dict]:
+        """
+        다음 단계로 전환
+        캐시 조회 1번 + 조건부 UPDATE 1번
+
+        Raises:
+            VersionConflict: expected_version이 다르거나 동시에 다른 전환이 먼저 반영된 경우
+            InvalidChoice: 선택이 필요한 단계에서 없는 선택을 보낸 경우 (version은 그대로)
+        """
+        state = self.get_state(db, room_id)
+        if state is None:
+            return None
+        if expected_version is not None and expected_version != state.version:
+            raise VersionConflict(f"version {expected_version} != {state.version}")
+
+        previous = state.phase
+        next_phase = flow_manager.get_next_phase(previous, user_choice)
+        if next_phase == previous:
+            raise InvalidChoice(f"{previous.value}: {user_choice!r}")
+        values = {
+            "learning_phase": next_phase.value,
+            "version": state.version + 1,
+            "updated_at": datetime.utcnow(),
+        }
+        knowledge_level = state.knowledge_level
+        if previous == LearningPhase.KNOWLEDGE_CHECK and user_choice in KNOWLEDGE_CHOICES:
+            knowledge_level = KNOWLEDGE_CHOICES[user_choice]
+            values["knowledge_level"] = knowledge_level
+
+        result = db.execute(
+            update(models.ChatRoom)
+            .where(models.ChatRoom.id == room_id, models.ChatRoom.version == state.version)
+            .values(**values)
+        )
+        if result.rowcount == 0:
+            db.rollback()
+            # 캐시가 오래됐으므로 버리고 다음 요청에서 다시 읽음
+            self.invalidate(room_id)
+            raise VersionConflict(f"room {room_id} was modified concurrently")
+        db.commit()
+
+        with self._lock:
+            state.phase = next_phase
+            state.knowledge_level = knowledge_level
+            state.version += 1
+
+        info = self.phase_info(state)
+        info["previous_phase"] = previous.value
+        return info
+
+learning_sessions = LearningSessionService()
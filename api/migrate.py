@@ -0,0 +1,27 @@
+# backend/migrate.py
+# 사용법: python migrate.py [upgrade [버전] | status]
+import sys
+
+from database import engine
+from migrations import LATEST_VERSION, MIGRATIONS, applied_versions, current_version, migrate
+
+def status():
+    version = current_version(engine)
+    applied = set(applied_versions(engine)) if version else set()
+    print(f"현재 버전: {version or '(없음)'} / 최신: {LATEST_VERSION}")
+    for migration in MIGRATIONS:
+        mark = "✅" if migration.VERSION in applied else "⬜"
+        print(f"  {mark} {migration.VERSION} {migration.DESCRIPTION}")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+
+    if command == "upgrade":
+        target = sys.argv[2] if len(sys.argv) > 2 else None
+        done = migrate(engine, target=target)
+        print(f"✅ {len(done)}개 마이그레이션 적용" if done else "✅ 이미 최신 스키마입니다")
+    elif command == "status":
+        status()
+    else:
+        print(f"알 수 없는 명령: {command} (upgrade | status)")
+        sys.exit(1)
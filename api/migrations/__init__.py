@@ -0,0 +1,110 @@
+# backend/migrations/__init__.py
+"""
+버전별 스키마 마이그레이션
+
+각 마이그레이션 모듈은 다음을 정의한다:
+    VERSION: "0001" 형식의 정렬 가능한 문자열
+    DESCRIPTION: 한 줄 설명
+    TRANSACTIONAL: False면 autocommit 연결에서 실행 (Postgres CREATE INDEX CONCURRENTLY 등)
+    upgrade(conn): 스키마 변경
+새 마이그레이션은 MIGRATIONS 목록 끝에 추가한다.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from migrations import (
+    v0001_initial, v0002_legacy_schema, v0003_foreign_key_indexes, v0004_integer_room_ids,
+    v0005_sync_columns, v0006_idempotency_keys, v0007_item_stats,
+)
+
+MIGRATIONS = [
+    v0001_initial,
+    v0002_legacy_schema,
+    v0003_foreign_key_indexes,
+    v0004_integer_room_ids,
+    v0005_sync_columns,
+    v0006_idempotency_keys,
+    v0007_item_stats,
+]
+
+LATEST_VERSION = MIGRATIONS[-1].VERSION
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _metadata,
+    Column("version", String(32), primary_key=True),
+    Column("description", String(200)),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+class SchemaOutOfDate(RuntimeError):
+    """DB 스키마가 코드보다 오래됨"""
+
+def current_version(engine: Engine) -> Optional[str]:
+    """적용된 마지막 버전 (마이그레이션 테이블이 없으면 None) - 쿼리 한 번"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(schema_migrations.c.version))).scalar()
+    except (OperationalError, ProgrammingError):
+        return None
+
+def applied_versions(engine: Engine) -> List[str]:
+    with engine.connect() as conn:
+        return [row[0] for row in conn.execute(select(schema_migrations.c.version))]
+
+def migrate(engine: Engine, target: Optional[str] = None) -> List[str]:
+    """
+    아직 적용되지 않은 마이그레이션을 순서대로 적용
+
+    Returns:
+        이번에 적용한 버전 목록
+    """
+    _metadata.create_all(bind=engine, checkfirst=True)
+    applied = set(applied_versions(engine))
+    done = []
+
+    for migration in MIGRATIONS:
+        if target is not None and migration.VERSION > target:
+            break
+        if migration.VERSION in applied:
+            continue
+
+        print(f"⬆️ 마이그레이션 {migration.VERSION}: {migration.DESCRIPTION}")
+        if getattr(migration, "TRANSACTIONAL", True):
+            with engine.begin() as conn:
+                migration.upgrade(conn)
+                _record(conn, migration)
+        else:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                migration.upgrade(conn)
+                _record(conn, migration)
+        done.append(migration.VERSION)
+
+    return done
+
+def _record(conn: Connection, migration):
+    conn.execute(schema_migrations.insert().values(
+        version=migration.VERSION,
+        description=migration.DESCRIPTION,
+        applied_at=datetime.utcnow()
+    ))
+
+def check_schema(engine: Engine, auto_migrate: bool = False):
+    """
+    서버 시작 시 스키마 버전 확인 (테이블 반영 대신 쿼리 한 번)
+    auto_migrate면 부족한 마이그레이션을 적용하고, 아니면 SchemaOutOfDate
+    """
+    version = current_version(engine)
+    if version == LATEST_VERSION:
+        return
+    if auto_migrate:
+        migrate(engine)
+        return
+    raise SchemaOutOfDate(
+        f"DB 스키마 버전 {version or '(없음)'} < {LATEST_VERSION}. "
+        f"'python migrate.py upgrade'를 실행하세요"
+    )
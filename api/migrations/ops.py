@@ -0,0 +1,29 @@
+# backend/migrations/ops.py
+from contextlib import contextmanager
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+def create_index(conn: Connection, name: str, table: str, columns: List[str], unique: bool = False):
+    """
+    인덱스 생성 (이미 있으면 건너뜀)
+    Postgres에서는 CONCURRENTLY로 만들어 테이블 쓰기를 막지 않음
+    (autocommit 연결 필요 → 해당 마이그레이션은 TRANSACTIONAL = False)
+    """
+    unique_sql = "UNIQUE " if unique else ""
+    concurrently = "CONCURRENTLY " if conn.dialect.name == "postgresql" else ""
+    conn.execute(text(
+        f"CREATE {unique_sql}INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    ))
+
+@contextmanager
+def explicit_transaction(conn: Connection):
+    """autocommit 연결에서 여러 문장을 한 트랜잭션으로 묶기"""
+    conn.execute(text("BEGIN"))
+    try:
+        yield
+        conn.execute(text("COMMIT"))
+    except Exception:
+        conn.execute(text("ROLLBACK"))
+        raise
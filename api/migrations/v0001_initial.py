@@ -0,0 +1,91 @@
+# backend/migrations/v0001_initial.py
+"""
+초기 스키마 스냅샷
+models.py가 바뀌어도 이 파일은 바꾸지 않는다 (변경은 새 마이그레이션으로)
+기존 create_all로 만든 DB에서는 이미 있는 테이블을 건너뜀
+"""
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, text
+
+VERSION = "0001"
+DESCRIPTION = "초기 스키마 (채팅방, 메시지, 사용자, 퀴즈, 진행 기록)"
+
+metadata = MetaData()
+
+users = Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("username", String(100), unique=True, nullable=False, index=True),
+    Column("email", String(100), unique=True, nullable=False, index=True),
+    Column("hashed_password", String(255), nullable=False),
+    Column("created_at", DateTime),
+    Column("deleted_at", DateTime, nullable=True),
+)
+
+chat_rooms = Table(
+    "chat_rooms", metadata,
+    Column("id", String, primary_key=True),
+    Column("title", String(200), nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("learning_phase", String(50)),
+    Column("current_concept", String(500), nullable=True),
+    Column("knowledge_level", Integer),
+    Column("context_summary", Text, nullable=True),
+    Column("summary_until", DateTime, nullable=True),
+    Column("version", Integer, nullable=False, server_default=text("0")),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+)
+
+messages = Table(
+    "messages", metadata,
+    Column("id", String, primary_key=True),
+    Column("room_id", String, ForeignKey("chat_rooms.id", ondelete="CASCADE")),
+    Column("role", String(50)),
+    Column("content", Text),
+    Column("created_at", DateTime),
+    Column("phase", String(50), nullable=True),
+    Column("is_explanation", Boolean),
+)
+
+quizzes = Table(
+    "quizzes", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("quiz_name", String(200), nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+)
+
+quiz_questions = Table(
+    "quiz_questions", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False),
+    Column("question_text", Text, nullable=False),
+    Column("question_type", String(50)),
+    Column("question_order", Integer, nullable=False),
+    Column("correct_answer", Text, nullable=True),
+    Column("created_at", DateTime),
+)
+
+quiz_answers = Table(
+    "quiz_answers", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("question_id", Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), nullable=False),
+    Column("answer_text", Text, nullable=False),
+    Column("is_correct", Boolean),
+    Column("answer_order", Integer, nullable=False),
+)
+
+user_progress = Table(
+    "user_progress", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+    Column("question_id", Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), nullable=False),
+    Column("last_attempted", DateTime),
+    Column("correct_count", Integer),
+    Column("total_attempts", Integer),
+    Column("next_review_date", DateTime, nullable=True),
+)
+
+def upgrade(conn):
+    metadata.create_all(bind=conn, checkfirst=True)
@@ -0,0 +1,100 @@
+# backend/migrations/v0002_legacy_schema.py
+"""
+예전 create_all로 만든 DB를 0001 스냅샷에 맞춤
+- 나중에 추가된 컬럼 (대화 요약, 버전, 탈퇴 표시)
+- 외래 키 ON DELETE 규칙
+새로 만든 DB에서는 아무것도 하지 않음
+"""
+from sqlalchemy import MetaData, inspect, text
+
+from migrations.ops import explicit_transaction
+from migrations.v0001_initial import metadata as snapshot
+
+VERSION = "0002"
+DESCRIPTION = "기존 create_all 스키마에 누락된 컬럼과 ON DELETE 규칙 추가"
+# SQLite 테이블 재작성은 외래 키를 끈 상태에서 해야 하므로 트랜잭션을 직접 관리
+TRANSACTIONAL = False
+
+ADDED_COLUMNS = {
+    "chat_rooms": ["context_summary", "summary_until", "version"],
+    "users": ["deleted_at"],
+}
+
+def upgrade(conn):
+    inspector = inspect(conn)
+    _add_missing_columns(conn, inspector)
+    stale = _tables_with_stale_foreign_keys(inspector)
+    if not stale:
+        return
+    if conn.dialect.name == "sqlite":
+        _rebuild_sqlite_tables(conn, stale)
+    else:
+        _replace_foreign_keys(conn, inspector, stale)
+
+def _add_missing_columns(conn, inspector):
+    for table_name, column_names in ADDED_COLUMNS.items():
+        existing = {c["name"] for c in inspector.get_columns(table_name)}
+        for name in column_names:
+            if name in existing:
+                continue
+            column = snapshot.tables[table_name].c[name]
+            ddl = f"ALTER TABLE {table_name} ADD COLUMN {name} {column.type.compile(dialect=conn.dialect)}"
+            if column.server_default is not None:
+                ddl += f" NOT NULL DEFAULT {column.server_default.arg.text}"
+            conn.execute(text(ddl))
+
+def _expected_ondelete(table_name: str):
+    return {(fk.parent.name,): fk.ondelete for fk in snapshot.tables[table_name].foreign_keys}
+
+def _tables_with_stale_foreign_keys(inspector):
+    stale = []
+    for table_name in snapshot.tables:
+        expected = _expected_ondelete(table_name)
+        for fk in inspector.get_foreign_keys(table_name):
+            want = expected.get(tuple(fk["constrained_columns"]))
+            have = (fk.get("options") or {}).get("ondelete")
+            if want and (have or "").upper() != want.upper():
+                stale.append(table_name)
+                break
+    return stale
+
+def _replace_foreign_keys(conn, inspector, tables):
+    with explicit_transaction(conn):
+        for table_name in tables:
+            expected = _expected_ondelete(table_name)
+            for fk in inspector.get_foreign_keys(table_name):
+                columns = fk["constrained_columns"]
+                want = expected.get(tuple(columns))
+                if not want:
+                    continue
+                name = fk["name"]
+                conn.execute(text(f"ALTER TABLE {table_name} DROP CONSTRAINT {name}"))
+                conn.execute(text(
+                    f"ALTER TABLE {table_name} ADD CONSTRAINT {name} "
+                    f"FOREIGN KEY ({', '.join(columns)}) "
+                    f"REFERENCES {fk['referred_table']} ({', '.join(fk['referred_columns'])}) "
+                    f"ON DELETE {want}"
+                ))
+
+def _rebuild_sqlite_tables(conn, tables):
+    """SQLite는 제약 조건을 바꿀 수 없으므로 새 테이블로 복사 후 교체"""
+    conn.execute(text("PRAGMA foreign_keys=OFF"))
+    try:
+        with explicit_transaction(conn):
+            for table_name in tables:
+                table = snapshot.tables[table_name]
+                temp_name = f"{table_name}__new"
+                # 외래 키가 참조하는 테이블도 같은 MetaData에 있어야 DDL을 만들 수 있음
+                scratch = MetaData()
+                for other in snapshot.sorted_tables:
+                    other.to_metadata(scratch)
+                new_table = table.to_metadata(scratch, name=temp_name)
+                new_table.create(bind=conn)
+
+                old_columns = {c["name"] for c in inspect(conn).get_columns(table_name)}
+                columns = ", ".join(c.name for c in table.columns if c.name in old_columns)
+                conn.execute(text(f"INSERT INTO {temp_name} ({columns}) SELECT {columns} FROM {table_name}"))
+                conn.execute(text(f"DROP TABLE {table_name}"))
+                conn.execute(text(f"ALTER TABLE {temp_name} RENAME TO {table_name}"))
+    finally:
+        conn.execute(text("PRAGMA foreign_keys=ON"))
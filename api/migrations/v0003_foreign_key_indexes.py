@@ -0,0 +1,24 @@
+# backend/migrations/v0003_foreign_key_indexes.py
+"""
+외래 키 컬럼 인덱스 (ON DELETE CASCADE와 사용자별 조회에 필요)
+Postgres에서는 CONCURRENTLY로 온라인 생성
+"""
+from migrations.ops import create_index
+
+VERSION = "0003"
+DESCRIPTION = "외래 키 컬럼 인덱스"
+TRANSACTIONAL = False
+
+INDEXES = [
+    ("ix_chat_rooms_user_id", "chat_rooms", ["user_id"]),
+    ("ix_messages_room_id", "messages", ["room_id"]),
+    ("ix_quizzes_user_id", "quizzes", ["user_id"]),
+    ("ix_quiz_questions_quiz_id", "quiz_questions", ["quiz_id"]),
+    ("ix_quiz_answers_question_id", "quiz_answers", ["question_id"]),
+    ("ix_user_progress_user_id", "user_progress", ["user_id"]),
+    ("ix_user_progress_question_id", "user_progress", ["question_id"]),
+]
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
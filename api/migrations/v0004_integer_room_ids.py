@@ -0,0 +1,112 @@
+# backend/migrations/v0004_integer_room_ids.py
+"""
+채팅방/메시지 기본 키를 랜덤 UUID 문자열 → BIGINT 자동 증가로 변환
+- 삽입 순서대로 증가하는 키라 인덱스 끝에만 추가되고 (UUID는 인덱스 전체에 흩어짐)
+  키 크기도 36바이트 → 8바이트
+- 기존 행은 created_at 순서로 번호를 매겨 시간 순서를 유지
+- 예전 채팅방 UUID는 chat_rooms.legacy_id에 남겨 예전 링크를 새 id로 바꿀 수 있게 함
+- 메시지는 (room_id, id) 복합 인덱스로 채팅방별 시간순 조회를 인덱스만으로 처리
+"""
+from sqlalchemy import (
+    BigInteger, Boolean, Column, DateTime, ForeignKey, Integer, MetaData, String, Table, Text, text
+)
+
+from migrations.ops import create_index, explicit_transaction
+
+VERSION = "0004"
+DESCRIPTION = "채팅방/메시지 id를 시간 순서 BIGINT로 변환 (기존 UUID는 legacy_id로 보관)"
+# 테이블 교체 후 인덱스를 CONCURRENTLY로 만들기 위해 트랜잭션을 직접 관리
+TRANSACTIONAL = False
+
+# SQLite는 INTEGER PRIMARY KEY여야 rowid 자동 증가가 됨
+BigId = BigInteger().with_variant(Integer, "sqlite")
+
+_metadata = MetaData()
+
+chat_rooms_new = Table(
+    "chat_rooms__new", _metadata,
+    Column("id", BigId, primary_key=True, autoincrement=True),
+    Column("legacy_id", String(36), nullable=True),
+    Column("title", String(200), nullable=False),
+    Column("created_at", DateTime),
+    Column("updated_at", DateTime),
+    Column("learning_phase", String(50)),
+    Column("current_concept", String(500), nullable=True),
+    Column("knowledge_level", Integer),
+    Column("context_summary", Text, nullable=True),
+    Column("summary_until", DateTime, nullable=True),
+    Column("version", Integer, nullable=False, server_default=text("0")),
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True),
+)
+
+messages_new = Table(
+    "messages__new", _metadata,
+    Column("id", BigId, primary_key=True, autoincrement=True),
+    Column("room_id", BigId, ForeignKey("chat_rooms__new.id", ondelete="CASCADE")),
+    Column("role", String(50)),
+    Column("content", Text),
+    Column("created_at", DateTime),
+    Column("phase", String(50), nullable=True),
+    Column("is_explanation", Boolean),
+)
+
+# users 테이블을 참조하므로 DDL 생성용으로만 선언
+Table("users", _metadata, Column("id", Integer, primary_key=True))
+
+ROOM_COLUMNS = (
+    "title, created_at, updated_at, learning_phase, current_concept, knowledge_level, "
+    "context_summary, summary_until, version, user_id"
+)
+MESSAGE_COLUMNS = "role, content, created_at, phase, is_explanation"
+
+INDEXES = [
+    ("ix_chat_rooms_legacy_id", "chat_rooms", ["legacy_id"], True),
+    ("ix_chat_rooms_user_id", "chat_rooms", ["user_id"], False),
+    ("ix_messages_room_id_id", "messages", ["room_id", "id"], False),
+]
+
+def upgrade(conn):
+    sqlite = conn.dialect.name == "sqlite"
+    if sqlite:
+        conn.execute(text("PRAGMA foreign_keys=OFF"))
+    try:
+        with explicit_transaction(conn):
+            _metadata.create_all(bind=conn, tables=[chat_rooms_new, messages_new])
+            _copy_rows(conn)
+            conn.execute(text("DROP TABLE messages"))
+            conn.execute(text("DROP TABLE chat_rooms"))
+            # 이름을 바꾸면 messages의 외래 키도 새 이름을 따라감 (Postgres, SQLite 3.26+)
+            conn.execute(text("ALTER TABLE chat_rooms__new RENAME TO chat_rooms"))
+            conn.execute(text("ALTER TABLE messages__new RENAME TO messages"))
+            if not sqlite:
+                _reset_sequences(conn)
+    finally:
+        if sqlite:
+            conn.execute(text("PRAGMA foreign_keys=ON"))
+
+    for name, table, columns, unique in INDEXES:
+        create_index(conn, name, table, columns, unique=unique)
+
+def _copy_rows(conn):
+    """
+    기존 UUID 행을 생성 시각 순으로 번호 매겨 복사 (SQL 두 문장, 행 수와 무관)
+    room_id가 없는(고아) 메시지는 room_id NULL로 보존
+    """
+    conn.execute(text(
+        f"INSERT INTO chat_rooms__new (id, legacy_id, {ROOM_COLUMNS}) "
+        f"SELECT ROW_NUMBER() OVER (ORDER BY created_at, id), id, {ROOM_COLUMNS} FROM chat_rooms"
+    ))
+    prefixed = ", ".join(f"m.{c.strip()}" for c in MESSAGE_COLUMNS.split(","))
+    conn.execute(text(
+        f"INSERT INTO messages__new (id, room_id, {MESSAGE_COLUMNS}) "
+        f"SELECT ROW_NUMBER() OVER (ORDER BY m.created_at, m.id), r.id, {prefixed} "
+        f"FROM messages m LEFT JOIN chat_rooms__new r ON r.legacy_id = m.room_id"
+    ))
+
+def _reset_sequences(conn):
+    """id를 직접 넣었으므로 Postgres 시퀀스를 최댓값 다음으로 맞춤"""
+    for table in ("chat_rooms", "messages"):
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE(MAX(id), 0) + 1, false) FROM {table}"
+        ))
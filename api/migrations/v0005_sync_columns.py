@@ -0,0 +1,55 @@
+# backend/migrations/v0005_sync_columns.py
+"""
+델타 동기화용 변경 시각 컬럼과 삭제 기록(tombstone) 테이블
+- quiz_questions / quiz_answers / user_progress에 updated_at (+ 인덱스)
+- user_progress에 API가 쓰던 is_correct, interval_days 컬럼 추가
+- sync_tombstones: 삭제된 행을 (사용자, 종류, id)로 기록
+"""
+from sqlalchemy import BigInteger, Column, DateTime, Integer, MetaData, String, Table, inspect, text
+
+from migrations.ops import create_index
+
+VERSION = "0005"
+DESCRIPTION = "동기화용 updated_at 컬럼, 진행 기록 컬럼, sync_tombstones 테이블"
+TRANSACTIONAL = False
+
+_metadata = MetaData()
+
+sync_tombstones = Table(
+    "sync_tombstones", _metadata,
+    Column("id", BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True),
+    Column("user_id", Integer, nullable=False),
+    Column("entity", String(20), nullable=False),
+    Column("entity_id", BigInteger, nullable=False),
+    Column("deleted_at", DateTime, nullable=False),
+)
+
+# (테이블, 컬럼, 타입, 기존 행에 채울 값)
+ADDED_COLUMNS = [
+    ("quiz_questions", "updated_at", "TIMESTAMP", "COALESCE(created_at, CURRENT_TIMESTAMP)"),
+    ("quiz_answers", "updated_at", "TIMESTAMP", "CURRENT_TIMESTAMP"),
+    ("user_progress", "updated_at", "TIMESTAMP", "COALESCE(last_attempted, CURRENT_TIMESTAMP)"),
+    ("user_progress", "is_correct", "BOOLEAN", "FALSE"),
+    ("user_progress", "interval_days", "INTEGER", "1"),
+]
+
+INDEXES = [
+    ("ix_quizzes_updated_at", "quizzes", ["updated_at"]),
+    ("ix_quiz_questions_updated_at", "quiz_questions", ["updated_at"]),
+    ("ix_quiz_answers_updated_at", "quiz_answers", ["updated_at"]),
+    ("ix_user_progress_updated_at", "user_progress", ["updated_at"]),
+    ("ix_sync_tombstones_user_id_deleted_at", "sync_tombstones", ["user_id", "deleted_at"]),
+]
+
+def upgrade(conn):
+    for table, column, type_sql, fill in ADDED_COLUMNS:
+        existing = {c["name"] for c in inspect(conn).get_columns(table)}
+        if column in existing:
+            continue
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {type_sql}"))
+        conn.execute(text(f"UPDATE {table} SET {column} = {fill}"))
+
+    _metadata.create_all(bind=conn, checkfirst=True)
+
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
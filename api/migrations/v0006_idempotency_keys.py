@@ -0,0 +1,29 @@
+# backend/migrations/v0006_idempotency_keys.py
+"""
+재시도된 요청의 결과를 돌려주기 위한 멱등성 키 테이블
+"""
+from sqlalchemy import Column, DateTime, Integer, LargeBinary, MetaData, String, Table
+
+from migrations.ops import create_index
+
+VERSION = "0006"
+DESCRIPTION = "idempotency_keys 테이블"
+TRANSACTIONAL = False
+
+_metadata = MetaData()
+
+idempotency_keys = Table(
+    "idempotency_keys", _metadata,
+    Column("scope", String(100), primary_key=True),
+    Column("key", String(128), primary_key=True),
+    Column("fingerprint", String(64), nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("status_code", Integer, nullable=True),
+    Column("response_body", LargeBinary, nullable=True),
+    Column("created_at", DateTime, nullable=False),
+    Column("expires_at", DateTime, nullable=False),
+)
+
+def upgrade(conn):
+    _metadata.create_all(bind=conn, checkfirst=True)
+    create_index(conn, "ix_idempotency_keys_expires_at", "idempotency_keys", ["expires_at"])
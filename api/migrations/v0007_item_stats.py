@@ -0,0 +1,58 @@
+# backend/migrations/v0007_item_stats.py
+"""
+문제/퀴즈/학습자별 풀이 통계 테이블 (진행 기록 저장 트랜잭션에서 증분 갱신)
+- 처음에는 비어 있고, 서버 시작 후 정합성 맞추기 작업이 user_progress로 채움
+"""
+from sqlalchemy import BigInteger, Column, DateTime, Float, ForeignKey, Integer, MetaData, Table
+
+from migrations.ops import create_index
+
+VERSION = "0007"
+DESCRIPTION = "question_stats / quiz_stats / learner_stats 테이블"
+TRANSACTIONAL = False
+
+_metadata = MetaData()
+
+# 외래 키 대상 (이미 있는 테이블 - 만들지 않음)
+Table("users", _metadata, Column("id", Integer, primary_key=True))
+Table("quizzes", _metadata, Column("id", Integer, primary_key=True))
+Table("quiz_questions", _metadata, Column("id", Integer, primary_key=True))
+
+def _counters():
+    return [
+        Column("attempts", Integer, nullable=False, default=0),
+        Column("correct_attempts", Integer, nullable=False, default=0),
+        Column("learners", Integer, nullable=False, default=0),
+        Column("timed_attempts", Integer, nullable=False, default=0),
+        Column("response_ms_total", BigInteger, nullable=False, default=0),
+        Column("ability_total", Float, nullable=False, default=0),
+        Column("ability_sq_total", Float, nullable=False, default=0),
+        Column("ability_correct_total", Float, nullable=False, default=0),
+        Column("updated_at", DateTime, nullable=False),
+        Column("reconciled_at", DateTime, nullable=True),
+    ]
+
+question_stats = Table(
+    "question_stats", _metadata,
+    Column("question_id", Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), primary_key=True),
+    Column("quiz_id", Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False),
+    *_counters(),
+)
+
+quiz_stats = Table(
+    "quiz_stats", _metadata,
+    Column("quiz_id", Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True),
+    *_counters(),
+)
+
+learner_stats = Table(
+    "learner_stats", _metadata,
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("attempts", Integer, nullable=False, default=0),
+    Column("correct_attempts", Integer, nullable=False, default=0),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+def upgrade(conn):
+    _metadata.create_all(bind=conn, tables=[question_stats, quiz_stats, learner_stats], checkfirst=True)
+    create_index(conn, "ix_question_stats_quiz_id", "question_stats", ["quiz_id"])
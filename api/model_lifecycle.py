@@ -0,0 +1,210 @@
+# backend/model_lifecycle.py
+"""
+Ollama 모델 워밍업 / keep_alive 관리 / 준비 상태
+- 서버 시작 시 설정된 모델을 미리 로드 (빈 프롬프트 요청 = 모델만 메모리에 올림)
+- keep_alive 정책
+  * 상주 모델(OLLAMA_WARM_MODELS): OLLAMA_KEEP_ALIVE, 만료 전에 다시 요청해 계속 메모리에 유지
+  * 그 외 모델: 최근 트래픽이 많으면 OLLAMA_KEEP_ALIVE, 적으면 OLLAMA_IDLE_KEEP_ALIVE
+  (-1로 무기한 고정하지 않는 이유: 서버가 내려가면 갱신도 멈춰 모델이 알아서 내려감)
+- /api/ps로 로드 상태와 백엔드 지연을 확인 → 준비 상태 엔드포인트에서 사용
+"""
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional
+
+import requests
+
+from ollama_client import KEEP_ALIVE, MODEL_NAME, OLLAMA_API_URL
+
+OLLAMA_BASE_URL = OLLAMA_API_URL.rsplit("/api/", 1)[0]
+# 쉼표로 구분, 서버 시작 시 로드하고 항상 유지할 모델
+WARM_MODELS = [m.strip() for m in os.getenv("OLLAMA_WARM_MODELS", MODEL_NAME).split(",") if m.strip()]
+# 트래픽이 적은 비상주 모델의 keep_alive
+IDLE_KEEP_ALIVE = os.getenv("OLLAMA_IDLE_KEEP_ALIVE", "5m")
+# 이 시간 동안 BUSY_REQUESTS번 이상 호출되면 바쁜 모델로 봄
+TRAFFIC_WINDOW = 600
+BUSY_REQUESTS = int(os.getenv("OLLAMA_BUSY_REQUESTS", "3"))
+# 상태 확인 / keep_alive 갱신 주기 (초)
+CHECK_INTERVAL = int(os.getenv("OLLAMA_CHECK_INTERVAL", "60"))
+# 0이면 시작 시 워밍업과 주기적 갱신을 하지 않음 (Ollama 없는 개발 환경)
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "1") == "1"
+
+WARMUP_TIMEOUT = 600
+STATUS_TIMEOUT = 3
+
+def parse_duration(value: str) -> float:
+    """Ollama keep_alive 형식("30m", "1h", "300")을 초 단위로 변환"""
+    match = re.fullmatch(r'\s*(-?\d+(?:\.\d+)?)\s*([smh]?)\s*', str(value))
+    if not match:
+        return 0.0
+    number, unit = float(match.group(1)), match.group(2)
+    return number * {"": 1, "s": 1, "m": 60, "h": 3600}[unit]
+
+def _same_model(configured: str, loaded: str) -> bool:
+    """태그 없는 이름("llama3.1")은 ":latest"로 로드됨"""
+    if ":" not in configured:
+        configured += ":latest"
+    return configured == loaded
+
+def _parse_expires_at(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    # Ollama는 나노초 + 시간대 오프셋 형식 - 소수점 6자리까지만 파싱
+    value = re.sub(r'(\.\d{6})\d+', r'\1', value).replace("Z", "+00:00")
+    try:
+        return datetime.fromisoformat(value).astimezone(timezone.utc).timestamp()
+    except ValueError:
+        return None
+
+class ModelLifecycleManager:
+    def __init__(self, warm_models: List[str] = WARM_MODELS):
+        self.warm_models = warm_models
+        self._uses: Dict[str, Deque[float]] = {}
+        self._loaded: Dict[str, Optional[float]] = {}  # 모델 → 만료 시각 (unix)
+        self._warmup_ms: Dict[str, float] = {}
+        self._backend_ok = False
+        self._backend_latency_ms: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    # ===== keep_alive 정책 =====
+
+    def record_use(self, model: str):
+        now = time.time()
+        with self._lock:
+            uses = self._uses.setdefault(model, deque())
+            uses.append(now)
+            while uses and uses[0] < now - TRAFFIC_WINDOW:
+                uses.popleft()
+
+    def is_busy(self, model: str) -> bool:
+        cutoff = time.time() - TRAFFIC_WINDOW
+        with self._lock:
+            return sum(1 for t in self._uses.get(model, ()) if t >= cutoff) >= BUSY_REQUESTS
+
+    def keep_alive_for(self, model: str) -> str:
+        if model in self.warm_models or self.is_busy(model):
+            return KEEP_ALIVE
+        return IDLE_KEEP_ALIVE
+
+    # ===== 워밍업 / 상태 확인 (블로킹, 스레드에서 호출) =====
+
+    def warm_up(self, model: str) -> bool:
+        """빈 프롬프트로 모델만 로드하고 keep_alive 연장"""
+        start = time.perf_counter()
+        try:
+            response = requests.post(
+                OLLAMA_API_URL,
+                json={"model": model, "prompt": "", "stream": False, "keep_alive": self.keep_alive_for(model)},
+                timeout=WARMUP_TIMEOUT
+            )
+        except requests.exceptions.RequestException as e:
+            print(f"⚠️ 모델 워밍업 실패 ({model}): {e}")
+            return False
+        if response.status_code != 200:
+            print(f"⚠️ 모델 워밍업 실패 ({model}): {response.status_code}")
+            return False
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._warmup_ms[model] = round(elapsed_ms, 1)
+            self._loaded[model] = time.time() + parse_duration(self.keep_alive_for(model))
+        print(f"🔥 모델 워밍업 완료: {model} ({elapsed_ms:.0f}ms)")
+        return True
+
+    def refresh_status(self) -> bool:
+        """/api/ps로 로드된 모델과 만료 시각, 백엔드 응답 시간 갱신"""
+        start = time.perf_counter()
+        try:
+            response = requests.get(f"{OLLAMA_BASE_URL}/api/ps", timeout=STATUS_TIMEOUT)
+            response.raise_for_status()
+            running = response.json().get("models") or []
+        except (requests.exceptions.RequestException, ValueError) as e:
+            with self._lock:
+                self._backend_ok = False
+                self._backend_latency_ms = None
+                self._loaded.clear()
+                self._checked_at = time.time()
+            print(f"⚠️ Ollama 상태 확인 실패: {e}")
+            return False
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            tracked = set(self.warm_models) | set(self._uses)
+        loaded = {}
+        for model in tracked:
+            for entry in running:
+                if _same_model(model, entry.get("name") or entry.get("model") or ""):
+                    loaded[model] = _parse_expires_at(entry.get("expires_at"))
+        with self._lock:
+            self._backend_ok = True
+            self._backend_latency_ms = round(latency_ms, 1)
+            self._loaded = loaded
+            self._checked_at = time.time()
+        return True
+
+    def maintain(self):
+        """상주 모델이 내려갔거나 다음 확인 전에 만료되면 다시 로드"""
+        if not self.refresh_status():
+            return
+        deadline = time.time() + CHECK_INTERVAL * 2
+        for model in self.warm_models:
+            with self._lock:
+                loaded = model in self._loaded
+                expires_at = self._loaded.get(model)
+            if not loaded or (expires_at is not None and expires_at < deadline):
+                self.warm_up(model)
+
+    async def run(self):
+        """서버 시작 시 백그라운드 작업으로 실행 - 첫 워밍업 후 주기적으로 유지"""
+        for model in self.warm_models:
+            await asyncio.to_thread(self.warm_up, model)
+        while True:
+            try:
+                await asyncio.to_thread(self.maintain)
+            except Exception as e:
+                print(f"⚠️ 모델 상태 유지 실패: {e}")
+            await asyncio.sleep(CHECK_INTERVAL)
+
+    # ===== 준비 상태 =====
+
+    def readiness(self) -> Dict:
+        """
+        상주 모델이 모두 로드돼 있고 백엔드가 응답하면 ready
+        (워밍업을 끈 환경에서는 백엔드 응답만 확인)
+        """
+        with self._lock:
+            models = {
+                model: {
+                    "loaded": model in self._loaded,
+                    "expires_at": self._loaded.get(model),
+                    "warmup_ms": self._warmup_ms.get(model),
+                    "keep_alive": None,
+                }
+                for model in self.warm_models
+            }
+            backend_ok = self._backend_ok
+            latency_ms = self._backend_latency_ms
+            checked_at = self._checked_at
+        for model, info in models.items():
+            info["keep_alive"] = self.keep_alive_for(model)
+
+        models_ready = all(info["loaded"] for info in models.values()) or not MODEL_WARMUP
+        return {
+            "ready": backend_ok and models_ready,
+            "backend_ok": backend_ok,
+            "backend_latency_ms": latency_ms,
+            "checked_at": checked_at,
+            "models": models,
+        }
+
+    def status_is_stale(self) -> bool:
+        with self._lock:
+            return self._checked_at is None or self._checked_at < time.time() - CHECK_INTERVAL
+
+model_lifecycle = ModelLifecycleManager()
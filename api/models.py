@@ -1,16 +1,19 @@
 # backend/models.py (통합 버전)
-from sqlalchemy import Column, String, Text, DateTime, ForeignKey, Integer, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import BigInteger, Column, String, Text, DateTime, Float, ForeignKey, Index, Integer, Boolean, LargeBinary
+from sqlalchemy.orm import relationship, synonym
 from database import Base
 from datetime import datetime
-import uuid
+
+# 채팅방/메시지 id: 삽입 순서로 증가하는 BIGINT (SQLite는 INTEGER PRIMARY KEY여야 자동 증가)
+BigId = BigInteger().with_variant(Integer, "sqlite")
 
 # ========== 기존 파인만 학습 모델 ==========
 
 class ChatRoom(Base):
     __tablename__ = "chat_rooms"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(BigId, primary_key=True, autoincrement=True)
+    legacy_id = Column(String(36), unique=True, index=True, nullable=True)  # 변환 전 UUID (예전 링크 조회용)
     title = Column(String(200), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -18,18 +21,30 @@ class ChatRoom(Base):
     learning_phase = Column(String(50), default="home")
     current_concept = Column(String(500), nullable=True)
     knowledge_level = Column(Integer, default=0)
+
+    # 대화 컨텍스트 요약 (오래된 턴을 누적 요약)
+    context_summary = Column(Text, nullable=True)
+    summary_until = Column(DateTime, nullable=True)  # 요약에 포함된 마지막 메시지 시각
+
+    # 학습 상태 낙관적 동시성 제어용 버전
+    version = Column(Integer, default=0, nullable=False)
     
     # 사용자 연결 추가
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
     
-    messages = relationship("Message", back_populates="room", cascade="all, delete-orphan")
+    messages = relationship("Message", back_populates="room", cascade="all, delete-orphan", passive_deletes=True)
     user = relationship("User", back_populates="chat_rooms")
 
 class Message(Base):
     __tablename__ = "messages"
     
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    room_id = Column(String, ForeignKey("chat_rooms.id"))
+    __table_args__ = (
+        # 채팅방별 시간순 조회 (id가 시간 순서이므로 created_at 정렬 대신 사용)
+        Index("ix_messages_room_id_id", "room_id", "id"),
+    )
+
+    id = Column(BigId, primary_key=True, autoincrement=True)
+    room_id = Column(BigId, ForeignKey("chat_rooms.id", ondelete="CASCADE"))
     role = Column(String(50))  # user or assistant
     content = Column(Text)
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -50,11 +65,12 @@ class User(Base):
     email = Column(String(100), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    deleted_at = Column(DateTime, nullable=True)  # 탈퇴 후 백그라운드 정리 대기 중
     
-    # Relationships
-    chat_rooms = relationship("ChatRoom", back_populates="user")
-    quizzes = relationship("Quiz", back_populates="user", cascade="all, delete-orphan")
-    progress = relationship("UserProgress", back_populates="user", cascade="all, delete-orphan")
+    # Relationships (하위 행 삭제는 DB의 ON DELETE CASCADE가 처리)
+    chat_rooms = relationship("ChatRoom", back_populates="user", passive_deletes=True)
+    quizzes = relationship("Quiz", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    progress = relationship("UserProgress", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
 # ========== 새로 추가: 퀴즈 시스템 모델 ==========
 
@@ -62,39 +78,41 @@ class Quiz(Base):
     __tablename__ = "quizzes"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     quiz_name = Column(String(200), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     user = relationship("User", back_populates="quizzes")
-    questions = relationship("QuizQuestion", back_populates="quiz", cascade="all, delete-orphan")
+    questions = relationship("QuizQuestion", back_populates="quiz", cascade="all, delete-orphan", passive_deletes=True)
 
 class QuizQuestion(Base):
     __tablename__ = "quiz_questions"
     
     id = Column(Integer, primary_key=True, index=True)
-    quiz_id = Column(Integer, ForeignKey("quizzes.id"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
     question_text = Column(Text, nullable=False)
     question_type = Column(String(50), default="multiple_choice")  # multiple_choice, short_answer
     question_order = Column(Integer, nullable=False)
     correct_answer = Column(Text, nullable=True)  # 서술형 정답
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     quiz = relationship("Quiz", back_populates="questions")
-    answers = relationship("QuizAnswer", back_populates="question", cascade="all, delete-orphan")
-    progress = relationship("UserProgress", back_populates="question", cascade="all, delete-orphan")
+    answers = relationship("QuizAnswer", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
+    progress = relationship("UserProgress", back_populates="question", cascade="all, delete-orphan", passive_deletes=True)
 
 class QuizAnswer(Base):
     __tablename__ = "quiz_answers"
     
     id = Column(Integer, primary_key=True, index=True)
-    question_id = Column(Integer, ForeignKey("quiz_questions.id"), nullable=False)
+    question_id = Column(Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), nullable=False, index=True)
     answer_text = Column(Text, nullable=False)
     is_correct = Column(Boolean, default=False)
     answer_order = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     
     # Relationships
     question = relationship("QuizQuestion", back_populates="answers")
@@ -103,13 +121,86 @@ class UserProgress(Base):
     __tablename__ = "user_progress"
     
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    question_id = Column(Integer, ForeignKey("quiz_questions.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    question_id = Column(Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), nullable=False, index=True)
     last_attempted = Column(DateTime, default=datetime.utcnow)
     correct_count = Column(Integer, default=0)
     total_attempts = Column(Integer, default=0)
     next_review_date = Column(DateTime, nullable=True)
+    is_correct = Column(Boolean, default=False)  # 마지막 풀이 결과
+    interval_days = Column(Integer, default=1)  # 다음 복습까지 간격
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    # API/스키마에서 쓰는 이름
+    attempt_count = synonym("total_attempts")
+    last_reviewed_at = synonym("last_attempted")
     
     # Relationships
     user = relationship("User", back_populates="progress")
-    question = relationship("QuizQuestion", back_populates="progress")
\ No newline at end of file
+    question = relationship("QuizQuestion", back_populates="progress")
+
+# ========== 동기화 ==========
+
+class SyncTombstone(Base):
+    """삭제된 행 기록 - 오프라인 클라이언트가 델타 동기화로 지울 수 있게"""
+    __tablename__ = "sync_tombstones"
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_id_deleted_at", "user_id", "deleted_at"),
+    )
+
+    id = Column(BigId, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, nullable=False)
+    entity = Column(String(20), nullable=False)  # quiz, question, answer, progress, message
+    entity_id = Column(BigInteger, nullable=False)
+    deleted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+# ========== 멱등성 키 ==========
+
+class IdempotencyRecord(Base):
+    """Idempotency-Key 헤더로 들어온 요청의 지문과 완료된 응답"""
+    __tablename__ = "idempotency_keys"
+
+    scope = Column(String(100), primary_key=True)  # 사용자 + 엔드포인트
+    key = Column(String(128), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # 요청 본문 해시
+    status = Column(String(20), nullable=False)  # in_progress | completed
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+# ========== 풀이 통계 (진행 기록 저장 시 증분 갱신, item_stats.py) ==========
+
+class StatsCounters:
+    """문제/퀴즈 통계 공통 누적값 - 정답률, 평균 풀이 시간, 변별도는 여기서 계산"""
+    attempts = Column(Integer, nullable=False, default=0)
+    correct_attempts = Column(Integer, nullable=False, default=0)
+    learners = Column(Integer, nullable=False, default=0)  # 한 번이라도 푼 사용자 수
+    timed_attempts = Column(Integer, nullable=False, default=0)  # 풀이 시간을 보낸 시도 수
+    response_ms_total = Column(BigInteger, nullable=False, default=0)
+    # 변별도(점이연 상관)용 - 시도마다 그 시점 학습자 능력치(전체 정답률)의 합/제곱합/정답일 때의 합
+    ability_total = Column(Float, nullable=False, default=0)
+    ability_sq_total = Column(Float, nullable=False, default=0)
+    ability_correct_total = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    reconciled_at = Column(DateTime, nullable=True)  # 마지막으로 user_progress와 맞춘 시각
+
+class QuestionStats(StatsCounters, Base):
+    __tablename__ = "question_stats"
+
+    question_id = Column(Integer, ForeignKey("quiz_questions.id", ondelete="CASCADE"), primary_key=True)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False, index=True)
+
+class QuizStats(StatsCounters, Base):
+    __tablename__ = "quiz_stats"
+
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), primary_key=True)
+
+class LearnerStats(Base):
+    """학습자 전체 정답률 (변별도 계산용 능력치)"""
+    __tablename__ = "learner_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    correct_attempts = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
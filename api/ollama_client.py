@@ -0,0 +1,86 @@
+# backend/ollama_client.py
+import os
+from typing import Dict, List, Optional
+
+import requests
+from dotenv import load_dotenv
+
+from response_cache import ResponseCache, make_cache_key
+
+load_dotenv()
+
+OLLAMA_API_URL = os.getenv("OLLAMA_API_URL", "http://localhost:11434/api/generate")
+MODEL_NAME = os.getenv("MODEL_NAME", "llama3.1:8b")
+# 모델(과 KV 캐시)을 메모리에 유지할 시간 - 반복 프롬프트의 prefix 재사용에 필요
+KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+# 설정하면 응답 캐시를 SQLite 파일에도 저장
+RESPONSE_CACHE_DB = os.getenv("RESPONSE_CACHE_DB")
+
+def generate_full(
+    prompt: str,
+    model: str = MODEL_NAME,
+    options: Optional[Dict] = None,
+    timeout: int = 120,
+    keep_alive: Optional[str] = None,
+    context: Optional[List[int]] = None
+) -> Optional[Dict]:
+    """
+    Ollama /api/generate 단일 호출 (스트리밍 없음)
+
+    Args:
+        keep_alive: None이면 model_lifecycle의 트래픽 기반 정책값
+
+    Returns:
+        Ollama 응답 JSON 전체 (response, context, prompt_eval_count 등) 또는 실패 시 None
+    """
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": False,
+    }
+    if options:
+        payload["options"] = options
+    # 순환 import 방지 (model_lifecycle이 이 모듈의 설정을 씀)
+    from model_lifecycle import model_lifecycle
+    model_lifecycle.record_use(model)
+    payload["keep_alive"] = keep_alive if keep_alive is not None else model_lifecycle.keep_alive_for(model)
+    if context:
+        payload["context"] = context
+
+    try:
+        response = requests.post(OLLAMA_API_URL, json=payload, timeout=timeout)
+        if response.status_code != 200:
+            print(f"❌ Ollama API 오류: {response.status_code}")
+            return None
+        return response.json()
+    except requests.exceptions.Timeout:
+        print(f"❌ Ollama 타임아웃 ({timeout}초)")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Ollama 호출 실패: {e}")
+        return None
+
+def generate(
+    prompt: str,
+    model: str = MODEL_NAME,
+    options: Optional[Dict] = None,
+    timeout: int = 120,
+    cache: Optional[ResponseCache] = None
+) -> Optional[str]:
+    """
+    생성된 텍스트만 반환 (실패 시 None)
+
+    Args:
+        cache: 결정적인 호출(temperature=0 등)에서만 넘길 것.
+            같은 프롬프트/모델/옵션이면 캐시된 응답을 반환
+    """
+    def _call() -> Optional[str]:
+        result = generate_full(prompt, model=model, options=options, timeout=timeout)
+        if result is None:
+            return None
+        return result.get("response", "")
+
+    if cache is None:
+        return _call()
+    # 빈 응답은 캐시하지 않음 (None은 저장되지 않음)
+    return cache.get_or_generate(make_cache_key(prompt, model, options), lambda: _call() or None)
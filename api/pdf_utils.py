@@ -1,17 +1,19 @@
 # backend/pdf_utils.py
 import PyPDF2
-from typing import Optional, Union
+from typing import List, Optional, Union
 from io import BytesIO
+from text_cleanup import CleanupResult, clean_pages
+from tokenizer import count_tokens, truncate_to_tokens
 
-def extract_text_from_pdf(pdf_file: Union[BytesIO, any]) -> Optional[str]:
+def extract_pages(pdf_file: Union[BytesIO, any]) -> Optional[List[str]]:
     """
-    PDF 파일에서 텍스트 추출
+    PDF 파일에서 페이지별 텍스트 추출 (정리 전)
     
     Args:
         pdf_file: BytesIO 객체 또는 UploadFile 객체
         
     Returns:
-        추출된 텍스트 또는 None
+        페이지별 텍스트 목록 또는 None
     """
     try:
         # BytesIO 객체인 경우
@@ -29,24 +31,53 @@ def extract_text_from_pdf(pdf_file: Union[BytesIO, any]) -> Optional[str]:
             if text:
                 text_content.append(text)
         
-        # 텍스트 결합
-        full_text = "\n".join(text_content)
-        
         # 빈 텍스트 체크
-        if not full_text.strip():
+        if not any(text.strip() for text in text_content):
             return None
             
-        print(f"✅ PDF 추출 완료: {len(full_text)} 글자")
-        return full_text
+        return text_content
         
     except Exception as e:
         print(f"❌ PDF 텍스트 추출 오류: {e}")
         return None
 
+def extract_clean_text(pdf_file: Union[BytesIO, any]) -> Optional[CleanupResult]:
+    """
+    PDF 텍스트 추출 + 머리글/바닥글/쪽 번호 제거, 끊긴 줄/하이픈/공백 정리
+    
+    Returns:
+        정리된 텍스트와 통계 (절약한 토큰 수 등) 또는 None
+    """
+    pages = extract_pages(pdf_file)
+    if pages is None:
+        return None
+    
+    result = clean_pages(pages)
+    if not result.text:
+        return None
+    
+    stats = result.stats
+    print(f"✅ PDF 추출 완료: {stats.chars_before} → {stats.chars_after} 글자")
+    print(f"🧹 텍스트 정리: {stats.tokens_before} → {stats.tokens_after} 토큰 ({stats.tokens_saved} 절약, 반복 줄 {stats.boilerplate_lines}개 제거)")
+    return result
+
+def extract_text_from_pdf(pdf_file: Union[BytesIO, any]) -> Optional[str]:
+    """
+    PDF 파일에서 정리된 텍스트 추출
+    
+    Args:
+        pdf_file: BytesIO 객체 또는 UploadFile 객체
+        
+    Returns:
+        추출된 텍스트 또는 None
+    """
+    result = extract_clean_text(pdf_file)
+    return result.text if result else None
+
 def truncate_text(text: str, max_tokens: int = 3000) -> str:
     """
     텍스트를 최대 토큰 수로 제한
-    대략 1 토큰 = 4자로 계산
+    tokenizer.count_tokens로 실제 토큰 수를 계산
     
     Args:
         text: 원본 텍스트
@@ -55,12 +86,11 @@ def truncate_text(text: str, max_tokens: int = 3000) -> str:
     Returns:
         잘린 텍스트
     """
-    max_chars = max_tokens * 4
-    if len(text) <= max_chars:
+    if count_tokens(text) <= max_tokens:
         return text
     
     # 문장 단위로 자르기
-    truncated = text[:max_chars]
+    truncated = truncate_to_tokens(text, max_tokens)
     last_period = truncated.rfind('.')
     
     if last_period > 0:
@@ -68,5 +98,5 @@ def truncate_text(text: str, max_tokens: int = 3000) -> str:
         print(f"✂️ 텍스트 자름: {len(text)} → {len(truncated_text)} 글자")
         return truncated_text
     
-    print(f"✂️ 텍스트 자름: {len(text)} → {max_chars} 글자")
+    print(f"✂️ 텍스트 자름: {len(text)} → {len(truncated)} 글자")
     return truncated
\ No newline at end of file
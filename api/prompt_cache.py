@@ -0,0 +1,161 @@
+# backend/prompt_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from model_lifecycle import model_lifecycle, parse_duration
+from ollama_client import MODEL_NAME, generate_full
+from tokenizer import count_tokens
+
+# 기억해 둘 세션 수 (오래 안 쓴 것부터 정리)
+MAX_PREFIX_SESSIONS = 256
+# prefix 토큰(모델 토큰 환산)의 이 비율 이상이 평가되지 않았으면 적중
+PREFIX_HIT_RATIO = 0.5
+
+class PrefixSessionManager:
+    """
+    고정 prefix 기반 프롬프트 세션 관리
+
+    Ollama 러너는 직전 요청과 겹치는 prompt prefix의 KV 캐시를 재사용하고,
+    재사용한 토큰은 prompt_eval_count에서 빠진다.
+    tiktoken 토큰 수는 모델 토크나이저와 다르므로, 세션의 첫(캐시 안 된) 호출에서
+    prompt_eval_count / tiktoken 토큰 수 비율을 재 두고 이후 호출은 이 비율로 환산해 적중 여부를 판단
+    (더 높은 비율이 나오면 첫 호출이 일부 캐시됐던 것이므로 기준을 올림)
+    prompt_eval_count가 없는 응답은 측정하지 않음 (0으로 보면 전부 적중으로 잘못 셈)
+    세션(채팅방 또는 프롬프트 템플릿)별로 prefix/keep_alive를 기억해 적중을 기대했는데
+    빗나간 경우(다른 요청이 러너 캐시를 덮어씀)를 따로 셈
+    """
+
+    def __init__(self, max_sessions: int = MAX_PREFIX_SESSIONS):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def generate(
+        self,
+        session_key: str,
+        prefix: str,
+        suffix: str,
+        template: str = "default",
+        **kwargs
+    ) -> Optional[Dict]:
+        """
+        prefix + suffix로 생성 요청
+
+        Args:
+            session_key: "room:<id>" 또는 "template:<name>" 형식의 세션 키
+            prefix: 호출마다 동일한 앞부분 (시스템 지침, 예시 등)
+            suffix: 호출마다 달라지는 뒷부분 (텍스트, 대화 등)
+            template: 통계를 집계할 템플릿 이름
+        """
+        prefix_hash = hashlib.sha1(prefix.encode("utf-8")).hexdigest()
+        now = time.monotonic()
+
+        with self._lock:
+            session = self._sessions.get(session_key)
+            expected_hit = (
+                session is not None
+                and session["prefix_hash"] == prefix_hash
+                and now - session["last_used"] < session["ttl_seconds"]
+            )
+
+        # 모델 keep_alive는 트래픽에 따라 달라지므로 세션마다 그때의 값으로 적중 기대 여부 판단
+        keep_alive = kwargs.setdefault(
+            "keep_alive", model_lifecycle.keep_alive_for(kwargs.get("model", MODEL_NAME))
+        )
+        result = generate_full(prefix + suffix, **kwargs)
+        # 토큰 계산은 잠금 밖에서
+        prefix_tokens = count_tokens(prefix)
+        prompt_tokens = prefix_tokens + count_tokens(suffix)
+
+        with self._lock:
+            # 토큰 비율은 prefix가 같으면 keep_alive가 지나도 유효
+            previous = self._sessions.get(session_key)
+            eval_ratio = previous["eval_ratio"] if previous and previous["prefix_hash"] == prefix_hash else None
+            self._sessions[session_key] = {
+                "prefix_hash": prefix_hash,
+                "last_used": time.monotonic(),
+                "ttl_seconds": parse_duration(keep_alive),
+                "eval_ratio": self._record(template, expected_hit, prefix_tokens, prompt_tokens, eval_ratio, result),
+            }
+            self._sessions.move_to_end(session_key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+        return result
+
+    def _record(
+        self,
+        template: str,
+        expected_hit: bool,
+        prefix_tokens: int,
+        prompt_tokens: int,
+        eval_ratio: Optional[float],
+        result: Optional[Dict]
+    ) -> Optional[float]:
+        """통계 기록 후 세션의 (모델 토큰 / tiktoken 토큰) 비율 반환"""
+        stats = self._stats.setdefault(template, {
+            "requests": 0,
+            "measured": 0,
+            "prefix_hits": 0,
+            "expected_hit_misses": 0,
+            "prompt_tokens": 0,
+            "prompt_eval_tokens": 0,
+            "prompt_eval_ms_hit": 0.0,
+            "prompt_eval_ms_miss": 0.0,
+        })
+        stats["requests"] += 1
+        # 실패했거나, 프롬프트 전체가 캐시에서 나와 prompt_eval_count가 빠진 응답 (일부 Ollama 버전)
+        evaluated = result.get("prompt_eval_count") if result else None
+        if evaluated is None or not prompt_tokens:
+            return eval_ratio
+
+        ratio = evaluated / prompt_tokens
+        if eval_ratio is None or ratio > eval_ratio:
+            # 세션의 첫 호출(또는 기준보다 더 많이 평가된 호출)은 캐시 안 된 것으로 보고 기준으로 삼음
+            eval_ratio = ratio
+            hit = False
+        else:
+            hit = (prompt_tokens - prefix_tokens * PREFIX_HIT_RATIO) * eval_ratio >= evaluated
+        stats["measured"] += 1
+        if hit:
+            stats["prefix_hits"] += 1
+        elif expected_hit:
+            stats["expected_hit_misses"] += 1
+        # 평가된 토큰과 같은 단위(모델 토큰)로 맞춰 evaluated_token_ratio 계산
+        stats["prompt_tokens"] += prompt_tokens * eval_ratio
+        stats["prompt_eval_tokens"] += evaluated
+        eval_ms = result.get("prompt_eval_duration", 0) / 1_000_000
+        stats["prompt_eval_ms_hit" if hit else "prompt_eval_ms_miss"] += eval_ms
+        return eval_ratio
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """템플릿별 prefix 캐시 적중률(prompt_eval_count로 측정)과 prompt 평가 시간"""
+        report = {}
+        with self._lock:
+            for template, s in self._stats.items():
+                hits = s["prefix_hits"]
+                misses = s["measured"] - hits
+                report[template] = {
+                    "requests": s["requests"],
+                    "prefix_hit_rate": round(hits / s["measured"], 3) if s["measured"] else 0.0,
+                    # 같은 세션의 prefix가 그대로인데 캐시가 재사용되지 않은 횟수
+                    "expected_hit_misses": s["expected_hit_misses"],
+                    # Ollama는 캐시된 토큰을 prompt_eval_count에서 제외하고 보고함
+                    "evaluated_token_ratio": round(
+                        s["prompt_eval_tokens"] / s["prompt_tokens"], 3
+                    ) if s["prompt_tokens"] else None,
+                    "avg_prompt_eval_ms_hit": round(s["prompt_eval_ms_hit"] / hits, 1) if hits else None,
+                    "avg_prompt_eval_ms_miss": round(s["prompt_eval_ms_miss"] / misses, 1) if misses else None,
+                }
+        return report
+
+    def forget(self, session_key: str):
+        """더 이상 쓰지 않는 세션 정리"""
+        with self._lock:
+            self._sessions.pop(session_key, None)
+
+prefix_sessions = PrefixSessionManager()
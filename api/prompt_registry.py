@@ -0,0 +1,98 @@
+# backend/prompt_registry.py
+"""
+이름 + 버전으로 관리하는 프롬프트 템플릿
+- 템플릿 = 고정 prefix(규칙, 예시) + 가변 suffix 서식 → prefix가 앞이라 Ollama KV 캐시 재사용
+- 이름별로 여러 버전을 등록해 두고 PROMPT_VERSIONS 환경 변수로 사용할 버전 선택
+  예: PROMPT_VERSIONS="quiz_mixed=v2,quiz_short_answer=v2"
+- 버전별 prefix 토큰 수를 기록해 프롬프트 비용 비교 (eval_prompts.py에서 유효율과 함께 측정)
+"""
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from tokenizer import count_tokens
+
+def _parse_versions(value: str) -> Dict[str, str]:
+    versions = {}
+    for item in value.split(","):
+        name, _, version = item.partition("=")
+        if name.strip() and version.strip():
+            versions[name.strip()] = version.strip()
+    return versions
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    name: str
+    version: str
+    prefix: str
+    # str.format 서식 (예: "{text}", "{count}")
+    suffix: str
+    description: str = ""
+
+    @property
+    def key(self) -> str:
+        """prefix 캐시/통계용 이름 (quiz_mixed@v2)"""
+        return f"{self.name}@{self.version}"
+
+    def render(self, **values) -> Tuple[str, str]:
+        """(고정 prefix, 값을 채운 suffix)"""
+        return self.prefix, self.suffix.format(**values)
+
+    def prefix_tokens(self) -> int:
+        return count_tokens(self.prefix)
+
+class PromptRegistry:
+    def __init__(self, active_versions: Optional[Dict[str, str]] = None):
+        self._templates: Dict[str, Dict[str, PromptTemplate]] = {}
+        self._defaults: Dict[str, str] = {}
+        self._active = active_versions if active_versions is not None else _parse_versions(
+            os.getenv("PROMPT_VERSIONS", "")
+        )
+        self._lock = threading.Lock()
+
+    def register(self, template: PromptTemplate, default: bool = False) -> PromptTemplate:
+        with self._lock:
+            versions = self._templates.setdefault(template.name, {})
+            if template.version in versions:
+                raise ValueError(f"이미 등록된 프롬프트: {template.key}")
+            versions[template.version] = template
+            if default or template.name not in self._defaults:
+                self._defaults[template.name] = template.version
+        return template
+
+    def get(self, name: str, version: Optional[str] = None) -> PromptTemplate:
+        """
+        version이 없으면 PROMPT_VERSIONS에서 고른 버전, 그것도 없으면 기본 버전
+
+        Raises:
+            KeyError: 등록되지 않은 이름/버전
+        """
+        with self._lock:
+            versions = self._templates[name]
+            version = version or self._active.get(name) or self._defaults[name]
+            return versions[version]
+
+    def versions(self, name: str) -> List[PromptTemplate]:
+        with self._lock:
+            return list(self._templates.get(name, {}).values())
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._templates)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """템플릿 버전별 prefix 토큰 수와 현재 사용 중인 버전"""
+        report = {}
+        for name in self.names():
+            active = self.get(name).version
+            report[name] = {
+                "active": active,
+                "versions": {
+                    t.version: {"prefix_tokens": t.prefix_tokens(), "description": t.description}
+                    for t in self.versions(name)
+                },
+            }
+        return report
+
+prompt_registry = PromptRegistry()
@@ -0,0 +1,102 @@
+# backend/purge.py
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+from quiz_cache import quiz_cache
+
+# 한 트랜잭션에서 지울 최대 행 수
+PURGE_BATCH_SIZE = 1000
+# 이보다 하위 행이 적으면 요청 안에서 바로 삭제
+INLINE_DELETE_LIMIT = 2000
+
+def count_user_rows(db: Session, user_id: int) -> int:
+    """계정 삭제 시 함께 지워질 주요 행 수 (문제 + 진행 기록)"""
+    progress = db.scalar(
+        select(func.count()).select_from(models.UserProgress).where(models.UserProgress.user_id == user_id)
+    )
+    questions = db.scalar(
+        select(func.count()).select_from(models.QuizQuestion)
+        .join(models.Quiz, models.QuizQuestion.quiz_id == models.Quiz.id)
+        .where(models.Quiz.user_id == user_id)
+    )
+    return (progress or 0) + (questions or 0)
+
+def delete_user_now(db: Session, user_id: int):
+    """DELETE 한 번 - 퀴즈/문제/보기/진행 기록은 ON DELETE CASCADE로 삭제"""
+    db.execute(delete(models.User).where(models.User.id == user_id))
+    db.commit()
+    quiz_cache.invalidate_owner(user_id)
+
+def _delete_batch(db: Session, model, id_query) -> int:
+    ids = [row[0] for row in db.execute(id_query.limit(PURGE_BATCH_SIZE))]
+    if not ids:
+        return 0
+    db.execute(delete(model).where(model.id.in_(ids)))
+    db.commit()
+    return len(ids)
+
+def purge_user(user_id: int):
+    """
+    큰 계정을 배치 단위로 정리 (백그라운드 작업)
+    트랜잭션마다 최대 PURGE_BATCH_SIZE행만 지워 잠금 시간과 메모리를 제한
+    """
+    db = SessionLocal()
+    try:
+        total = 0
+        # 1. 본인 진행 기록
+        progress_ids = select(models.UserProgress.id).where(models.UserProgress.user_id == user_id)
+        while (deleted := _delete_batch(db, models.UserProgress, progress_ids)):
+            total += deleted
+
+        # 2. 본인 퀴즈의 문제 (보기와 다른 사용자의 진행 기록은 CASCADE)
+        question_ids = (
+            select(models.QuizQuestion.id)
+            .join(models.Quiz, models.QuizQuestion.quiz_id == models.Quiz.id)
+            .where(models.Quiz.user_id == user_id)
+        )
+        while (deleted := _delete_batch(db, models.QuizQuestion, question_ids)):
+            total += deleted
+
+        # 3. 빈 퀴즈와 사용자
+        quiz_ids = select(models.Quiz.id).where(models.Quiz.user_id == user_id)
+        while (deleted := _delete_batch(db, models.Quiz, quiz_ids)):
+            total += deleted
+
+        delete_user_now(db, user_id)
+        print(f"🧹 사용자 {user_id} 정리 완료: {total}행 삭제")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ 사용자 {user_id} 정리 실패 (다음 시작 시 재시도): {e}")
+    finally:
+        db.close()
+
+def schedule_user_deletion(db: Session, user: models.User) -> bool:
+    """
+    작은 계정은 즉시 삭제, 큰 계정은 탈퇴 표시 후 백그라운드 정리
+
+    Returns:
+        백그라운드 정리가 필요하면 True
+    """
+    if count_user_rows(db, user.id) <= INLINE_DELETE_LIMIT:
+        delete_user_now(db, user.id)
+        return False
+
+    user.deleted_at = datetime.utcnow()
+    db.commit()
+    return True
+
+def resume_pending_purges():
+    """서버 재시작 등으로 끝나지 못한 정리 작업 재개"""
+    db = SessionLocal()
+    try:
+        user_ids = [row[0] for row in db.execute(
+            select(models.User.id).where(models.User.deleted_at.isnot(None))
+        )]
+    finally:
+        db.close()
+    for user_id in user_ids:
+        purge_user(user_id)
@@ -0,0 +1,129 @@
+# backend/quiz_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy.orm import Session, selectinload
+
+import models
+import schemas
+from serialization import serialize
+
+# 캐시에 올려 둘 직렬화 결과 수 (퀴즈 + 사용자별 목록 합계)
+MAX_CACHED_ENTRIES = 2048
+# 캐시 항목 유지 시간 (초) - 다른 워커/CLI(build_quizzes)가 DB에 쓴 내용은 이 시간 안에 보임, 0이면 캐시 안 함
+QUIZ_CACHE_TTL = float(os.getenv("QUIZ_CACHE_TTL", "30"))
+
+class CachedBody(NamedTuple):
+    """직렬화된 JSON 응답"""
+    body: bytes
+    etag: str
+    owner_id: int
+
+def _make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+def _quiz_query(db: Session):
+    # 문제/보기를 IN 쿼리 두 번으로 한꺼번에 로드 (문제마다 쿼리하지 않음)
+    return db.query(models.Quiz).options(
+        selectinload(models.Quiz.questions).selectinload(models.QuizQuestion.answers)
+    )
+
+class QuizReadCache:
+    """
+    퀴즈 조회 응답 캐시 (read-through)
+    - 퀴즈 하나, 사용자별 퀴즈 목록을 JSON 바이트로 직렬화해 보관 → 적중 시 DB/pydantic 생략
+    - 쓰기 경로(create_quiz, update_question, delete_quiz)에서 해당 키만 무효화
+    - 무효화마다 세대 번호를 올려, 조회 도중 무효화가 있었으면 방금 읽은 결과는 저장하지 않음
+    프로세스 내 캐시라 다른 워커/프로세스의 쓰기는 무효화가 닿지 않음 → 항목마다 ttl초 뒤 만료
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_ENTRIES, ttl: float = QUIZ_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # 키 → (응답, 만료 시각)
+        self._entries: "OrderedDict[tuple, Tuple[CachedBody, float]]" = OrderedDict()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_quiz(self, db: Session, quiz_id: int) -> Optional[CachedBody]:
+        def load() -> Optional[CachedBody]:
+            quiz = _quiz_query(db).filter(models.Quiz.id == quiz_id).first()
+            if quiz is None:
+                return None
+            body = serialize(schemas.QuizResponse, quiz)
+            return CachedBody(body, _make_etag(body), quiz.user_id)
+
+        return self._get_or_load(("quiz", quiz_id), load)
+
+    def get_user_quizzes(self, db: Session, user_id: int) -> CachedBody:
+        def load() -> CachedBody:
+            quizzes = _quiz_query(db).filter(
+                models.Quiz.user_id == user_id
+            ).order_by(models.Quiz.created_at.desc()).all()
+            body = serialize(List[schemas.QuizResponse], quizzes)
+            return CachedBody(body, _make_etag(body), user_id)
+
+        return self._get_or_load(("user", user_id), load)
+
+    def _get_or_load(self, key: tuple, load: Callable[[], Optional[CachedBody]]) -> Optional[CachedBody]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                if cached[1] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return cached[0]
+                del self._entries[key]
+            self.misses += 1
+            generation = self._generation
+
+        entry = load()
+        if entry is None or self.ttl <= 0:
+            return entry
+
+        with self._lock:
+            # 조회하는 동안 무효화가 있었다면 방금 읽은 값이 이미 오래됐을 수 있음
+            if self._generation == generation:
+                self._entries[key] = (entry, now + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def invalidate_quiz(self, quiz_id: int, user_id: int):
+        """퀴즈 내용이 바뀌거나 삭제됨 → 퀴즈와 소유자 목록 모두 무효화"""
+        self._invalidate(("quiz", quiz_id), ("user", user_id))
+
+    def invalidate_user(self, user_id: int):
+        """사용자 퀴즈 목록만 무효화 (퀴즈 추가)"""
+        self._invalidate(("user", user_id))
+
+    def invalidate_owner(self, user_id: int):
+        """계정 삭제 → 그 사용자의 퀴즈와 목록 전부 무효화"""
+        with self._lock:
+            keys = [key for key, (entry, _) in self._entries.items() if entry.owner_id == user_id]
+        self._invalidate(("user", user_id), *keys)
+
+    def _invalidate(self, *keys: tuple):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+quiz_cache = QuizReadCache()
@@ -0,0 +1,301 @@
+# backend/quiz_fanout.py
+"""
+분할 + 헤지(hedged) 퀴즈 생성
+- 문제 수가 많으면 텍스트를 겹치지 않는 구간으로 나누고 구간마다 CHUNK_QUESTIONS개씩 동시에 생성
+  (한 번에 25개를 8192 토큰으로 뽑는 것보다 짧은 생성 여러 개가 병렬 슬롯에서 빨리 끝남)
+- 최근 구간 생성 시간의 HEDGE_PERCENTILE을 넘긴 구간은 같은 프롬프트를 다른 seed로 한 번 더 요청,
+  먼저 끝난 쪽을 사용 (헤지도 동시 요청 수에 포함, 시간은 요청이 실제로 시작된 시점부터 잼)
+- 끝나는 대로 결과를 모으고, 모자라면 전체 텍스트로 부족분만 추가 요청
+- Ollama의 OLLAMA_NUM_PARALLEL(동시 처리 슬롯)이 2 이상이어야 효과가 있으므로 기본은 꺼짐
+  (켤 때는 QUIZ_FANOUT=1, QUIZ_FANOUT_CONCURRENCY를 OLLAMA_NUM_PARALLEL 이하로)
+"""
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Deque, Dict, List, Optional, Tuple
+
+from distractors import TermIndex
+from ollama_client import MODEL_NAME
+from prompt_cache import prefix_sessions
+from quiz_generator import parse_questions, quiz_template, validate_questions
+
+# 1이면 분할 생성 (기본은 한 번에 생성 - 병렬 슬롯이 하나면 분할해도 줄 서서 기다릴 뿐)
+QUIZ_FANOUT = os.getenv("QUIZ_FANOUT", "0") == "1"
+# 구간 하나에서 만들 문제 수
+CHUNK_QUESTIONS = int(os.getenv("QUIZ_CHUNK_QUESTIONS", "5"))
+# 동시에 보낼 생성 요청 수, 헤지 포함 (Ollama 동시 처리 슬롯 수에 맞춤)
+FANOUT_CONCURRENCY = int(os.getenv("QUIZ_FANOUT_CONCURRENCY", "4"))
+# 이 백분위 시간을 넘긴 구간은 헤지 요청 추가
+HEDGE_PERCENTILE = float(os.getenv("QUIZ_HEDGE_PERCENTILE", "0.9"))
+# 기록이 적을 때 쓰는 헤지 기준 시간 (초)
+HEDGE_DEFAULT_SECONDS = 90.0
+MIN_LATENCY_SAMPLES = 10
+# 요청 하나의 타임아웃 / 전체 마감 (초)
+CHUNK_TIMEOUT = 240
+TOTAL_TIMEOUT = 600
+# 구간 하나가 실패했을 때 다시 보낼 횟수
+CHUNK_RETRIES = 2
+# 구간이 이보다 짧아지면 구간 수를 줄임 (글자 수)
+MIN_SEGMENT_CHARS = 400
+
+_SENTENCE_END_RE = re.compile(r'(?<=[.!?다요])\s+')
+
+class LatencyTracker:
+    """구간 생성 시간 기록 → 헤지 기준 시간 계산"""
+
+    def __init__(self, maxlen: int = 200):
+        self._samples: Deque[float] = deque(maxlen=maxlen)
+        self._stats = {"chunks": 0, "hedges": 0, "hedge_wins": 0, "retries": 0, "top_ups": 0}
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self._stats[name] += n
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(int(p * len(samples)), len(samples) - 1)]
+
+    def hedge_after(self) -> float:
+        with self._lock:
+            enough = len(self._samples) >= MIN_LATENCY_SAMPLES
+        if not enough:
+            return HEDGE_DEFAULT_SECONDS
+        return self.percentile(HEDGE_PERCENTILE)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["samples"] = len(self._samples)
+        p50, p95 = self.percentile(0.5), self.percentile(0.95)
+        stats["chunk_p50_s"] = round(p50, 2) if p50 is not None else None
+        stats["chunk_p95_s"] = round(p95, 2) if p95 is not None else None
+        stats["hedge_after_s"] = round(self.hedge_after(), 2)
+        return stats
+
+latency_tracker = LatencyTracker()
+
+def should_fan_out(num_questions: int) -> bool:
+    return QUIZ_FANOUT and num_questions > CHUNK_QUESTIONS
+
+def split_segments(text: str, count: int) -> List[str]:
+    """
+    텍스트를 순서대로 count개 구간으로 나눔 (문단 → 문장 경계, 길이 균등)
+    텍스트가 짧으면 구간 수를 줄임
+    """
+    count = max(1, min(count, len(text) // MIN_SEGMENT_CHARS))
+    if count == 1:
+        return [text]
+
+    units = [p for p in re.split(r'\n\s*\n', text) if p.strip()]
+    if len(units) < count:
+        units = [s for s in _SENTENCE_END_RE.split(text) if s.strip()]
+    if len(units) < count:
+        return [text]
+
+    # 문단 중간 지점이 속하는 구간에 배정 (순서 유지, 길이 균등)
+    target = sum(len(u) for u in units) / count
+    groups: List[List[str]] = [[] for _ in range(count)]
+    position = 0
+    for unit in units:
+        groups[min(count - 1, int((position + len(unit) / 2) / target))].append(unit)
+        position += len(unit)
+    return ["\n\n".join(group) for group in groups if group]
+
+def _generate_chunk(text: str, count: int, question_types: str, term_index: Optional[TermIndex] = None) -> List[Dict]:
+    """
+    구간 하나 생성 (실패하면 빈 목록) - 검증을 거친 문제만 반환
+    term_index: 오답 보기용 원문 용어 색인 (문서 전체로 한 번 만들어 구간끼리 공유)
+    """
+    request_num = count + 1  # 검증에서 빠지는 문제 대비
+    template = quiz_template(question_types)
+    prefix, suffix = template.render(text=text, count=request_num)
+    result = prefix_sessions.generate(
+        session_key=f"template:{template.key}",
+        prefix=prefix,
+        suffix=suffix,
+        template=template.key,
+        model=MODEL_NAME,
+        options={
+            "temperature": 0.7,
+            "num_predict": min(8192, 512 * request_num + 256),
+            # 헤지/재시도 요청이 같은 답을 내지 않도록
+            "seed": random.randint(1, 2**31 - 1),
+        },
+        timeout=CHUNK_TIMEOUT
+    )
+    if result is None:
+        return []
+    questions = parse_questions(result.get("response", ""))
+    if not questions:
+        return []
+    return validate_questions(questions, count, term_index)
+
+def _question_key(question: Dict) -> str:
+    return re.sub(r'\s+', '', str(question.get("question_text", ""))).lower()
+
+class _Chunk:
+    __slots__ = ("index", "text", "count", "futures", "clock", "hedged", "attempts", "result")
+
+    def __init__(self, index: int, text: str, count: int):
+        self.index = index
+        self.text = text
+        self.count = count
+        self.futures: List[Future] = []
+        # 마지막 본 요청이 작업 스레드에서 시작된 시각 (시작 전이면 None)
+        self.clock: List[Optional[float]] = [None]
+        self.hedged = False
+        self.attempts = 0
+        self.result: Optional[List[Dict]] = None
+
+    def in_flight(self) -> bool:
+        """아직 결과가 없고 실행 중인 요청이 있음"""
+        return self.result is None and any(not f.done() for f in self.futures)
+
+def generate_quiz_fanout(
+    text: str,
+    num_questions: int,
+    question_types: str = "mixed"
+) -> Optional[List[Dict]]:
+    """
+    구간별 동시 생성 + 헤지 + 부족분 보충
+    (generate_quiz_from_text와 같은 반환 형식, 하나도 못 만들면 None)
+    """
+    started = time.monotonic()
+    deadline = started + TOTAL_TIMEOUT
+    segment_count = -(-num_questions // CHUNK_QUESTIONS)
+    segments = split_segments(text, segment_count)
+
+    # 구간 수가 줄었으면 문제 수를 구간에 고르게 배분
+    base, extra = divmod(num_questions, len(segments))
+    chunks = [_Chunk(i, seg, base + (1 if i < extra else 0)) for i, seg in enumerate(segments)]
+    term_index = TermIndex.build(text)
+    print(f"🧩 {num_questions}개 문제를 {len(chunks)}개 구간으로 나눠 생성 (동시 {FANOUT_CONCURRENCY}개)")
+
+    # 늦게 끝난 헤지/패배한 요청은 기다리지 않음 (requests 호출은 중간에 취소할 수 없음)
+    executor = ThreadPoolExecutor(max_workers=FANOUT_CONCURRENCY, thread_name_prefix="quiz-fanout")
+    owner: Dict[Future, Tuple[_Chunk, List[Optional[float]], bool]] = {}
+    handled = set()
+
+    def submit(chunk: _Chunk, hedge: bool = False):
+        clock: List[Optional[float]] = [None]
+
+        def job() -> List[Dict]:
+            # 큐에서 기다린 시간은 빼고 실제 시작 시점부터 잼
+            clock[0] = time.monotonic()
+            return _generate_chunk(chunk.text, chunk.count, question_types, term_index)
+
+        future = executor.submit(job)
+        owner[future] = (chunk, clock, hedge)
+        chunk.futures.append(future)
+        if not hedge:
+            chunk.clock = clock
+            chunk.attempts += 1
+        latency_tracker.count("chunks")
+
+    def running() -> int:
+        # 이미 진 헤지/버린 요청도 Ollama 슬롯을 쓰고 있으므로 포함
+        return sum(1 for f in owner if not f.done())
+
+    def started_at(chunk: _Chunk) -> float:
+        return chunk.clock[0] if chunk.clock[0] is not None else time.monotonic()
+
+    pending = list(chunks)
+    try:
+        while time.monotonic() < deadline:
+            # 동시 요청 수 안에서 대기 중인 구간 시작
+            while pending and running() < FANOUT_CONCURRENCY:
+                submit(pending.pop(0))
+
+            # 지난 반복 중에 끝난 요청도 놓치지 않도록 처리 안 한 요청 전체를 기다림
+            unhandled = [f for f in owner if f not in handled]
+            if not unhandled and not pending:
+                break
+
+            hedge_after = latency_tracker.hedge_after()
+            now = time.monotonic()
+            # 빈 슬롯이 있으면 다음 헤지 시점까지만, 없으면 요청이 끝날 때까지 기다림
+            can_hedge = not pending and running() < FANOUT_CONCURRENCY
+            next_hedge = min(
+                (started_at(c) + hedge_after for c in chunks if can_hedge and c.in_flight() and not c.hedged),
+                default=deadline
+            )
+            done, _ = wait(unhandled, timeout=max(0.05, min(next_hedge, deadline) - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                handled.add(future)
+                chunk, clock, was_hedge = owner[future]
+                if chunk.result is not None:
+                    continue  # 다른 요청이 이미 이 구간을 끝냄
+                try:
+                    questions = future.result()
+                except Exception as e:
+                    print(f"❌ 구간 {chunk.index + 1} 생성 예외: {e}")
+                    questions = []
+                if questions:
+                    elapsed = time.monotonic() - clock[0]
+                    latency_tracker.record(elapsed)
+                    chunk.result = questions
+                    if was_hedge:
+                        latency_tracker.count("hedge_wins")
+                    print(f"✅ 구간 {chunk.index + 1}: {len(questions)}개 ({elapsed:.1f}초{', 헤지' if was_hedge else ''})")
+                elif not chunk.in_flight():
+                    if chunk.attempts <= CHUNK_RETRIES:
+                        latency_tracker.count("retries")
+                        chunk.hedged = False
+                        pending.append(chunk)
+                    else:
+                        chunk.result = []
+
+            # 기준 시간을 넘긴 구간에 헤지 요청 (대기 중인 구간이 먼저, 빈 슬롯이 있을 때만)
+            now = time.monotonic()
+            for chunk in chunks:
+                if pending or running() >= FANOUT_CONCURRENCY:
+                    break
+                if chunk.in_flight() and not chunk.hedged and now - started_at(chunk) >= hedge_after:
+                    chunk.hedged = True
+                    latency_tracker.count("hedges")
+                    print(f"⏳ 구간 {chunk.index + 1}: {hedge_after:.0f}초 초과 - 헤지 요청")
+                    submit(chunk, hedge=True)
+
+            if all(c.result is not None for c in chunks):
+                # 모자라면 전체 텍스트로 부족분 보충 (한 번만)
+                collected = _merge(chunks, num_questions)
+                missing = num_questions - len(collected)
+                if missing > 0 and not any(c.index >= len(segments) for c in chunks):
+                    latency_tracker.count("top_ups")
+                    print(f"➕ {missing}개 부족 - 전체 텍스트로 보충 요청")
+                    top_up = _Chunk(len(chunks), text, missing)
+                    chunks.append(top_up)
+                    pending.append(top_up)
+                    continue
+                break
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    questions = _merge(chunks, num_questions)
+    print(f"🏁 분할 생성 완료: {len(questions)}/{num_questions}개 ({time.monotonic() - started:.1f}초)")
+    return questions or None
+
+def _merge(chunks: List[_Chunk], num_questions: int) -> List[Dict]:
+    """구간 순서대로 합치고 같은 질문은 하나만"""
+    merged, seen = [], set()
+    for chunk in sorted(chunks, key=lambda c: c.index):
+        for question in chunk.result or []:
+            key = _question_key(question)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(question)
+    return merged[:num_questions]
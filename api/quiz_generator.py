@@ -1,11 +1,13 @@
 # backend/quiz_generator.py
-import requests
 import json
 import random
 import time
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 
-OLLAMA_BASE_URL = "http://localhost:11434"
+from distractors import TermIndex, distractor_stats
+from ollama_client import MODEL_NAME
+from prompt_cache import prefix_sessions
+from prompt_registry import PromptTemplate, prompt_registry
 
 # ============================================================
 # [추가됨] 재시도를 위해 필요한 최소한의 도구들 (원본 로직 보호용)
@@ -40,116 +42,82 @@ def repair_json(json_str: str) -> Optional[Dict]:
             return None
 
 # ============================================================
-# [메인 함수] 사용자님 원본 코드 로직 유지 + 재시도 루프 적용
+# 퀴즈 프롬프트 (유형별 고정 prefix)
+# 규칙과 JSON 예시는 매 요청 동일하므로 앞에 두어 Ollama가 KV 캐시를 재사용하게 하고,
+# 문제 수와 텍스트처럼 매번 달라지는 부분은 뒤에 붙인다
 # ============================================================
-def generate_quiz_from_text(
-    text: str, 
-    num_questions: int = 5,
-    question_types: str = "mixed"
-) -> Optional[List[Dict]]:
-    """
-    텍스트를 기반으로 AI가 퀴즈 문제 생성 (최대 20개)
-    """
-    
-    # 실제로는 더 많이 요청 (최대 25개)
-    request_num = min(num_questions + 5, 25)
-    
-    # [추가됨] 실패 시 반환할 데이터 저장소
-    best_attempt_questions = []
-    MAX_RETRIES = 5  # 5번 재시도 설정
-
-    # =========================================================
-    # [1] 프롬프트 생성 (사용자님 원본 그대로 사용 - 절대 줄이지 않음)
-    # =========================================================
-    if question_types == "multiple_choice":
-        # 4지선다만
-        prompt = f"""다음 텍스트를 읽고 정확히 {request_num}개의 4지선다 퀴즈를 만드세요.
-
-텍스트:
-{text}
+QUIZ_PROMPT_PREFIXES = {
+    # 4지선다만
+    "multiple_choice": """아래 텍스트를 읽고 4지선다 퀴즈를 만드세요.
 
 **필수 규칙:**
-1. 정확히 {request_num}개의 문제
+1. 맨 아래에 지정한 개수만큼 정확히 문제 생성
 2. 모든 문제는 4지선다
 3. 각 문제는 정확히 4개의 선택지
 4. 정답은 1개만
 5. 하나의 JSON 객체
 
 JSON 형식:
-{{
+{
   "questions": [
-    {{
+    {
       "question_text": "HTML은 무엇을 의미하나요?",
       "question_type": "multiple_choice",
       "answers": [
-        {{"answer_text": "HyperText Markup Language", "is_correct": true, "answer_order": 0}},
-        {{"answer_text": "High Tech Modern Language", "is_correct": false, "answer_order": 1}},
-        {{"answer_text": "Home Tool Markup Language", "is_correct": false, "answer_order": 2}},
-        {{"answer_text": "Hyperlinks Text Markup", "is_correct": false, "answer_order": 3}}
+        {"answer_text": "HyperText Markup Language", "is_correct": true, "answer_order": 0},
+        {"answer_text": "High Tech Modern Language", "is_correct": false, "answer_order": 1},
+        {"answer_text": "Home Tool Markup Language", "is_correct": false, "answer_order": 2},
+        {"answer_text": "Hyperlinks Text Markup", "is_correct": false, "answer_order": 3}
       ]
-    }},
-    {{
+    },
+    {
       "question_text": "두 번째 질문",
       "question_type": "multiple_choice",
       "answers": [
-        {{"answer_text": "답 1", "is_correct": false, "answer_order": 0}},
-        {{"answer_text": "답 2", "is_correct": true, "answer_order": 1}},
-        {{"answer_text": "답 3", "is_correct": false, "answer_order": 2}},
-        {{"answer_text": "답 4", "is_correct": false, "answer_order": 3}}
+        {"answer_text": "답 1", "is_correct": false, "answer_order": 0},
+        {"answer_text": "답 2", "is_correct": true, "answer_order": 1},
+        {"answer_text": "답 3", "is_correct": false, "answer_order": 2},
+        {"answer_text": "답 4", "is_correct": false, "answer_order": 3}
       ]
-    }}
+    }
   ]
-}}
-
-지금 {request_num}개의 4지선다 문제를 JSON으로만 출력하세요:
-"""
-    
-    elif question_types == "short_answer":
-        # 서술형만
-        prompt = f"""다음 텍스트를 읽고 정확히 {request_num}개의 서술형 퀴즈를 만드세요.
-
-텍스트:
-{text}
+}
+""",
+    # 서술형만
+    "short_answer": """아래 텍스트를 읽고 서술형 퀴즈를 만드세요.
 
 **필수 규칙:**
-1. 정확히 {request_num}개의 문제
+1. 맨 아래에 지정한 개수만큼 정확히 문제 생성
 2. 모든 문제는 서술형 (4지선다 절대 금지!)
 3. correct_answer 필드 필수
 4. 하나의 JSON 객체
 
 JSON 형식:
-{{
+{
   "questions": [
-    {{
+    {
       "question_text": "HTML의 정식 명칭을 쓰시오.",
       "question_type": "short_answer",
       "correct_answer": "HyperText Markup Language"
-    }},
-    {{
+    },
+    {
       "question_text": "웹 페이지의 구조를 정의하는 언어는?",
       "question_type": "short_answer",
       "correct_answer": "HTML"
-    }},
-    {{
+    },
+    {
       "question_text": "HTML 태그의 기본 구조를 설명하시오.",
       "question_type": "short_answer",
       "correct_answer": "여는 태그와 닫는 태그로 구성되며 내용을 감싼다"
-    }}
+    }
   ]
-}}
-
-지금 {request_num}개의 서술형 문제를 JSON으로만 출력하세요:
-"""
-    
-    else:  # mixed
-        # 혼합
-        prompt = f"""다음 텍스트를 읽고 정확히 {request_num}개의 퀴즈를 만드세요. 4지선다와 서술형을 섞으세요.
-
-텍스트:
-{text}
+}
+""",
+    # 혼합
+    "mixed": """아래 텍스트를 읽고 퀴즈를 만드세요. 4지선다와 서술형을 섞으세요.
 
 **필수 규칙:**
-1. 정확히 {request_num}개의 문제
+1. 맨 아래에 지정한 개수만큼 정확히 문제 생성
 2. 4지선다와 서술형을 섞음 (약 반반)
 3. 4지선다는 정확히 4개의 선택지
 4. 서술형은 correct_answer 필드
@@ -157,44 +125,255 @@ JSON 형식:
 6. 생략 표시 절대 금지
 
 완전한 JSON 형식:
-{{
+{
   "questions": [
-    {{
+    {
       "question_text": "HTML은 무엇인가요?",
       "question_type": "multiple_choice",
       "answers": [
-        {{"answer_text": "마크업 언어", "is_correct": true, "answer_order": 0}},
-        {{"answer_text": "프로그래밍 언어", "is_correct": false, "answer_order": 1}},
-        {{"answer_text": "스타일 언어", "is_correct": false, "answer_order": 2}},
-        {{"answer_text": "데이터베이스", "is_correct": false, "answer_order": 3}}
+        {"answer_text": "마크업 언어", "is_correct": true, "answer_order": 0},
+        {"answer_text": "프로그래밍 언어", "is_correct": false, "answer_order": 1},
+        {"answer_text": "스타일 언어", "is_correct": false, "answer_order": 2},
+        {"answer_text": "데이터베이스", "is_correct": false, "answer_order": 3}
       ]
-    }},
-    {{
+    },
+    {
       "question_text": "HTML의 정식 명칭을 쓰시오.",
       "question_type": "short_answer",
       "correct_answer": "HyperText Markup Language"
-    }},
-    {{
+    },
+    {
       "question_text": "웹 브라우저의 역할은?",
       "question_type": "multiple_choice",
       "answers": [
-        {{"answer_text": "HTML 해석 및 렌더링", "is_correct": true, "answer_order": 0}},
-        {{"answer_text": "코드 작성", "is_correct": false, "answer_order": 1}},
-        {{"answer_text": "서버 관리", "is_correct": false, "answer_order": 2}},
-        {{"answer_text": "데이터 저장", "is_correct": false, "answer_order": 3}}
+        {"answer_text": "HTML 해석 및 렌더링", "is_correct": true, "answer_order": 0},
+        {"answer_text": "코드 작성", "is_correct": false, "answer_order": 1},
+        {"answer_text": "서버 관리", "is_correct": false, "answer_order": 2},
+        {"answer_text": "데이터 저장", "is_correct": false, "answer_order": 3}
       ]
-    }},
-    {{
+    },
+    {
       "question_text": "태그의 기본 구조를 설명하시오.",
       "question_type": "short_answer",
       "correct_answer": "여는 태그와 닫는 태그로 구성"
-    }}
+    }
   ]
-}}
+}
+""",
+}
+
+QUIZ_TYPE_LABELS = {
+    "multiple_choice": "4지선다 ",
+    "short_answer": "서술형 ",
+    "mixed": "",
+}
+
+def _v1_suffix(question_types: str) -> str:
+    suffix = """
+텍스트:
+{text}
 
-위처럼 모든 문제를 완전히 작성하여 {request_num}개를 JSON으로만 출력하세요.
+문제 수: 정확히 {count}개
+"""
+    if question_types == "mixed":
+        return suffix + """
+위처럼 모든 문제를 완전히 작성하여 {count}개를 JSON으로만 출력하세요.
 "..." 같은 생략 절대 금지:
 """
+    return suffix + f"""
+지금 {{count}}개의 {QUIZ_TYPE_LABELS[question_types]}문제를 JSON으로만 출력하세요:
+"""
+
+# v2: 규칙을 한 줄로 줄이고 예시는 유형별 1~2개를 공백 없는 JSON으로
+# (answer_order는 검증 단계에서 다시 매기므로 예시에서 뺌)
+QUIZ_PROMPT_PREFIXES_V2 = {
+    "multiple_choice": """아래 텍스트로 4지선다 퀴즈를 만드세요.
+규칙: 지정한 개수만큼 생성, 보기 정확히 4개, 정답 1개, JSON 객체 하나만 출력.
+형식:
+{"questions":[{"question_text":"HTML은 무엇을 의미하나요?","question_type":"multiple_choice","answers":[{"answer_text":"HyperText Markup Language","is_correct":true},{"answer_text":"High Tech Modern Language","is_correct":false},{"answer_text":"Home Tool Markup Language","is_correct":false},{"answer_text":"Hyperlinks Text Markup","is_correct":false}]}]}
+""",
+    "short_answer": """아래 텍스트로 서술형 퀴즈를 만드세요 (4지선다 금지).
+규칙: 지정한 개수만큼 생성, correct_answer 필수, JSON 객체 하나만 출력.
+형식:
+{"questions":[{"question_text":"HTML의 정식 명칭을 쓰시오.","question_type":"short_answer","correct_answer":"HyperText Markup Language"}]}
+""",
+    "mixed": """아래 텍스트로 퀴즈를 만드세요. 4지선다와 서술형을 약 반반 섞으세요.
+규칙: 지정한 개수만큼 생성, 4지선다는 보기 정확히 4개·정답 1개, 서술형은 correct_answer 필수, 생략("...") 금지, JSON 객체 하나만 출력.
+형식:
+{"questions":[{"question_text":"HTML은 무엇인가요?","question_type":"multiple_choice","answers":[{"answer_text":"마크업 언어","is_correct":true},{"answer_text":"프로그래밍 언어","is_correct":false},{"answer_text":"스타일 언어","is_correct":false},{"answer_text":"데이터베이스","is_correct":false}]},{"question_text":"HTML의 정식 명칭을 쓰시오.","question_type":"short_answer","correct_answer":"HyperText Markup Language"}]}
+""",
+}
+
+QUIZ_SUFFIX_V2 = """
+텍스트:
+{text}
+
+문제 수: 정확히 {count}개. JSON만 출력:
+"""
+
+for _question_types, _prefix in QUIZ_PROMPT_PREFIXES.items():
+    prompt_registry.register(PromptTemplate(
+        name=f"quiz_{_question_types}",
+        version="v1",
+        prefix=_prefix,
+        suffix=_v1_suffix(_question_types),
+        description="규칙 목록 + 들여쓴 JSON 예시 2~4개"
+    ), default=True)
+    prompt_registry.register(PromptTemplate(
+        name=f"quiz_{_question_types}",
+        version="v2",
+        prefix=QUIZ_PROMPT_PREFIXES_V2[_question_types],
+        suffix=QUIZ_SUFFIX_V2,
+        description="한 줄 규칙 + 압축 JSON 예시"
+    ))
+
+def quiz_template(question_types: str, version: Optional[str] = None) -> PromptTemplate:
+    """문제 유형별 퀴즈 템플릿 (모르는 유형은 mixed)"""
+    if question_types not in QUIZ_PROMPT_PREFIXES:
+        question_types = "mixed"
+    return prompt_registry.get(f"quiz_{question_types}", version)
+
+def build_quiz_prompt(
+    text: str,
+    request_num: int,
+    question_types: str,
+    version: Optional[str] = None
+) -> Tuple[str, str]:
+    """(고정 prefix, 문제 수 + 텍스트) 반환"""
+    return quiz_template(question_types, version).render(text=text, count=request_num)
+
+# ============================================================
+# 응답 파싱 / 유효성 검증 (순차 생성과 분할 생성이 함께 사용)
+# ============================================================
+def parse_questions(generated_text: str) -> Optional[List[Dict]]:
+    """모델 응답에서 questions 배열 추출 (JSON이 깨졌으면 복구 시도)"""
+    generated_text = generated_text.replace('```json', '').replace('```', '').strip()
+    json_text = extract_json_object(generated_text) or generated_text
+    quiz_data = repair_json(json_text)
+    if not quiz_data:
+        return None
+    return quiz_data.get("questions", [])
+
+def _dedupe_answers(answers: List[Dict]) -> List[Dict]:
+    """빈 보기/같은 보기 제거 (같은 보기 중 하나라도 정답이면 정답으로 남김)"""
+    unique: Dict[str, Dict] = {}
+    for a in answers:
+        if not isinstance(a, dict):
+            continue
+        text = str(a.get("answer_text") or "").strip()
+        if not text:
+            continue
+        key = "".join(text.split()).casefold()
+        if key in unique:
+            unique[key]["is_correct"] = bool(unique[key]["is_correct"] or a.get("is_correct"))
+        else:
+            unique[key] = {**a, "answer_text": text, "is_correct": bool(a.get("is_correct"))}
+    return list(unique.values())
+
+def validate_questions(questions: List[Dict], num_questions: int, term_index: Optional[TermIndex] = None) -> List[Dict]:
+    """
+    형식이 맞는 문제만 남기고 4지선다 보기를 정리 (최대 num_questions개)
+    - 보기가 4개보다 적으면 원문 용어 색인(term_index)으로 같은 유형의 오답을 채움
+    - 그래도 모자라면 보기 2~3개로 출제 ("선택지 N" 같은 빈 보기는 넣지 않음)
+    """
+    validated_questions = []
+    for idx, q in enumerate(questions):
+        if not q.get("question_text"):
+            continue
+        
+        q_type = q.get("question_type", "")
+        
+        # 서술형 먼저 체크
+        if q_type == "short_answer" or ("correct_answer" in q and "answers" not in q):
+            if not q.get("correct_answer"):
+                continue
+            
+            q["question_type"] = "short_answer"
+            validated_questions.append(q)
+        
+        # 4지선다
+        elif q_type == "multiple_choice" or "answers" in q:
+            answers = _dedupe_answers(q.get("answers") or [])
+            # 보기 없이 정답만 준 경우 정답 하나에서 시작
+            if not answers and q.get("correct_answer"):
+                answers = [{"answer_text": str(q["correct_answer"]).strip(), "is_correct": True}]
+            if not answers:
+                continue
+            
+            answers = answers[:4]
+            
+            # 정답 확인
+            correct_count = sum(1 for a in answers if a.get("is_correct"))
+            if correct_count == 0:
+                answers[0]["is_correct"] = True
+            elif correct_count > 1:
+                first = next(i for i, a in enumerate(answers) if a.get("is_correct"))
+                for i, a in enumerate(answers):
+                    a["is_correct"] = (i == first)
+            
+            # 원문 용어로 오답 채우기
+            distractor_stats.count("questions")
+            if len(answers) < 4 and term_index is not None:
+                correct = next(a for a in answers if a["is_correct"])
+                extra = term_index.distractors(correct["answer_text"], [a["answer_text"] for a in answers], 4 - len(answers))
+                if extra:
+                    distractor_stats.count("filled_questions")
+                    distractor_stats.count("distractors", len(extra))
+                answers += [{"answer_text": text, "is_correct": False} for text in extra]
+            
+            if len(answers) < 2:
+                distractor_stats.count("dropped")
+                continue
+            if len(answers) < 4:
+                distractor_stats.count("short_questions")
+            
+            # 🎲 랜덤 섞기
+            random.shuffle(answers)
+            for i, a in enumerate(answers):
+                a["answer_order"] = i
+            
+            q["question_type"] = "multiple_choice"
+            q["answers"] = answers
+            validated_questions.append(q)
+        
+        else:
+            continue
+        
+        if len(validated_questions) >= num_questions:
+            break
+    return validated_questions
+
+# ============================================================
+# [메인 함수] 사용자님 원본 코드 로직 유지 + 재시도 루프 적용
+# ============================================================
+def generate_quiz_from_text(
+    text: str, 
+    num_questions: int = 5,
+    question_types: str = "mixed"
+) -> Optional[List[Dict]]:
+    """
+    텍스트를 기반으로 AI가 퀴즈 문제 생성 (최대 20개)
+    문제가 많으면 텍스트를 나눠 여러 개를 동시에 생성 (quiz_fanout)
+    """
+    # 순환 import 방지 (quiz_fanout이 이 모듈의 프롬프트/검증 함수를 씀)
+    import quiz_fanout
+    if quiz_fanout.should_fan_out(num_questions):
+        return quiz_fanout.generate_quiz_fanout(text, num_questions, question_types)
+    
+    # 실제로는 더 많이 요청 (최대 25개)
+    request_num = min(num_questions + 5, 25)
+    
+    # [추가됨] 실패 시 반환할 데이터 저장소
+    best_attempt_questions = []
+    MAX_RETRIES = 5  # 5번 재시도 설정
+
+    # =========================================================
+    # [1] 프롬프트 생성 (고정 prefix 먼저, 텍스트는 맨 뒤)
+    # =========================================================
+    template = quiz_template(question_types)
+    prefix, suffix = template.render(text=text, count=request_num)
+    # 오답 보기용 원문 용어 색인 (재시도마다 다시 만들지 않음)
+    term_index = TermIndex.build(text)
 
     # =========================================================
     # [2] 재시도 루프 시작 (User Code Wrap)
@@ -204,42 +383,36 @@ JSON 형식:
             print(f"🤖 AI에게 {request_num}개 문제 생성 요청 중... (시도 {attempt + 1}/{MAX_RETRIES})")
             print(f"📋 문제 유형: {question_types}")
             
-            # Ollama API 호출 (타임아웃만 조금 늘림)
-            response = requests.post(
-                f"{OLLAMA_BASE_URL}/api/generate",
-                json={
-                    "model": "llama3.1:8b",
-                    "prompt": prompt,
-                    "stream": False,
+            # Ollama API 호출 (같은 유형의 prefix는 KV 캐시 재사용)
+            result = prefix_sessions.generate(
+                session_key=f"template:{template.key}",
+                prefix=prefix,
+                suffix=suffix,
+                template=template.key,
+                model=MODEL_NAME,
+                options={
                     "temperature": 0.7,
                     "num_predict": 8192,  # 4096 → 8192로 증가!
                 },
                 timeout=600  # 타임아웃 10분
             )
             
-            if response.status_code != 200:
-                print(f"❌ Ollama API 오류: {response.status_code}")
+            if result is None:
                 time.sleep(2) # [추가] 재시도 대기
                 continue # [추가] 다음 시도로 넘어감
             
             # 응답 파싱
-            result = response.json()
             generated_text = result.get("response", "")
             
             print(f"📝 AI 응답 길이: {len(generated_text)} 글자")
             
-            # JSON 추출 및 정제 (제가 드린 도구 사용)
-            generated_text = generated_text.replace('```json', '').replace('```', '').strip()
-            json_text = extract_json_object(generated_text) or generated_text
-            
-            # 파싱 및 복구 (제가 드린 도구 사용)
-            quiz_data = repair_json(json_text)
+            # JSON 추출, 파싱 및 복구
+            questions = parse_questions(generated_text)
             
-            if not quiz_data:
+            if questions is None:
                 print("❌ JSON 파싱 오류. 재시도합니다.")
                 continue # [추가] 실패 시 재시도
 
-            questions = quiz_data.get("questions", [])
             print(f"🔍 파싱된 문제 수: {len(questions)}개")
             
             if not questions:
@@ -247,70 +420,9 @@ JSON 형식:
                 continue # [추가] 실패 시 재시도
             
             # =========================================================
-            # [3] 유효성 검증 (사용자님 원본 코드 100% 유지)
+            # [3] 유효성 검증
             # =========================================================
-            validated_questions = []
-            for idx, q in enumerate(questions):
-                if not q.get("question_text"):
-                    # print(f"⚠️ 문제 {idx+1}: 질문 없음")
-                    continue
-                
-                q_type = q.get("question_type", "")
-                
-                # 서술형 먼저 체크
-                if q_type == "short_answer" or ("correct_answer" in q and "answers" not in q):
-                    if not q.get("correct_answer"):
-                        # print(f"⚠️ 문제 {idx+1}: 서술형인데 정답 없음")
-                        continue
-                    
-                    q["question_type"] = "short_answer"
-                    validated_questions.append(q)
-                    # print(f"✅ 문제 {idx+1}: 서술형")
-                
-                # 4지선다
-                elif q_type == "multiple_choice" or "answers" in q:
-                    answers = q.get("answers", [])
-                    
-                    if len(answers) < 2:
-                        # print(f"⚠️ 문제 {idx+1}: 선택지 부족, 건너뜀")
-                        continue
-                    
-                    # 4개로 맞추기
-                    while len(answers) < 4:
-                        answers.append({
-                            "answer_text": f"선택지 {len(answers)+1}",
-                            "is_correct": False,
-                            "answer_order": len(answers)
-                        })
-                    
-                    answers = answers[:4]
-                    
-                    # 정답 확인
-                    correct_count = sum(1 for a in answers if a.get("is_correct"))
-                    if correct_count == 0:
-                        answers[0]["is_correct"] = True
-                    elif correct_count > 1:
-                        for i, a in enumerate(answers):
-                            a["is_correct"] = (i == 0)
-                    
-                    # 🎲 랜덤 섞기
-                    random.shuffle(answers)
-                    for i, a in enumerate(answers):
-                        a["answer_order"] = i
-                    
-                    q["question_type"] = "multiple_choice"
-                    q["answers"] = answers
-                    validated_questions.append(q)
-                    
-                    # correct_idx = [i+1 for i, a in enumerate(answers) if a.get('is_correct')][0]
-                    # print(f"✅ 문제 {idx+1}: 4지선다 (정답 {correct_idx}번)")
-                
-                else:
-                    # print(f"⚠️ 문제 {idx+1}: 유형 불명, 건너뜀")
-                    continue
-                
-                if len(validated_questions) >= num_questions:
-                    break
+            validated_questions = validate_questions(questions, num_questions, term_index)
             
             print(f"✅ 검증 통과: {len(validated_questions)}개 문제")
             
@@ -323,8 +435,6 @@ JSON 형식:
                 if len(validated_questions) > len(best_attempt_questions):
                     best_attempt_questions = validated_questions
             
-        except requests.exceptions.Timeout:
-            print("❌ Ollama 타임아웃 (6분). 재시도합니다.")
         except Exception as e:
             print(f"❌ 예외: {e}. 재시도합니다.")
             import traceback
@@ -336,4 +446,4 @@ JSON 형식:
         print(f"🏁 최대 재시도 도달. 확보된 {len(best_attempt_questions)}개만 반환합니다.")
         return best_attempt_questions
 
-    return None
\ No newline at end of file
+    return None
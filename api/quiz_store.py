@@ -0,0 +1,71 @@
+# backend/quiz_store.py
+"""
+퀴즈 일괄 저장
+- 퀴즈 / 문제 / 보기를 테이블마다 INSERT ... RETURNING 한 번씩 (문제마다 flush하지 않음)
+- 커밋과 캐시 무효화는 호출 측 (API는 요청 단위, 배치 CLI는 파일 단위로 커밋)
+"""
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+import models
+
+def bulk_create_quizzes(db: Session, user_id: int, quizzes: Iterable[Dict]) -> List[int]:
+    """
+    Args:
+        quizzes: {"quiz_name", "questions": [{"question_text", "question_type", "question_order"?,
+                 "correct_answer"?, "answers"?: [{"answer_text", "is_correct", "answer_order"}]}]} 목록
+                 (QuizCreate.model_dump()나 퀴즈 생성기 출력 그대로)
+
+    Returns:
+        만든 퀴즈 id 목록 (입력 순서)
+    """
+    quizzes = list(quizzes)
+    if not quizzes:
+        return []
+    now = datetime.utcnow()
+
+    quiz_ids = db.scalars(
+        insert(models.Quiz).returning(models.Quiz.id, sort_by_parameter_order=True),
+        [{"quiz_name": q["quiz_name"], "user_id": user_id, "created_at": now, "updated_at": now} for q in quizzes]
+    ).all()
+
+    question_rows, question_answers = [], []
+    for quiz_id, quiz in zip(quiz_ids, quizzes):
+        for order, question in enumerate(quiz.get("questions") or []):
+            question_type = question.get("question_type") or "multiple_choice"
+            question_rows.append({
+                "quiz_id": quiz_id,
+                "question_text": question["question_text"],
+                "question_type": question_type,
+                "question_order": question.get("question_order", order),
+                "correct_answer": question.get("correct_answer"),
+                "created_at": now,
+                "updated_at": now,
+            })
+            question_answers.append(question.get("answers") if question_type == "multiple_choice" else None)
+    if not question_rows:
+        return list(quiz_ids)
+
+    question_ids = db.scalars(
+        insert(models.QuizQuestion).returning(models.QuizQuestion.id, sort_by_parameter_order=True),
+        question_rows
+    ).all()
+
+    answer_rows = [
+        {
+            "question_id": question_id,
+            "answer_text": answer["answer_text"],
+            "is_correct": bool(answer.get("is_correct")),
+            "answer_order": answer.get("answer_order", order),
+            "updated_at": now,
+        }
+        for question_id, answers in zip(question_ids, question_answers)
+        for order, answer in enumerate(answers or [])
+    ]
+    if answer_rows:
+        db.execute(insert(models.QuizAnswer), answer_rows)
+
+    return list(quiz_ids)
@@ -1,6 +1,5 @@
 # backend/reset_db.py (수정 버전)
-from sqlalchemy import create_engine
-from database import Base, DATABASE_URL
+from database import Base, engine
 
 # 모든 모델 import (중요!)
 from models import (
@@ -13,15 +12,15 @@ from models import (
     UserProgress
 )
 
-# 엔진 생성
-engine = create_engine(DATABASE_URL)
+from migrations import migrate, schema_migrations
 
 # 기존 테이블 삭제
 Base.metadata.drop_all(bind=engine)
+schema_migrations.drop(bind=engine, checkfirst=True)
 print("기존 테이블 삭제됨")
 
-# 새 테이블 생성
-Base.metadata.create_all(bind=engine)
+# 마이그레이션으로 새 테이블 생성
+migrate(engine)
 print("새 테이블 생성됨")
 
 print("\n테이블 구조 확인:")
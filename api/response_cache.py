@@ -0,0 +1,164 @@
+# backend/response_cache.py
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+def normalize_prompt(prompt: str) -> str:
+    """공백 차이만 있는 프롬프트는 같은 키가 되도록 정규화"""
+    return _WHITESPACE_RE.sub(' ', prompt).strip()
+
+def make_cache_key(prompt: str, model: str, options: Optional[Dict] = None) -> str:
+    """정규화된 프롬프트 + 모델 + 옵션 해시"""
+    payload = json.dumps(
+        {"model": model, "options": options or {}, "prompt": normalize_prompt(prompt)},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    결정적(temperature=0 등) LLM 호출 결과 캐시
+    - 메모리 LRU + TTL
+    - sqlite_path를 주면 SQLite에 write-through (서버 재시작 후에도 유지)
+    - 같은 키의 동시 요청은 하나의 생성만 실행하고 결과를 공유 (single-flight)
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: int = 86400, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sqlite_path = sqlite_path
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if sqlite_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS response_cache ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.sqlite_path, timeout=5)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+
+        if not self.sqlite_path:
+            return None
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] <= now:
+            return None
+
+        self._store_memory(key, row[0], row[1])
+        return row[0]
+
+    def set(self, key: str, value: str):
+        expires_at = time.time() + self.ttl_seconds
+        self._store_memory(key, value, expires_at)
+        if self.sqlite_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO response_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, value, expires_at)
+                )
+
+    def _store_memory(self, key: str, value: str, expires_at: float):
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_generate(self, key: str, generate_fn: Callable[[], Optional[str]]) -> Optional[str]:
+        """
+        캐시에 있으면 반환, 없으면 generate_fn 실행
+        같은 키로 이미 생성 중인 요청이 있으면 그 결과를 기다림
+        실패(None)는 캐시하지 않음
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self._count(hit=True)
+            return cached
+
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not owner:
+            self._count(hit=True)
+            return future.result()
+
+        try:
+            # 직전에 다른 요청이 생성을 끝냈을 수 있으므로 한 번 더 확인
+            value = self.get(key)
+            if value is None:
+                self._count(hit=False)
+                value = generate_fn()
+                if value is not None:
+                    self.set(key, value)
+            else:
+                self._count(hit=True)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _count(self, hit: bool):
+        # 여러 스레드에서 동시에 부르므로 잠금 안에서 증가
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def purge_expired(self):
+        """만료 항목 정리 (SQLite 포함)"""
+        now = time.time()
+        with self._lock:
+            for key in [k for k, (_, exp) in self._entries.items() if exp <= now]:
+                del self._entries[key]
+        if self.sqlite_path:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            entries, hits, misses = len(self._entries), self.hits, self.misses
+        total = hits + misses
+        return {
+            "entries": entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+        }
@@ -54,13 +54,45 @@ class MessageResponse(BaseModel):
     id: int
     room_id: int
     content: str
-    sender: str
+    role: str
     phase: Optional[str]
     created_at: datetime
     
     class Config:
         from_attributes = True
 
+# ===== 학습 흐름 스키마 =====
+
+class PhaseTransitionRequest(BaseModel):
+    room_id: int
+    user_choice: Optional[str] = None
+    expected_version: Optional[int] = None
+
+class PhaseInfoResponse(BaseModel):
+    room_id: int
+    phase: str
+    title: str
+    instruction: str
+    can_go_back: bool
+    version: int
+    previous_phase: Optional[str] = None
+
+class AIExplanationRequest(BaseModel):
+    weak_points: List[str] = []
+
+class AIExplanationResponse(BaseModel):
+    room_id: int
+    concept: str
+    knowledge_level: str
+    explanation: str
+
+# ===== 평가 스키마 =====
+
+class EvaluationRequest(BaseModel):
+    explanation: str
+    phase: str = "evaluation"
+    concept: Optional[str] = None
+
 # ===== 퀴즈 스키마 =====
 
 class QuizAnswerCreate(BaseModel):
@@ -119,6 +151,8 @@ class QuizResponse(BaseModel):
 
 class ProgressSubmit(BaseModel):
     quiz_id: int
+    # [{"question_id", "is_correct", "answer"?, "response_ms"?}] - 단답형에 answer를 보내면 서버가 채점 (is_correct 무시)
+    # response_ms: 문제를 푸는 데 걸린 시간 (풀이 통계의 평균 풀이 시간)
     results: List[dict]
 
 class ProgressResponse(BaseModel):
@@ -133,4 +167,109 @@ class ProgressResponse(BaseModel):
     last_reviewed_at: Optional[datetime]
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ShortAnswerSubmission(BaseModel):
+    question_id: int
+    answer: str
+
+class GradeRequest(BaseModel):
+    answers: List[ShortAnswerSubmission]
+
+class AnswerGrade(BaseModel):
+    question_id: int
+    is_correct: bool
+    score: float  # 로컬 유사도 (0~1)
+    method: str  # exact / local / llm / fallback / empty
+
+# ===== 동기화 스키마 =====
+
+class SyncQuiz(BaseModel):
+    id: int
+    quiz_name: str
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+class SyncQuestion(BaseModel):
+    id: int
+    quiz_id: int
+    question_text: str
+    question_type: str
+    question_order: int
+    correct_answer: Optional[str]
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+class SyncAnswer(BaseModel):
+    id: int
+    question_id: int
+    answer_text: str
+    is_correct: bool
+    answer_order: int
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+class SyncProgress(ProgressResponse):
+    updated_at: Optional[datetime]
+
+class SyncDeleted(BaseModel):
+    entity: str
+    id: int
+
+class SyncResponse(BaseModel):
+    cursor: str
+    reset: bool  # True면 전체 스냅샷 - 클라이언트는 로컬 데이터를 교체
+    quizzes: List[SyncQuiz]
+    questions: List[SyncQuestion]
+    answers: List[SyncAnswer]
+    progress: List[SyncProgress]
+    messages: List[MessageResponse]
+    deleted: List[SyncDeleted]
+
+class OfflineProgressResult(BaseModel):
+    question_id: int
+    is_correct: bool
+    answered_at: Optional[datetime] = None  # 오프라인에서 푼 시각 (없으면 업로드 시각)
+    response_ms: Optional[int] = None  # 푸는 데 걸린 시간 (밀리초)
+
+class ImportedAttempt(OfflineProgressResult):
+    """NDJSON 가져오기(attempts)의 한 줄 - 모르는 필드가 있으면 거부 (진행 상태 줄을 풀이로 잘못 반영하지 않게)"""
+
+    class Config:
+        extra = "forbid"
+
+class ProgressBatchUpload(BaseModel):
+    results: List[OfflineProgressResult]
+
+class ProgressBatchResponse(BaseModel):
+    applied: int
+    skipped: List[int]  # 없어진 문제 id
+
+# ===== 풀이 통계 스키마 =====
+
+class ItemStatsFields(BaseModel):
+    attempts: int
+    learners: int  # 한 번이라도 푼 사용자 수
+    correct_rate: Optional[float]  # 시도가 없으면 None
+    difficulty: Optional[float]  # 1 - 정답률
+    avg_response_ms: Optional[float]  # 풀이 시간을 보낸 시도가 없으면 None
+    discrimination: Optional[float]  # 점이연 상관 (-1~1), 시도가 적으면 None
+    updated_at: Optional[datetime]
+
+class QuestionStatsResponse(ItemStatsFields):
+    question_id: int
+    question_order: int
+
+class QuizStatsSummary(ItemStatsFields):
+    quiz_id: int
+    quiz_name: str
+
+class QuizStatsResponse(QuizStatsSummary):
+    questions: List[QuestionStatsResponse]
@@ -0,0 +1,77 @@
+# backend/serialization.py
+"""
+응답 직렬화
+- pydantic TypeAdapter는 타입마다 한 번만 만들어 재사용 (스키마 컴파일 비용을 요청마다 내지 않음)
+- ORM 객체 → JSON 바이트를 pydantic-core에서 바로 (dict 변환 + json.dumps 단계 생략)
+- 스키마 없는 dict 응답은 orjson으로 (설치돼 있지 않으면 표준 json)
+- 큰 목록은 JSON 배열을 조각 단위로 스트리밍
+"""
+import json
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Sequence
+
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성 - 없으면 표준 json
+    orjson = None
+
+# 이보다 항목이 많은 목록은 스트리밍
+STREAM_THRESHOLD = 500
+# 스트리밍 시 한 번에 직렬화할 항목 수
+STREAM_CHUNK_SIZE = 200
+
+JSON_MEDIA_TYPE = "application/json"
+
+@lru_cache(maxsize=None)
+def get_adapter(tp) -> TypeAdapter:
+    """타입별 TypeAdapter (처음 한 번만 생성)"""
+    return TypeAdapter(tp)
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """orjson으로 렌더링하는 JSONResponse (앱 기본 응답 클래스)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def serialize(tp, obj: Any) -> bytes:
+    """ORM 객체(또는 dict)를 스키마 타입에 맞춰 검증하고 JSON 바이트로"""
+    adapter = get_adapter(tp)
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+def model_response(tp, obj: Any, status_code: int = 200) -> Response:
+    return Response(content=serialize(tp, obj), status_code=status_code, media_type=JSON_MEDIA_TYPE)
+
+def list_response(item_type, items: Sequence) -> Response:
+    """목록 응답 - 작으면 한 번에, 크면 JSON 배열 스트리밍"""
+    if len(items) <= STREAM_THRESHOLD:
+        return model_response(List[item_type], items)
+    return StreamingResponse(iter_json_array(item_type, items), media_type=JSON_MEDIA_TYPE)
+
+def iter_json_array(item_type, items: Iterable, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    JSON 배열을 조각 단위로 생성
+    조각마다 List[item_type]으로 직렬화한 뒤 바깥 대괄호만 떼어 이어 붙임
+    """
+    adapter = get_adapter(List[item_type])
+    iterator = iter(items)
+    first = True
+    yield b"["
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            break
+        body = adapter.dump_json(adapter.validate_python(chunk, from_attributes=True))
+        if not first:
+            yield b","
+        yield body[1:-1]
+        first = False
+    yield b"]"
@@ -1,37 +1,94 @@
 # backend/server.py
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, FastAPI, WebSocket, WebSocketDisconnect, Depends, HTTPException, status, UploadFile, File, Form, BackgroundTasks, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
+import asyncio
 import json
+import os
 
 # 로컬 모듈
 import models
 import schemas
 import auth
-from database import engine, get_db
-from pdf_utils import extract_text_from_pdf, truncate_text
-from quiz_generator import generate_quiz_from_text
-
-# 데이터베이스 테이블 생성
-models.Base.metadata.create_all(bind=engine)
-
-# FastAPI 앱 생성
-app = FastAPI(
-    title="Feynman Learning & Quiz API",
-    description="파인만 학습법 기반 AI 튜터 + 퀴즈 시스템",
-    version="2.0.0"
-)
-
-# CORS 설정
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+import bulk_transfer
+import item_stats
+import purge
+import sync
+from database import SessionLocal, engine, get_db
+from migrations import check_schema
+from learning_session import KNOWLEDGE_LEVEL_NAMES, InvalidChoice, VersionConflict, learning_sessions
+from quiz_cache import CachedBody, quiz_cache
+from quiz_store import bulk_create_quizzes
+from serialization import FastJSONResponse, dumps, list_response, model_response, serialize
+from idempotency import fingerprint, idempotency
+from compression import CompressionMiddleware
+import subsystems
+from subsystems import startup_timer
+
+router = APIRouter()
+
+# ===== 시작 단계 =====
+
+async def check_database_schema():
+    """스키마 버전 확인 (AUTO_MIGRATE=1이면 부족한 마이그레이션 적용)"""
+    check_schema(engine, auto_migrate=os.getenv("AUTO_MIGRATE") == "1")
+
+async def prune_sync_tombstones():
+    """보관 기간이 지난 동기화 삭제 기록 정리"""
+    db = SessionLocal()
+    try:
+        sync.prune_tombstones(db)
+    finally:
+        db.close()
+
+async def start_idempotency_cleanup():
+    """만료된 멱등성 키 주기적 정리"""
+    asyncio.create_task(idempotency.cleanup_loop())
+
+async def start_stats_reconciliation():
+    """풀이 통계를 주기적으로 user_progress와 맞춤 (STATS_RECONCILE_INTERVAL=0이면 끔)"""
+    if item_stats.STATS_RECONCILE_INTERVAL > 0:
+        asyncio.create_task(item_stats.reconcile_loop())
+
+async def resume_account_purges():
+    """끝나지 못한 계정 정리 작업 재개"""
+    asyncio.get_running_loop().run_in_executor(None, purge.resume_pending_purges)
+
+async def preload_subsystems():
+    """PDF/LLM/평가 모듈을 백그라운드에서 미리 로드 (요청은 바로 받음)"""
+    if subsystems.PRELOAD_SUBSYSTEMS:
+        subsystems.preload_in_background()
+
+async def start_model_warmup():
+    """설정된 Ollama 모델을 미리 로드하고 keep_alive 유지 (MODEL_WARMUP=0이면 끔)"""
+    if os.getenv("MODEL_WARMUP", "1") != "1":
+        return
+    await asyncio.to_thread(subsystems.llm.load)
+    asyncio.create_task(subsystems.llm.model_lifecycle.run())
+
+# 서버 시작 시 순서대로 실행 (단계별 시간 기록)
+STARTUP_PHASES = [
+    check_database_schema,
+    prune_sync_tombstones,
+    start_idempotency_cleanup,
+    start_stats_reconciliation,
+    resume_account_purges,
+    start_model_warmup,
+    preload_subsystems,
+]
+
+def _timed(handler):
+    async def run():
+        with startup_timer.phase(handler.__name__):
+            await handler()
+    return run
+
+async def report_startup():
+    print(startup_timer.report())
 
 # WebSocket 연결 관리
 class ConnectionManager:
@@ -54,19 +111,24 @@ manager = ConnectionManager()
 
 # ===== 인증 엔드포인트 =====
 
-@app.post("/api/auth/register", response_model=schemas.AuthToken)
+@router.post("/api/auth/register", response_model=schemas.AuthToken)
 async def register(user_data: schemas.UserCreate, db: Session = Depends(get_db)):
     """회원가입"""
     existing_user = db.query(models.User).filter(
         models.User.email == user_data.email
     ).first()
+    # 탈퇴 후 정리 대기 중인 계정(deleted_at)도 행이 남아 있으므로 정리가 끝날 때까지 같은 값은 쓸 수 없음
     if existing_user:
+        if existing_user.deleted_at is not None:
+            raise HTTPException(status_code=409, detail="탈퇴 처리 중인 계정의 이메일입니다. 정리가 끝난 뒤 다시 시도해주세요")
         raise HTTPException(status_code=400, detail="이미 사용 중인 이메일입니다")
     
     existing_username = db.query(models.User).filter(
         models.User.username == user_data.username
     ).first()
     if existing_username:
+        if existing_username.deleted_at is not None:
+            raise HTTPException(status_code=409, detail="탈퇴 처리 중인 계정의 사용자명입니다. 정리가 끝난 뒤 다시 시도해주세요")
         raise HTTPException(status_code=400, detail="이미 사용 중인 사용자명입니다")
     
     hashed_password = auth.get_password_hash(user_data.password)
@@ -89,11 +151,12 @@ async def register(user_data: schemas.UserCreate, db: Session = Depends(get_db))
         "email": new_user.email
     }
 
-@app.post("/api/auth/login", response_model=schemas.AuthToken)
+@router.post("/api/auth/login", response_model=schemas.AuthToken)
 async def login(user_data: schemas.UserLogin, db: Session = Depends(get_db)):
     """로그인"""
     user = db.query(models.User).filter(
-        models.User.email == user_data.email
+        models.User.email == user_data.email,
+        models.User.deleted_at.is_(None)
     ).first()
     
     if not user or not auth.verify_password(user_data.password, user.hashed_password):
@@ -109,25 +172,22 @@ async def login(user_data: schemas.UserLogin, db: Session = Depends(get_db)):
     }
 
 # [추가] 계정 삭제 (회원 탈퇴)
-@app.delete("/api/auth/me")
+@router.delete("/api/auth/me")
 async def delete_account(
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     """현재 로그인한 사용자 계정 삭제"""
-    user = db.query(models.User).filter(models.User.id == current_user.id).first()
-    
-    if not user:
-        raise HTTPException(status_code=404, detail="사용자를 찾을 수 없습니다")
-    
-    db.delete(user)
-    db.commit()
+    # 데이터가 많은 계정은 탈퇴 처리만 하고 실제 삭제는 배치로 나눠 백그라운드에서
+    if purge.schedule_user_deletion(db, current_user):
+        background_tasks.add_task(purge.purge_user, current_user.id)
     
     return {"message": "계정이 성공적으로 삭제되었습니다"}
 
 # ===== 채팅방 엔드포인트 =====
 
-@app.post("/api/rooms", response_model=schemas.ChatRoomResponse)
+@router.post("/api/rooms", response_model=schemas.ChatRoomResponse)
 async def create_room(
     room_data: schemas.ChatRoomCreate,
     db: Session = Depends(get_db),
@@ -143,23 +203,31 @@ async def create_room(
     db.refresh(new_room)
     return new_room
 
-@app.get("/api/rooms/{room_id}", response_model=schemas.ChatRoomResponse)
+@router.get("/api/rooms/legacy/{legacy_id}", response_model=schemas.ChatRoomResponse)
+async def get_room_by_legacy_id(legacy_id: str, db: Session = Depends(get_db)):
+    """id 변환 전 UUID로 채팅방 조회 (저장된 예전 링크를 새 정수 id로 바꿀 때 사용)"""
+    room = db.query(models.ChatRoom).filter(models.ChatRoom.legacy_id == legacy_id).first()
+    if not room:
+        raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
+    return room
+
+@router.get("/api/rooms/{room_id}", response_model=schemas.ChatRoomResponse)
 async def get_room(room_id: int, db: Session = Depends(get_db)):
     room = db.query(models.ChatRoom).filter(models.ChatRoom.id == room_id).first()
     if not room:
         raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
     return room
 
-@app.get("/api/rooms/{room_id}/messages", response_model=List[schemas.MessageResponse])
+@router.get("/api/rooms/{room_id}/messages", response_model=List[schemas.MessageResponse])
 async def get_messages(room_id: int, db: Session = Depends(get_db)):
     messages = db.query(models.Message).filter(
         models.Message.room_id == room_id
-    ).order_by(models.Message.created_at).all()
-    return messages
+    ).order_by(models.Message.id).all()
+    return list_response(schemas.MessageResponse, messages)
 
 # ===== WebSocket 엔드포인트 =====
 
-@app.websocket("/ws/{room_id}")
+@router.websocket("/ws/{room_id}")
 async def websocket_endpoint(websocket: WebSocket, room_id: int, db: Session = Depends(get_db)):
     await manager.connect(websocket, room_id)
     try:
@@ -170,7 +238,7 @@ async def websocket_endpoint(websocket: WebSocket, room_id: int, db: Session = D
             new_message = models.Message(
                 room_id=room_id,
                 content=message_data["content"],
-                sender=message_data["sender"],
+                role=message_data["sender"],
                 phase=message_data.get("phase")
             )
             db.add(new_message)
@@ -181,7 +249,7 @@ async def websocket_endpoint(websocket: WebSocket, room_id: int, db: Session = D
                 ai_message = models.Message(
                     room_id=room_id,
                     content=ai_response,
-                    sender="ai",
+                    role="ai",
                     phase=message_data.get("phase")
                 )
                 db.add(ai_message)
@@ -198,61 +266,150 @@ async def websocket_endpoint(websocket: WebSocket, room_id: int, db: Session = D
     except WebSocketDisconnect:
         manager.disconnect(room_id)
 
+# ===== 학습 흐름 엔드포인트 =====
+
+@router.get("/api/learning/phase/{room_id}", response_model=schemas.PhaseInfoResponse)
+async def get_learning_phase(room_id: int, db: Session = Depends(get_db)):
+    state = learning_sessions.get_state(db, room_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
+    return learning_sessions.phase_info(state)
+
+@router.post("/api/learning/transition", response_model=schemas.PhaseInfoResponse)
+async def transition_learning_phase(
+    request: schemas.PhaseTransitionRequest,
+    db: Session = Depends(get_db)
+):
+    try:
+        info = learning_sessions.transition(
+            db,
+            request.room_id,
+            user_choice=request.user_choice,
+            expected_version=request.expected_version
+        )
+    except VersionConflict:
+        raise HTTPException(status_code=409, detail="학습 단계가 이미 변경되었습니다. 다시 시도해주세요")
+    except InvalidChoice:
+        raise HTTPException(status_code=400, detail="현재 학습 단계에서 선택할 수 없는 항목입니다")
+    if info is None:
+        raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
+    return info
+
+@router.post("/api/learning/ai-explanation/{room_id}", response_model=schemas.AIExplanationResponse)
+async def generate_learning_explanation(
+    room_id: int,
+    request: schemas.AIExplanationRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    AI_EXPLANATION 단계의 맞춤 설명
+    같은 개념/지식 수준/부족한 부분이면 응답 캐시에서 바로 반환 (/api/llm/response-cache)
+    """
+    state = learning_sessions.get_state(db, room_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="채팅방을 찾을 수 없습니다")
+    if not state.concept:
+        raise HTTPException(status_code=400, detail="학습할 개념이 정해지지 않았습니다")
+
+    knowledge_level = KNOWLEDGE_LEVEL_NAMES.get(state.knowledge_level, "beginner")
+    explanation = await asyncio.to_thread(
+        subsystems.llm.generate_ai_explanation,
+        state.concept,
+        knowledge_level,
+        request.weak_points
+    )
+    if not explanation:
+        raise HTTPException(status_code=503, detail="AI 설명 생성에 실패했습니다")
+    return {
+        "room_id": room_id,
+        "concept": state.concept,
+        "knowledge_level": knowledge_level,
+        "explanation": explanation,
+    }
+
+# ===== 평가 엔드포인트 =====
+
+async def _push_to_room(room_id: int, payload: dict):
+    await manager.send_message(json.dumps(payload, ensure_ascii=False), room_id)
+
+@router.post("/api/evaluation/{room_id}")
+async def evaluate_explanation(room_id: int, request: schemas.EvaluationRequest):
+    """
+    예비 피드백은 즉시 반환하고, LLM 루브릭 채점 결과는 준비되면 WebSocket으로 전송
+    """
+    return await subsystems.evaluation.evaluation_service.evaluate(
+        room_id=room_id,
+        explanation=request.explanation,
+        phase=request.phase,
+        concept=request.concept,
+        notify=_push_to_room
+    )
+
+@router.get("/api/evaluation/result/{evaluation_id}")
+async def get_evaluation_result(evaluation_id: str):
+    """WebSocket을 쓰지 않는 클라이언트용 채점 결과 조회"""
+    return subsystems.evaluation.evaluation_service.get_result(evaluation_id)
+
 # ===== 퀴즈 엔드포인트 =====
 
-@app.get("/api/users/{user_id}/quizzes", response_model=List[schemas.QuizResponse])
+@router.get("/api/users/{user_id}/quizzes", response_model=List[schemas.QuizResponse])
 async def get_user_quizzes(
     user_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
     if current_user.id != user_id:
         raise HTTPException(status_code=403, detail="권한이 없습니다")
     
-    quizzes = db.query(models.Quiz).filter(
-        models.Quiz.user_id == user_id
-    ).order_by(models.Quiz.created_at.desc()).all()
-    return quizzes
+    return _cached_json_response(request, quiz_cache.get_user_quizzes(db, user_id))
+
+@router.get("/api/quizzes/{quiz_id}", response_model=schemas.QuizResponse)
+async def get_quiz(
+    quiz_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    cached = quiz_cache.get_quiz(db, quiz_id)
+    if cached is None:
+        raise HTTPException(status_code=404, detail="퀴즈를 찾을 수 없습니다")
+    if cached.owner_id != current_user.id:
+        raise HTTPException(status_code=403, detail="권한이 없습니다")
+    return _cached_json_response(request, cached)
+
+def _cached_json_response(request: Request, cached: CachedBody) -> Response:
+    """직렬화된 JSON을 그대로 전송, If-None-Match가 같으면 본문 없이 304"""
+    headers = {"ETag": cached.etag, "Cache-Control": "private, no-cache"}
+    if request.headers.get("if-none-match") == cached.etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
 
-@app.post("/api/quizzes", response_model=schemas.QuizResponse)
+@router.post("/api/quizzes", response_model=schemas.QuizResponse)
 async def create_quiz(
     quiz_data: schemas.QuizCreate,
     db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    current_user: models.User = Depends(auth.get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
-    new_quiz = models.Quiz(
-        quiz_name=quiz_data.quiz_name,
-        user_id=current_user.id
-    )
-    db.add(new_quiz)
-    db.flush()
-    
-    for q_data in quiz_data.questions:
-        new_question = models.QuizQuestion(
-            quiz_id=new_quiz.id,
-            question_text=q_data.question_text,
-            question_type=q_data.question_type,
-            question_order=q_data.question_order,
-            correct_answer=q_data.correct_answer
-        )
-        db.add(new_question)
+    async def work():
+        # 퀴즈/문제/보기를 테이블마다 INSERT 한 번으로 (커밋은 멱등성 기록과 함께)
+        quiz_id, = bulk_create_quizzes(db, current_user.id, [quiz_data.model_dump()])
         db.flush()
-        
-        if q_data.question_type == "multiple_choice" and q_data.answers:
-            for a_data in q_data.answers:
-                new_answer = models.QuizAnswer(
-                    question_id=new_question.id,
-                    answer_text=a_data.answer_text,
-                    is_correct=a_data.is_correct,
-                    answer_order=a_data.answer_order
-                )
-                db.add(new_answer)
-    
-    db.commit()
-    db.refresh(new_quiz)
-    return new_quiz
+        new_quiz = db.get(models.Quiz, quiz_id)
+        return 200, serialize(schemas.QuizResponse, new_quiz)
+
+    response = await idempotency.run(
+        _idempotency_scope(current_user, "create_quiz"),
+        idempotency_key,
+        fingerprint(quiz_data.model_dump()),
+        work,
+        db=db
+    )
+    quiz_cache.invalidate_user(current_user.id)
+    return response
 
-@app.delete("/api/quizzes/{quiz_id}")
+@router.delete("/api/quizzes/{quiz_id}")
 async def delete_quiz(
     quiz_id: int,
     db: Session = Depends(get_db),
@@ -264,12 +421,15 @@ async def delete_quiz(
     if quiz.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="권한이 없습니다")
     
-    db.delete(quiz)
+    # 문제/보기/진행 기록은 ON DELETE CASCADE로 DB에서 삭제
+    db.execute(delete(models.Quiz).where(models.Quiz.id == quiz_id))
+    sync.record_deletions(db, current_user.id, "quiz", [quiz_id])
     db.commit()
+    quiz_cache.invalidate_quiz(quiz_id, current_user.id)
     return {"message": "퀴즈가 삭제되었습니다"}
 
 # [추가됨] 퀴즈 질문 수정 API
-@app.put("/api/questions/{question_id}", response_model=schemas.QuizQuestionResponse)
+@router.put("/api/questions/{question_id}", response_model=schemas.QuizQuestionResponse)
 def update_question(
     question_id: int,
     question_update: schemas.QuizQuestionUpdate,
@@ -293,7 +453,9 @@ def update_question(
 
     # 4. 객관식 보기(Answers) 수정 로직
     if question_update.answers is not None:
-        # 기존 보기 삭제
+        # 기존 보기 삭제 (동기화 클라이언트를 위해 삭제 기록)
+        old_answers = db.query(models.QuizAnswer.id).filter(models.QuizAnswer.question_id == question_id)
+        sync.record_deletions(db, current_user.id, "answer", [row[0] for row in old_answers])
         db.query(models.QuizAnswer).filter(models.QuizAnswer.question_id == question_id).delete()
         
         # 새 보기 추가
@@ -307,55 +469,102 @@ def update_question(
             db.add(new_answer)
 
     db.commit()
+    quiz_cache.invalidate_quiz(db_question.quiz_id, current_user.id)
     db.refresh(db_question)
     return db_question
 
 # ===== 진행 상황 엔드포인트 =====
 
-@app.post("/api/progress")
+@router.post("/api/progress")
 async def submit_progress(
     progress_data: schemas.ProgressSubmit,
     db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    async def work():
+        grades = await _grade_short_answers(db, [
+            (result["question_id"], result.get("answer")) for result in progress_data.results
+        ])
+        sync.apply_progress(db, current_user.id, [
+            (result["question_id"], grade["is_correct"] if grade else result["is_correct"], None, result.get("response_ms"))
+            for result, grade in zip(progress_data.results, grades)
+        ])
+        body = {"message": "진행 상황이 저장되었습니다"}
+        if any(grades):
+            body["graded"] = [grade for grade in grades if grade]
+        return 200, dumps(body)
+
+    return await idempotency.run(
+        _idempotency_scope(current_user, "progress"),
+        idempotency_key,
+        fingerprint(progress_data.model_dump()),
+        work,
+        db=db
+    )
+
+@router.post("/api/quizzes/{quiz_id}/grade", response_model=List[schemas.AnswerGrade])
+async def grade_answers(
+    quiz_id: int,
+    grade_request: schemas.GradeRequest,
+    db: Session = Depends(get_db),
     current_user: models.User = Depends(auth.get_current_user)
 ):
-    for result in progress_data.results:
-        question_id = result["question_id"]
-        is_correct = result["is_correct"]
-        
-        progress = db.query(models.UserProgress).filter(
-            models.UserProgress.user_id == current_user.id,
-            models.UserProgress.question_id == question_id
-        ).first()
-        
-        if not progress:
-            progress = models.UserProgress(
-                user_id=current_user.id,
-                question_id=question_id,
-                is_correct=is_correct,
-                attempt_count=1,
-                correct_count=1 if is_correct else 0,
-                interval_days=1,
-                next_review_date=datetime.utcnow() + timedelta(days=1),
-                last_reviewed_at=datetime.utcnow()
-            )
-            db.add(progress)
-        else:
-            progress.attempt_count += 1
-            progress.last_reviewed_at = datetime.utcnow()
-            progress.is_correct = is_correct
-            
-            if is_correct:
-                progress.correct_count += 1
-                progress.interval_days = min(progress.interval_days * 2, 30)
-            else:
-                progress.interval_days = 1
-            
-            progress.next_review_date = datetime.utcnow() + timedelta(days=progress.interval_days)
-    
-    db.commit()
-    return {"message": "진행 상황이 저장되었습니다"}
+    """단답형 답 채점만 (진행 기록은 남기지 않음) - 다른 유형이나 다른 퀴즈의 문제는 결과에서 빠짐"""
+    quiz = db.get(models.Quiz, quiz_id)
+    if quiz is None:
+        raise HTTPException(status_code=404, detail="퀴즈를 찾을 수 없습니다")
+    if quiz.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="권한이 없습니다")
+
+    grades = await _grade_short_answers(
+        db, [(submission.question_id, submission.answer) for submission in grade_request.answers], quiz_id=quiz_id
+    )
+    return FastJSONResponse([grade for grade in grades if grade])
+
+async def _grade_short_answers(
+    db: Session,
+    submissions: List[tuple],
+    quiz_id: Optional[int] = None
+) -> List[Optional[dict]]:
+    """
+    (question_id, 답) 목록을 서버에서 채점 - 입력 순서대로, 단답형이 아니거나 답이 없으면 None
+    로컬 유사도로 대부분 판정하고 애매한 답만 LLM 한 번에 (스레드에서 실행)
+    """
+    question_ids = {question_id for question_id, answer in submissions if isinstance(answer, str)}
+    if not question_ids:
+        return [None] * len(submissions)
+
+    query = db.query(
+        models.QuizQuestion.id, models.QuizQuestion.question_text, models.QuizQuestion.correct_answer
+    ).filter(
+        models.QuizQuestion.id.in_(question_ids),
+        models.QuizQuestion.question_type == "short_answer"
+    )
+    if quiz_id is not None:
+        query = query.filter(models.QuizQuestion.quiz_id == quiz_id)
+    questions = {row.id: row for row in query}
+
+    gradable = [
+        i for i, (question_id, answer) in enumerate(submissions)
+        if isinstance(answer, str) and question_id in questions
+    ]
+    results = await asyncio.to_thread(subsystems.grading.short_answer_grader.grade, [
+        (questions[submissions[i][0]].question_text, questions[submissions[i][0]].correct_answer, submissions[i][1])
+        for i in gradable
+    ]) if gradable else []
+
+    grades: List[Optional[dict]] = [None] * len(submissions)
+    for i, result in zip(gradable, results):
+        grades[i] = {
+            "question_id": submissions[i][0],
+            "is_correct": result.is_correct,
+            "score": round(result.score, 3),
+            "method": result.method,
+        }
+    return grades
 
-@app.get("/api/users/{user_id}/progress", response_model=List[schemas.ProgressResponse])
+@router.get("/api/users/{user_id}/progress", response_model=List[schemas.ProgressResponse])
 async def get_user_progress(
     user_id: int,
     review_due: bool = False,
@@ -375,54 +584,275 @@ async def get_user_progress(
         )
     
     progress_list = query.all()
-    return progress_list
+    return list_response(schemas.ProgressResponse, progress_list)
+
+# ===== 풀이 통계 엔드포인트 =====
+
+@router.get("/api/analytics/quizzes", response_model=List[schemas.QuizStatsSummary])
+async def get_quiz_analytics(
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """내 퀴즈별 시도 수 / 정답률 / 평균 풀이 시간 / 변별도 (미리 집계한 행)"""
+    return list_response(schemas.QuizStatsSummary, item_stats.quiz_overview(db, current_user.id))
+
+@router.get("/api/analytics/quizzes/{quiz_id}", response_model=schemas.QuizStatsResponse)
+async def get_quiz_item_analytics(
+    quiz_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """퀴즈 통계 + 문제별 난이도/변별도 (문제 순서대로, 아직 안 푼 문제는 시도 0)"""
+    quiz = db.get(models.Quiz, quiz_id)
+    if quiz is None:
+        raise HTTPException(status_code=404, detail="퀴즈를 찾을 수 없습니다")
+    if quiz.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="권한이 없습니다")
+    return model_response(schemas.QuizStatsResponse, item_stats.quiz_detail(db, quiz))
+
+# ===== 동기화 엔드포인트 =====
+
+@router.get("/api/sync", response_model=schemas.SyncResponse)
+async def sync_changes(
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    cursor 이후 바뀐 퀴즈/문제/보기/진행 기록/메시지와 삭제 목록
+    응답의 cursor를 저장해 두었다가 다음 동기화 때 보냄 (처음에는 생략 → 전체 스냅샷)
+    """
+    try:
+        changes = sync.changes_since(db, current_user.id, cursor)
+    except sync.InvalidCursor:
+        raise HTTPException(status_code=400, detail="잘못된 동기화 커서입니다")
+    return model_response(schemas.SyncResponse, changes)
+
+@router.post("/api/sync/progress", response_model=schemas.ProgressBatchResponse)
+async def upload_offline_progress(
+    upload: schemas.ProgressBatchUpload,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(auth.get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """오프라인에서 푼 결과를 한 번에 업로드 (한 트랜잭션)"""
+    async def work():
+        applied, skipped = sync.apply_progress(db, current_user.id, [
+            (result.question_id, result.is_correct, result.answered_at, result.response_ms) for result in upload.results
+        ])
+        return 200, dumps({"applied": applied, "skipped": skipped})
+
+    return await idempotency.run(
+        _idempotency_scope(current_user, "sync_progress"),
+        idempotency_key,
+        fingerprint(upload.model_dump()),
+        work,
+        db=db
+    )
+
+# ===== 일괄 가져오기/내보내기 엔드포인트 =====
+
+@router.post("/api/import/{kind}")
+async def import_records(
+    kind: str,
+    request: Request,
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    NDJSON 본문(한 줄 = 레코드 하나)을 스트리밍으로 읽어 배치 단위로 저장
+    kind: quizzes (QuizCreate 형식) / progress (내보낸 진행 상태) / attempts (풀이 결과)
+    gzip 본문은 Content-Encoding: gzip 또는 내용으로 감지
+    잘못된 줄은 건너뛰고 응답의 errors에 줄 번호와 함께 보고 (이미 커밋한 배치는 유지)
+    """
+    importer_type = bulk_transfer.IMPORTERS.get(kind)
+    if importer_type is None:
+        raise HTTPException(status_code=404, detail="지원하지 않는 가져오기 종류입니다")
+
+    encoding = request.headers.get("content-encoding", "").lower()
+    importer = importer_type(current_user.id)
+    report = await bulk_transfer.import_ndjson(
+        importer,
+        request.stream(),
+        gzip=True if encoding == "gzip" else None,
+        flush=asyncio.to_thread
+    )
+    if kind == "quizzes" and report.imported:
+        quiz_cache.invalidate_user(current_user.id)
+    return FastJSONResponse(report.as_dict())
+
+@router.get("/api/export/{kind}")
+async def export_records(
+    kind: str,
+    current_user: models.User = Depends(auth.get_current_user)
+):
+    """
+    사용자 데이터를 NDJSON으로 스트리밍 (quizzes / progress)
+    Accept-Encoding: gzip이면 압축해서 보냄
+    """
+    exporter = bulk_transfer.EXPORTERS.get(kind)
+    if exporter is None:
+        raise HTTPException(status_code=404, detail="지원하지 않는 내보내기 종류입니다")
+    return StreamingResponse(
+        exporter(current_user.id),
+        media_type=bulk_transfer.NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="{kind}.ndjson"'}
+    )
 
 # ===== PDF AI 퀴즈 생성 엔드포인트 =====
 
-@app.post("/api/quizzes/generate-from-pdf")
+@router.post("/api/quizzes/generate-from-pdf")
 async def generate_quiz_from_pdf(
     file: UploadFile = File(...),
     num_questions: int = Form(5),
     question_types: str = Form("mixed"),
-    current_user: Optional[models.User] = Depends(auth.get_current_user_optional)
+    current_user: Optional[models.User] = Depends(auth.get_current_user_optional),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
-    try:
-        if not file.filename.endswith('.pdf'):
-            raise HTTPException(status_code=400, detail="PDF 파일만 업로드 가능합니다")
-        
-        contents = await file.read()
-        from io import BytesIO
-        pdf_file = BytesIO(contents)
-        pdf_file.name = file.filename
-        
-        text = extract_text_from_pdf(pdf_file)
-        if not text:
-            raise HTTPException(status_code=400, detail="PDF에서 텍스트를 추출할 수 없습니다")
-        
-        text = truncate_text(text, max_tokens=5000)
-        
-        questions = generate_quiz_from_text(
-            text=text,
-            num_questions=num_questions,
-            question_types=question_types
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(status_code=400, detail="PDF 파일만 업로드 가능합니다")
+
+    contents = await file.read()
+
+    async def work():
+        try:
+            from io import BytesIO
+            pdf_file = BytesIO(contents)
+            pdf_file.name = file.filename
+            
+            def extract_and_generate():
+                extracted = subsystems.pdf.extract_clean_text(pdf_file)
+                if not extracted:
+                    raise HTTPException(status_code=400, detail="PDF에서 텍스트를 추출할 수 없습니다")
+                text = subsystems.pdf.truncate_text(extracted.text, max_tokens=5000)
+                return extracted, subsystems.llm.generate_quiz_from_text(
+                    text=text,
+                    num_questions=num_questions,
+                    question_types=question_types
+                )
+
+            # PDF 파싱/정리/토큰 계산과 수 분 걸리는 LLM 생성 모두 스레드에서 (이벤트 루프 막지 않음)
+            extracted, questions = await asyncio.to_thread(extract_and_generate)
+            
+            if not questions:
+                raise HTTPException(status_code=500, detail="AI 퀴즈 생성에 실패했습니다")
+            
+            return 200, dumps({
+                "success": True,
+                "filename": file.filename,
+                "questions": questions,
+                "text_cleanup": extracted.stats.as_dict(),
+                "message": f"{len(questions)}개의 문제가 생성되었습니다"
+            })
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            raise HTTPException(status_code=500, detail=f"퀴즈 생성 중 오류 발생: {str(e)}")
+
+    return await idempotency.run(
+        _idempotency_scope(current_user, "generate_from_pdf"),
+        idempotency_key,
+        fingerprint(contents, num_questions, question_types),
+        work
+    )
+
+def _idempotency_scope(user: Optional[models.User], endpoint: str) -> Optional[str]:
+    """사용자별 멱등성 범위 - 비로그인이면 None (키를 서로 공유하지 않도록 멱등성 미적용)"""
+    return f"{user.id}:{endpoint}" if user else None
+
+# ===== LLM 상태 엔드포인트 =====
+
+@router.get("/api/llm/prefix-cache")
+async def get_prefix_cache_stats():
+    """프롬프트 템플릿별 prefix 캐시 적중률"""
+    return subsystems.llm.prefix_sessions.get_stats()
+
+@router.get("/api/llm/response-cache")
+async def get_response_cache_stats():
+    """결정적 LLM 호출 응답 캐시 통계"""
+    return subsystems.llm.explanation_cache.get_stats()
+
+@router.get("/api/llm/prompts")
+async def get_prompt_templates():
+    """프롬프트 템플릿 버전별 prefix 토큰 수와 사용 중인 버전"""
+    return subsystems.llm.prompt_registry.get_stats()
+
+@router.get("/api/llm/quiz-generation")
+async def get_quiz_generation_stats():
+    """분할 생성 구간 시간(p50/p95), 헤지/재시도 횟수"""
+    return subsystems.llm.latency_tracker.get_stats()
+
+@router.get("/api/llm/distractors")
+async def get_distractor_stats():
+    """4지선다 보기 보충 - 원문 용어로 오답을 채운 문제 수, 보기가 4개 미만/부족해 버린 문제 수"""
+    return subsystems.llm.distractor_stats.get_stats()
+
+@router.get("/api/llm/grading")
+async def get_grading_stats():
+    """단답형 채점 - 판정 방법별 답 수, LLM으로 넘긴 비율, 로컬 채점 시간"""
+    return subsystems.grading.short_answer_grader.get_stats()
+
+# ===== 시스템 상태 엔드포인트 =====
+
+@router.get("/api/system/startup")
+async def get_startup_status():
+    """시작 단계별 시간과 하위 시스템 로드 여부"""
+    return subsystems.status()
+
+@router.get("/api/system/ready")
+async def get_readiness():
+    """
+    로드 밸런서용 준비 상태 - 상주 모델이 로드돼 있고 Ollama가 응답하면 200, 아니면 503
+    (MODEL_WARMUP=0이면 모델 로드 여부는 보지 않고 Ollama 응답만 확인)
+    """
+    if not subsystems.llm.loaded:
+        if subsystems.PRELOAD_SUBSYSTEMS or os.getenv("MODEL_WARMUP", "1") == "1":
+            return FastJSONResponse(status_code=503, content={"ready": False, "reason": "LLM 모듈 로드 중"})
+        # 미리 로드/워밍업을 끈 경우 아무도 로드하지 않으므로 여기서 (스레드에서 한 번)
+        await asyncio.to_thread(subsystems.llm.load)
+    lifecycle = subsystems.llm.model_lifecycle
+    if lifecycle.status_is_stale():
+        await asyncio.to_thread(lifecycle.refresh_status)
+    readiness = lifecycle.readiness()
+    return FastJSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+# ===== 앱 생성 =====
+
+def create_app() -> FastAPI:
+    """
+    FastAPI 앱 생성 - 미들웨어, 시작 단계, 라우터 등록
+    PDF/LLM/평가 모듈은 여기서 import하지 않음 (subsystems에서 처음 쓸 때 로드)
+    """
+    with startup_timer.phase("create_app"):
+        app = FastAPI(
+            title="Feynman Learning & Quiz API",
+            description="파인만 학습법 기반 AI 튜터 + 퀴즈 시스템",
+            version="2.0.0",
+            default_response_class=FastJSONResponse
         )
-        
-        if not questions:
-            raise HTTPException(status_code=500, detail="AI 퀴즈 생성에 실패했습니다")
-        
-        return {
-            "success": True,
-            "filename": file.filename,
-            "questions": questions,
-            "message": f"{len(questions)}개의 문제가 생성되었습니다"
-        }
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"퀴즈 생성 중 오류 발생: {str(e)}")
+
+        # CORS 설정
+        app.add_middleware(
+            CORSMiddleware,
+            allow_origins=["*"],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+
+        # 일정 크기 이상 응답은 brotli/gzip 압축 (모바일 전송량 절감)
+        app.add_middleware(CompressionMiddleware)
+
+        for handler in STARTUP_PHASES:
+            app.add_event_handler("startup", _timed(handler))
+        app.add_event_handler("startup", report_startup)
+
+        app.include_router(router)
+    return app
+
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,100 @@
+# backend/subsystems.py
+"""
+무거운 하위 시스템의 지연 로딩 + 시작 단계 시간 측정
+- PDF(PyPDF2, tiktoken), LLM(requests, 프롬프트/응답 캐시), 평가(한국어 분석기)는
+  서버 모듈을 import할 때가 아니라 처음 쓰일 때 로드
+- 워커/테스트 프로세스는 필요한 것만 로드하므로 빨리 뜸
+- 서버는 시작 후 백그라운드 스레드에서 미리 로드해 첫 요청이 느려지지 않게 함 (PRELOAD_SUBSYSTEMS=0이면 끔)
+"""
+import importlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+PRELOAD_SUBSYSTEMS = os.getenv("PRELOAD_SUBSYSTEMS", "1") == "1"
+
+class StartupTimer:
+    """시작 단계별 소요 시간 기록"""
+
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            self.phases.append((name, seconds))
+
+    def report(self) -> str:
+        with self._lock:
+            phases = list(self.phases)
+        lines = [f"  {name:<28} {seconds * 1000:8.1f} ms" for name, seconds in phases]
+        return "⏱️ 시작 단계별 시간\n" + "\n".join(lines)
+
+    def as_dict(self) -> Dict[str, float]:
+        with self._lock:
+            return {name: round(seconds * 1000, 1) for name, seconds in self.phases}
+
+startup_timer = StartupTimer()
+
+class LazySubsystem:
+    """처음 접근할 때 모듈들을 import (스레드 안전, 한 번만)"""
+
+    def __init__(self, name: str, *module_names: str):
+        self.name = name
+        self.module_names = module_names
+        self._modules = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._modules is not None
+
+    def load(self):
+        if self._modules is None:
+            with self._lock:
+                if self._modules is None:
+                    with startup_timer.phase(f"load:{self.name}"):
+                        self._modules = [importlib.import_module(m) for m in self.module_names]
+        return self._modules
+
+    def __getattr__(self, attr: str):
+        # 등록된 모듈에서 순서대로 찾음 (subsystems.pdf.extract_text_from_pdf 등)
+        if attr.startswith("_") or attr in ("name", "module_names"):
+            raise AttributeError(attr)
+        for module in self.load():
+            if hasattr(module, attr):
+                return getattr(module, attr)
+        raise AttributeError(f"{self.name}: {attr}")
+
+pdf = LazySubsystem("pdf", "pdf_utils")
+llm = LazySubsystem("llm", "quiz_generator", "quiz_fanout", "prompt_registry", "prompt_cache", "tutor", "model_lifecycle", "distractors")
+evaluation = LazySubsystem("evaluation", "evaluation_service")
+grading = LazySubsystem("grading", "grading")
+
+ALL_SUBSYSTEMS = (pdf, llm, evaluation, grading)
+
+def preload_in_background():
+    """서버 시작 후 요청을 받으면서 하위 시스템을 미리 로드"""
+    def _run():
+        for subsystem in ALL_SUBSYSTEMS:
+            try:
+                subsystem.load()
+            except Exception as e:
+                print(f"⚠️ {subsystem.name} 미리 로드 실패: {e}")
+    threading.Thread(target=_run, name="subsystem-preload", daemon=True).start()
+
+def status() -> Dict:
+    return {
+        "subsystems": {s.name: s.loaded for s in ALL_SUBSYSTEMS},
+        "startup_ms": startup_timer.as_dict(),
+    }
@@ -0,0 +1,200 @@
+# backend/sync.py
+"""
+오프라인 클라이언트용 델타 동기화
+- 커서 = 서버가 마지막으로 응답한 시각, 그 이후 updated_at이 바뀐 행만 반환
+- 삭제는 sync_tombstones에 기록해 두었다가 전달
+  (퀴즈 삭제는 퀴즈 하나만 기록 - 클라이언트가 하위 문제/보기/진행 기록을 함께 지움)
+- 커밋이 늦게 보이는 트랜잭션을 놓치지 않도록 커서보다 SYNC_OVERLAP만큼 앞에서부터 조회
+  (겹친 행은 클라이언트가 id 기준으로 덮어쓰므로 중복돼도 무방)
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+import item_stats
+import models
+
+SYNC_OVERLAP = timedelta(seconds=5)
+# 이보다 오래된 삭제 기록은 정리 - 더 오래된 커서는 전체 스냅샷으로 재동기화
+TOMBSTONE_RETENTION = timedelta(days=30)
+
+# 복습 간격 상한 (일)
+MAX_INTERVAL_DAYS = 30
+
+class InvalidCursor(ValueError):
+    """해석할 수 없는 동기화 커서"""
+
+def _to_utc_naive(at: datetime) -> datetime:
+    """DB에는 시간대 없는 UTC로 저장하므로 클라이언트 시각도 맞춤"""
+    if at.tzinfo is not None:
+        return at.astimezone(timezone.utc).replace(tzinfo=None)
+    return at
+
+def encode_cursor(at: datetime) -> str:
+    return at.isoformat()
+
+def decode_cursor(cursor: Optional[str]) -> Optional[datetime]:
+    if not cursor:
+        return None
+    try:
+        return _to_utc_naive(datetime.fromisoformat(cursor))
+    except ValueError:
+        raise InvalidCursor(cursor)
+
+def changes_since(db: Session, user_id: int, cursor: Optional[str]) -> Dict:
+    """
+    커서 이후 바뀐 행 (커서가 없거나 보관 기간보다 오래됐으면 전체 스냅샷)
+
+    Raises:
+        InvalidCursor: 커서 형식이 잘못된 경우
+    """
+    now = datetime.utcnow()
+    since = decode_cursor(cursor)
+    reset = since is None or since < now - TOMBSTONE_RETENTION
+    if not reset:
+        since -= SYNC_OVERLAP
+
+    def changed(query, column):
+        return query if reset else query.filter(column > since)
+
+    Quiz, Question, Answer = models.Quiz, models.QuizQuestion, models.QuizAnswer
+    quizzes = changed(db.query(Quiz).filter(Quiz.user_id == user_id), Quiz.updated_at)
+    questions = changed(
+        db.query(Question).join(Quiz, Question.quiz_id == Quiz.id).filter(Quiz.user_id == user_id),
+        Question.updated_at
+    )
+    answers = changed(
+        db.query(Answer)
+        .join(Question, Answer.question_id == Question.id)
+        .join(Quiz, Question.quiz_id == Quiz.id)
+        .filter(Quiz.user_id == user_id),
+        Answer.updated_at
+    )
+    progress = changed(
+        db.query(models.UserProgress).filter(models.UserProgress.user_id == user_id),
+        models.UserProgress.updated_at
+    )
+    # 메시지는 수정되지 않으므로 created_at 기준
+    messages = changed(
+        db.query(models.Message)
+        .join(models.ChatRoom, models.Message.room_id == models.ChatRoom.id)
+        .filter(models.ChatRoom.user_id == user_id),
+        models.Message.created_at
+    )
+
+    deleted = []
+    if not reset:
+        deleted = [
+            {"entity": entity, "id": entity_id}
+            for entity, entity_id in db.query(models.SyncTombstone.entity, models.SyncTombstone.entity_id).filter(
+                models.SyncTombstone.user_id == user_id,
+                models.SyncTombstone.deleted_at > since
+            )
+        ]
+
+    return {
+        "cursor": encode_cursor(now),
+        "reset": reset,
+        "quizzes": quizzes.all(),
+        "questions": questions.all(),
+        "answers": answers.all(),
+        "progress": progress.all(),
+        "messages": messages.order_by(models.Message.id).all(),
+        "deleted": deleted,
+    }
+
+def record_deletions(db: Session, user_id: int, entity: str, ids: Iterable[int]):
+    """삭제와 같은 트랜잭션에서 tombstone 기록 (커밋은 호출 측)"""
+    now = datetime.utcnow()
+    rows = [{"user_id": user_id, "entity": entity, "entity_id": i, "deleted_at": now} for i in ids]
+    if rows:
+        db.execute(insert(models.SyncTombstone), rows)
+
+def prune_tombstones(db: Session) -> int:
+    result = db.execute(
+        delete(models.SyncTombstone).where(models.SyncTombstone.deleted_at < datetime.utcnow() - TOMBSTONE_RETENTION)
+    )
+    db.commit()
+    return result.rowcount
+
+def apply_progress(
+    db: Session,
+    user_id: int,
+    results: List[Tuple[int, bool, Optional[datetime], Optional[int]]]
+) -> Tuple[int, List[int]]:
+    """
+    풀이 결과 여러 개를 한 번에 반영 (커밋은 호출 측)
+    문제/진행 기록을 IN 쿼리 두 번으로 읽고, 결과는 푼 시각 순서로 적용
+    문제/퀴즈 풀이 통계도 같은 트랜잭션에서 갱신 (item_stats)
+
+    Args:
+        results: (question_id, is_correct, answered_at, response_ms) 목록
+                 answered_at이 None이면 지금, response_ms(풀이 시간)는 없으면 None
+
+    Returns:
+        (반영한 결과 수, 건너뛴 문제 id 목록 - 없어졌거나 다른 사용자의 문제)
+    """
+    now = datetime.utcnow()
+    # 미래 시각(기기 시계 오차)은 지금으로
+    results = [
+        (question_id, is_correct, min(_to_utc_naive(answered_at), now) if answered_at else now, response_ms)
+        for question_id, is_correct, answered_at, response_ms in results
+    ]
+    question_ids = {question_id for question_id, _, _, _ in results}
+    # 자기 퀴즈의 문제만 - 다른 사용자의 문제 id는 없는 문제와 같이 건너뜀
+    existing_questions = dict(
+        db.query(models.QuizQuestion.id, models.QuizQuestion.quiz_id)
+        .join(models.Quiz, models.Quiz.id == models.QuizQuestion.quiz_id)
+        .filter(models.QuizQuestion.id.in_(question_ids), models.Quiz.user_id == user_id)
+    )
+    progress_rows = {
+        p.question_id: p
+        for p in db.query(models.UserProgress).filter(
+            models.UserProgress.user_id == user_id,
+            models.UserProgress.question_id.in_(existing_questions)
+        )
+    }
+
+    applied = 0
+    skipped = []
+    attempts = []
+    new_learner_questions = set()
+    for question_id, is_correct, at, response_ms in sorted(results, key=lambda r: r[2]):
+        if question_id not in existing_questions:
+            skipped.append(question_id)
+            continue
+
+        progress = progress_rows.get(question_id)
+        if progress is None:
+            new_learner_questions.add(question_id)
+            progress = models.UserProgress(
+                user_id=user_id,
+                question_id=question_id,
+                is_correct=is_correct,
+                attempt_count=1,
+                correct_count=1 if is_correct else 0,
+                interval_days=1,
+                next_review_date=at + timedelta(days=1),
+                last_reviewed_at=at
+            )
+            db.add(progress)
+            progress_rows[question_id] = progress
+        else:
+            progress.attempt_count = (progress.attempt_count or 0) + 1
+            progress.last_reviewed_at = at
+            progress.is_correct = is_correct
+
+            if is_correct:
+                progress.correct_count = (progress.correct_count or 0) + 1
+                progress.interval_days = min((progress.interval_days or 1) * 2, MAX_INTERVAL_DAYS)
+            else:
+                progress.interval_days = 1
+
+            progress.next_review_date = at + timedelta(days=progress.interval_days)
+        attempts.append((question_id, existing_questions[question_id], is_correct, response_ms))
+        applied += 1
+
+    item_stats.record_attempts(db, user_id, attempts, new_learner_questions)
+    return applied, list(dict.fromkeys(skipped))
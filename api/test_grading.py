@@ -0,0 +1,71 @@
+# backend/test_grading.py
+# 단답형 로컬 채점 회귀 테스트 (LLM 호출 없음 - 유사도 점수만 확인)
+# 사용법: python test_grading.py  또는  python -m pytest test_grading.py
+import sys
+
+from grading import GRADING_ACCEPT, GRADING_MIDPOINT, normalize, similarity
+from korean_nlp import analyze_eojeol
+
+# (정답, 학생 답) - 조사만 붙은 답은 로컬에서 바로 정답
+ACCEPTED = [
+    ("사과", "사과는"),
+    ("결과", "결과는"),
+    ("결과", "결과와는"),
+    ("메모리", "메모리와는"),
+    ("프로세스", "프로세스가"),
+    ("HTTP", "HTTP는"),
+]
+
+# 정답과 달라야 하는 답 - 경계값(GRADING_MIDPOINT) 아래
+REJECTED = [
+    ("HTTP", "HTTPS"),
+    ("200", "404"),
+    ("스택", "스택이 아니다"),
+    ("가상 메모리", "가상 메모리 아님"),  # 정답을 포함해도 부정을 덧붙이면 포함 점수 없음
+    ("정렬", "정렬 안 됨"),
+    ("정렬", "정렬되지 않음"),
+]
+
+# 철자가 비슷한 다른 용어 - 로컬에서 정답 처리하지 않고 LLM으로
+SIMILAR_TERMS = [
+    ("프로세스", "프로세서"),
+    ("컴파일러", "컴파일"),
+]
+
+# (어절, 기대 어간) - 두 글자 조사(과는/와는)를 떼면 한 글자만 남는 명사
+STEMS = [
+    ("사과는", "사과"),
+    ("결과는", "결과"),
+    ("사과와는", "사과"),
+    ("큐와는", "큐"),  # 사전에 있는 한 글자 명사는 그대로 분리
+]
+
+def score(reference: str, answer: str) -> float:
+    return similarity(normalize(reference), normalize(answer))
+
+def test_particle_stems():
+    for surface, stem in STEMS:
+        assert analyze_eojeol(surface).stem == stem, f"{surface}: {analyze_eojeol(surface)}"
+
+def test_particle_answers_accepted():
+    for reference, answer in ACCEPTED:
+        assert score(reference, answer) >= GRADING_ACCEPT, f"{reference} / {answer}: {score(reference, answer):.2f}"
+
+def test_different_answers_rejected():
+    for reference, answer in REJECTED:
+        assert score(reference, answer) < GRADING_MIDPOINT, f"{reference} / {answer}: {score(reference, answer):.2f}"
+
+def test_similar_terms_not_accepted():
+    for reference, answer in SIMILAR_TERMS:
+        assert score(reference, answer) < GRADING_ACCEPT, f"{reference} / {answer}: {score(reference, answer):.2f}"
+
+if __name__ == "__main__":
+    failed = False
+    for test in (test_particle_stems, test_particle_answers_accepted, test_different_answers_rejected, test_similar_terms_not_accepted):
+        try:
+            test()
+            print(f"✅ {test.__name__}")
+        except AssertionError as e:
+            failed = True
+            print(f"❌ {test.__name__}: {e}")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,77 @@
+# backend/test_import_time.py
+# 서버 모듈 import 시간 회귀 테스트
+# 사용법: python test_import_time.py  또는  python -m pytest test_import_time.py
+# IMPORT_TIME_BUDGET_MS로 예산 조정 (기본 1500ms, 느린 CI 머신이면 늘림)
+import os
+import subprocess
+import sys
+
+BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+
+# import server 시점에 로드되면 안 되는 모듈 (subsystems에서 처음 쓸 때 로드)
+LAZY_MODULES = [
+    "PyPDF2",
+    "requests",
+    "tiktoken",
+    "langchain",
+    "ollama_client",
+    "pdf_utils",
+    "quiz_generator",
+    "tutor",
+    "evaluation_service",
+    "evaluation_system",
+    "grading",
+    "distractors",
+    "korean_nlp",
+]
+
+def measure_import(module: str = "server"):
+    """
+    새 프로세스에서 python -X importtime으로 import
+
+    Returns:
+        (전체 누적 시간 ms, {모듈: 누적 시간 ms})
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PRELOAD_SUBSYSTEMS": "0"}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import 실패:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            modules[name.strip()] = int(cumulative) / 1000
+        except ValueError:
+            continue  # 헤더 줄
+    return modules.get(module, 0.0), modules
+
+def test_server_import_skips_heavy_subsystems():
+    _, modules = measure_import()
+    loaded = [m for m in LAZY_MODULES if m in modules]
+    assert not loaded, f"import server에서 지연 로딩 대상이 로드됨: {loaded}"
+
+def test_server_import_within_budget():
+    total_ms, _ = measure_import()
+    assert total_ms <= BUDGET_MS, f"import server {total_ms:.0f}ms > 예산 {BUDGET_MS:.0f}ms"
+
+if __name__ == "__main__":
+    total_ms, modules = measure_import()
+    print(f"⏱️ import server: {total_ms:.0f}ms (예산 {BUDGET_MS:.0f}ms)")
+    print("가장 오래 걸린 모듈 (누적):")
+    top_level = sorted(modules.items(), key=lambda item: item[1], reverse=True)[:10]
+    for name, ms in top_level:
+        print(f"  {name:<40} {ms:8.1f} ms")
+    loaded = [m for m in LAZY_MODULES if m in modules]
+    if loaded:
+        print(f"❌ 지연 로딩 대상이 로드됨: {loaded}")
+    if loaded or total_ms > BUDGET_MS:
+        sys.exit(1)
+    print("✅ 통과")
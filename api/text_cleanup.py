@@ -0,0 +1,189 @@
+# backend/text_cleanup.py
+"""
+PDF 추출 텍스트 정리 (프롬프트에 넣기 전)
+- 여러 페이지의 같은 위치(위/아래 몇 번째 줄)에 반복되는 줄(머리글, 바닥글)을 빈도 인덱스로 찾아 제거
+  (숫자는 #로 바꿔 비교하므로 "3 / 12", "- 4 -" 같은 쪽 번호도 같은 줄로 셈)
+- 줄 끝 하이픈으로 나뉜 영어 단어를 붙이고, 문장 중간에서 끊긴 줄을 이어 붙임
+  (조사/어미로 시작하는 줄은 어절 중간에서 끊긴 것으로 보고 공백 없이)
+- 공백/제어 문자 정리
+- 문서 전체를 한 번씩만 훑으므로 길이에 선형
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from korean_nlp import CONNECTIVE_ENDINGS, PARTICLES, TERMINAL_ENDINGS
+from tokenizer import count_tokens
+
+# 페이지 위/아래에서 머리글/바닥글 후보로 볼 줄 수
+EDGE_LINES = 2
+# 이 비율 이상의 페이지에 나오면 반복 줄로 봄
+REPEAT_RATIO = 0.5
+# 반복 줄 판단에 필요한 최소 페이지 수
+MIN_PAGES = 3
+# 이보다 긴 줄은 본문으로 보고 반복 줄 후보에서 제외
+MAX_BOILERPLATE_CHARS = 120
+# 문장 부호 없이 끝나는 한 줄이 이 길이 이하이고 문서의 보통 줄 길이(중앙값)의
+# HEADING_LENGTH_RATIO배보다 짧으면 제목으로 보고 다음 줄과 잇지 않음
+MAX_HEADING_CHARS = 40
+HEADING_LENGTH_RATIO = 0.6
+
+_DIGITS_RE = re.compile(r'\d+')
+_SPACES_RE = re.compile(r'[ \t 　]+')
+_INVISIBLE_RE = re.compile(r'[​-‍﻿­]')
+_PAGE_NUMBER_RE = re.compile(
+    r'^[\s\-–—\[\(]*(?:page|p\.)?\s*\d{1,4}\s*(?:(?:/|of)\s*\d{1,4})?\s*(?:쪽|페이지)?[\s\-–—\]\)]*$',
+    re.IGNORECASE
+)
+_HYPHEN_END_RE = re.compile(r'[A-Za-z]-$')
+_SENTENCE_END_RE = re.compile(r'[.!?。:;」』”"\')\]]$|[다요죠음임함됨]\.?$')
+_LIST_ITEM_RE = re.compile(r'^(?:[-•·*▪●○◦■□▶►※]|\d{1,3}[.)]|[가-하][.)]|\(\d{1,3}\)|[①-⑳])\s*')
+_HANGUL_END_RE = re.compile(r'[가-힣]$')
+_TRAILING_PUNCT_RE = re.compile(r'[.,!?;:)\]」』”"\']+$')
+# 줄 첫 어절이 통째로 이것이면 앞 줄 어절의 나머지 (이어지 / 는) - '이'는 관형사(이 방법)와 겹쳐 제외
+_HANGUL_CONTINUATIONS = frozenset(PARTICLES + TERMINAL_ENDINGS + CONNECTIVE_ENDINGS + ('다', '요')) - {'이'}
+
+@dataclass
+class CleanupStats:
+    pages: int = 0
+    chars_before: int = 0
+    chars_after: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+    boilerplate_lines: int = 0
+    hyphen_joins: int = 0
+    line_joins: int = 0
+    repeated: List[str] = field(default_factory=list)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+    def as_dict(self) -> Dict:
+        return {
+            "pages": self.pages,
+            "chars_before": self.chars_before,
+            "chars_after": self.chars_after,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": self.tokens_saved,
+            "boilerplate_lines": self.boilerplate_lines,
+            "hyphen_joins": self.hyphen_joins,
+            "line_joins": self.line_joins,
+        }
+
+@dataclass
+class CleanupResult:
+    text: str
+    stats: CleanupStats
+
+def _normalize_line(line: str) -> str:
+    line = _INVISIBLE_RE.sub("", line)
+    return _SPACES_RE.sub(" ", line).strip()
+
+def _line_key(line: str) -> str:
+    """반복 줄 비교용 키 - 숫자(쪽 번호, 날짜)만 다른 줄은 같게"""
+    return _DIGITS_RE.sub("#", line.lower())
+
+def _edge_slots(lines: List[str]) -> Dict[int, str]:
+    """비어 있지 않은 줄 중 위/아래 EDGE_LINES개의 {줄 위치: 가장자리 위치("t0", "b1" 등)}"""
+    filled = [i for i, line in enumerate(lines) if line]
+    slots = {}
+    for n, i in enumerate(reversed(filled[-EDGE_LINES:])):
+        slots[i] = f"b{n}"
+    for n, i in enumerate(filled[:EDGE_LINES]):
+        slots[i] = f"t{n}"
+    return slots
+
+def _find_repeated(pages: List[List[str]]) -> set:
+    """여러 페이지의 같은 가장자리 위치에 반복되는 (위치, 줄 키)"""
+    if len(pages) < MIN_PAGES:
+        return set()
+    page_counts: Dict[tuple, int] = {}
+    for lines in pages:
+        for i, slot in _edge_slots(lines).items():
+            if len(lines[i]) > MAX_BOILERPLATE_CHARS:
+                continue
+            key = (slot, _line_key(lines[i]))
+            page_counts[key] = page_counts.get(key, 0) + 1
+    threshold = max(2, int(len(pages) * REPEAT_RATIO + 0.5))
+    return {key for key, count in page_counts.items() if count >= threshold}
+
+def _join_lines(lines: List[str], stats: CleanupStats) -> str:
+    """
+    문단 안에서 끊긴 줄을 이어 붙임
+    빈 줄은 문단 경계, 목록 항목의 앞뒤와 문장이 끝난 줄, 보통 줄보다 훨씬 짧은 제목 줄 다음은 줄바꿈 유지
+    (이어 붙인 줄은 조각 목록으로 들고 있다가 마지막에 한 번만 join - 긴 문단에서도 선형)
+    """
+    lengths = sorted(len(line) for line in lines if line)
+    heading_chars = min(MAX_HEADING_CHARS, lengths[len(lengths) // 2] * HEADING_LENGTH_RATIO) if lengths else 0
+    paragraphs: List[List[List[str]]] = [[]]
+    for line in lines:
+        current = paragraphs[-1]
+        if not line:
+            if current:
+                paragraphs.append([])
+            continue
+        if not current:
+            current.append([line])
+            continue
+
+        fragments = current[-1]
+        previous = fragments[-1]
+        if _HYPHEN_END_RE.search(previous) and line[:1].islower():
+            fragments[-1] = previous[:-1]
+            fragments.append(line)
+            stats.hyphen_joins += 1
+        elif (
+            _SENTENCE_END_RE.search(previous)
+            or _LIST_ITEM_RE.match(line)
+            or _LIST_ITEM_RE.match(fragments[0])
+            or (len(fragments) == 1 and len(previous) <= heading_chars)
+        ):
+            current.append([line])
+        else:
+            if not (_HANGUL_END_RE.search(previous) and _is_hangul_continuation(line)):
+                fragments.append(" ")
+            fragments.append(line)
+            stats.line_joins += 1
+
+    return "\n\n".join(
+        "\n".join("".join(fragments) for fragments in paragraph)
+        for paragraph in paragraphs if paragraph
+    )
+
+def _is_hangul_continuation(line: str) -> bool:
+    """줄이 조사/어미만으로 된 어절로 시작하는지 (앞 줄 마지막 어절이 중간에서 끊김)"""
+    first = _TRAILING_PUNCT_RE.sub("", line.split(" ", 1)[0])
+    return first in _HANGUL_CONTINUATIONS
+
+def clean_pages(pages: List[str]) -> CleanupResult:
+    """페이지별 추출 텍스트 → 정리된 문서 전체 텍스트와 통계"""
+    stats = CleanupStats(pages=len(pages))
+    raw = "\n".join(pages)
+    stats.chars_before = len(raw)
+    stats.tokens_before = count_tokens(raw)
+
+    page_lines = [[_normalize_line(line) for line in page.splitlines()] for page in pages]
+    repeated = _find_repeated(page_lines)
+
+    kept: List[str] = []
+    for lines in page_lines:
+        slots = _edge_slots(lines)
+        for i, line in enumerate(lines):
+            slot = slots.get(i)
+            if slot and (_PAGE_NUMBER_RE.match(line) or (slot, _line_key(line)) in repeated):
+                stats.boilerplate_lines += 1
+                continue
+            kept.append(line)
+        # 페이지 경계는 문단 경계가 아님 (문장이 다음 페이지로 이어짐) - 빈 줄을 넣지 않음
+
+    text = _join_lines(kept, stats)
+    stats.repeated = sorted({line for _, line in repeated})
+    stats.chars_after = len(text)
+    stats.tokens_after = count_tokens(text)
+    return CleanupResult(text=text, stats=stats)
+
+def clean_text(text: str) -> str:
+    """페이지 구분이 없는 텍스트 정리 (반복 줄 제거 없이 줄/공백만)"""
+    return clean_pages([text]).text
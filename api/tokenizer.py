@@ -0,0 +1,102 @@
+# backend/tokenizer.py
+import os
+import re
+from functools import lru_cache
+from typing import List
+
+try:
+    import tiktoken
+except ImportError:  # 선택 의존성 - 없으면 근사치로 계산
+    tiktoken = None
+
+# llama3 계열 토크나이저와 가장 가까운 BPE 인코딩
+TOKENIZER_ENCODING = os.getenv("TOKENIZER_ENCODING", "cl100k_base")
+# 이 길이(글자) 이하의 텍스트만 캐시 - 문서/프롬프트 전체를 캐시에 붙잡아 두지 않게
+MAX_CACHED_CHARS = 2000
+
+_HANGUL_RE = re.compile(r'[가-힣]')
+_WORD_RE = re.compile(r'[A-Za-z0-9]+')
+
+_encoding = None
+_encoding_failed = False
+
+def _get_encoding():
+    global _encoding, _encoding_failed
+    if _encoding is None and tiktoken is not None and not _encoding_failed:
+        try:
+            _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception as e:
+            # 인코딩 파일을 받을 수 없는 환경(오프라인 등) → 근사치로 계속
+            _encoding_failed = True
+            print(f"⚠️ tiktoken 인코딩 로드 실패, 근사치 사용: {e}")
+    return _encoding
+
+def _estimate_tokens(text: str) -> int:
+    """
+    tiktoken이 없을 때의 근사치
+    한글 음절은 대부분 1토큰 이상, 영숫자 단어는 약 4자당 1토큰
+    """
+    hangul = len(_HANGUL_RE.findall(text))
+    words = _WORD_RE.findall(text)
+    word_tokens = sum(max(1, len(w) // 4) for w in words)
+    rest = len(text) - hangul - sum(len(w) for w in words)
+    return hangul + word_tokens + max(0, rest // 2)
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수 계산
+    짧은 텍스트(대화 메시지, 요약 줄)는 매 턴 반복되므로 결과를 캐시, 긴 텍스트는 매번 계산
+    """
+    if not text:
+        return 0
+    if len(text) <= MAX_CACHED_CHARS:
+        return _count_cached(text)
+    return _count(text)
+
+@lru_cache(maxsize=4096)
+def _count_cached(text: str) -> int:
+    return _count(text)
+
+def _count(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return _estimate_tokens(text)
+
+def encode(text: str) -> List[int]:
+    """토큰 ID 목록 (tiktoken 필요)"""
+    encoding = _get_encoding()
+    if encoding is None:
+        raise RuntimeError("tiktoken이 설치되어 있지 않습니다")
+    return encoding.encode(text)
+
+def truncate_to_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """
+    텍스트를 max_tokens 이하로 자르기
+
+    Args:
+        text: 원본 텍스트
+        max_tokens: 최대 토큰 수
+        keep: "head"면 앞부분, "tail"이면 뒷부분 유지
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        kept = tokens[:max_tokens] if keep == "head" else tokens[-max_tokens:]
+        return encoding.decode(kept)
+
+    # 근사치: 이분 탐색으로 글자 수 결정
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        piece = text[:mid] if keep == "head" else text[-mid:]
+        if _estimate_tokens(piece) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return text[:lo] if keep == "head" else text[len(text) - lo:]
@@ -0,0 +1,21 @@
+# backend/tutor.py
+from typing import List, Optional
+
+from feynman_prompts import LearningPhase, feynman_engine
+from ollama_client import RESPONSE_CACHE_DB, generate
+from response_cache import ResponseCache
+
+# 같은 개념 + 같은 지식 수준의 AI 설명은 temperature=0이면 항상 같으므로 캐시
+explanation_cache = ResponseCache(max_entries=256, ttl_seconds=86400, sqlite_path=RESPONSE_CACHE_DB)
+
+def generate_ai_explanation(
+    concept: str,
+    knowledge_level: str = "beginner",
+    weak_points: Optional[List[str]] = None
+) -> Optional[str]:
+    """AI_EXPLANATION 단계의 맞춤 설명 생성 (결정적 호출 → 응답 캐시 사용)"""
+    prompt = feynman_engine.get_prompt_for_phase(
+        LearningPhase.AI_EXPLANATION,
+        {"concept": concept, "knowledge_level": knowledge_level, "weak_points": weak_points or []}
+    )
+    return generate(prompt, options={"temperature": 0}, cache=explanation_cache)
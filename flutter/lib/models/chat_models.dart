@@ -16,7 +16,7 @@ class ChatRoom {
 
   factory ChatRoom.fromJson(Map<String, dynamic> json) {
     return ChatRoom(
-      id: json['id'],
+      id: json['id'].toString(),
       title: json['title'],
       createdAt: DateTime.parse(json['created_at']),
       updatedAt: DateTime.parse(json['updated_at']),
@@ -40,7 +40,7 @@ class Message {
 
   factory Message.fromJson(Map<String, dynamic> json) {
     return Message(
-      id: json['id'],
+      id: json['id'].toString(),
       role: json['role'],
       content: json['content'],
       createdAt: DateTime.parse(json['created_at']),